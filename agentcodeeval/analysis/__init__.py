@@ -3,11 +3,24 @@ Code analysis utilities for AgentCodeEval
 """
 
 from .ast_analyzer import ASTAnalyzer
-from .dependency_analyzer import DependencyAnalyzer  
+from .dependency_analyzer import DependencyAnalyzer, DependencyGraph
 from .complexity_analyzer import ComplexityAnalyzer
+from .lexical_index import LexicalIndex
+from .solution_analysis import FileAnalysis, SolutionAnalysis, analyze_solution
+from .syntax_tree import SourceTree, SyntaxFacts, parse_source, syntax_backend, syntax_facts
 
 __all__ = [
     "ASTAnalyzer",
     "DependencyAnalyzer", 
-    "ComplexityAnalyzer"
+    "DependencyGraph",
+    "ComplexityAnalyzer",
+    "LexicalIndex",
+    "FileAnalysis",
+    "SolutionAnalysis",
+    "analyze_solution",
+    "SourceTree",
+    "SyntaxFacts",
+    "parse_source",
+    "syntax_backend",
+    "syntax_facts"
 ] 
\ No newline at end of file
@@ -7,13 +7,78 @@ and symbol extraction across different programming languages.
 
 import ast
 import re
+from dataclasses import dataclass
 from typing import Dict, List, Optional, Any, Set, Tuple
 from pathlib import Path
 import logging
 
+from ..utils.patterns import IDENTIFIER_PATTERN, keyword_pattern
+from .syntax_tree import syntax_facts, syntax_language
+
 logger = logging.getLogger(__name__)
 
 
+LANGUAGE_BY_EXTENSION = {
+    '.py': 'python',
+    '.go': 'go',
+    '.js': 'javascript',
+    '.ts': 'typescript',
+    '.jsx': 'javascript',
+    '.tsx': 'typescript'
+}
+
+# Statements that open a brace block but are not declarations
+_BLOCK_KEYWORDS = {
+    'if', 'else', 'for', 'foreach', 'while', 'do', 'switch', 'case', 'catch', 'try', 'finally',
+    'synchronized', 'using', 'lock', 'match', 'loop', 'when', 'return', 'select', 'defer', 'go'
+}
+_STRING_LITERAL_PATTERN = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|`[^`]*`')
+_CALL_NAME_PATTERN = re.compile(r'([A-Za-z_][A-Za-z0-9_]*)\s*(?:<[^>]*>)?\s*\(')
+_FIRST_WORD_PATTERN = re.compile(r'[\s(]')
+
+# Line patterns for the regex-based Go and JavaScript/TypeScript parsers
+_GO_FUNC_PATTERN = re.compile(r'func\s+(?:\([^)]*\)\s+)?(\w+)\s*\([^)]*\)')
+_GO_PARAMS_PATTERN = re.compile(r'func\s+(?:\([^)]*\)\s+)?\w+\s*\(([^)]*)\)')
+_GO_TYPE_PATTERN = re.compile(r'type\s+(\w+)\s+(?:struct|interface)')
+_GO_IMPORT_PATTERN = re.compile(r'import\s+(?:"([^"]+)"|`([^`]+)`)')
+_GO_VAR_PATTERN = re.compile(r'(?:var|:=)\s+(\w+)')
+_GO_COMPLEXITY_PATTERN = keyword_pattern(['if', 'for', 'switch', 'case', 'select'])
+_JS_FUNC_PATTERNS = [
+    re.compile(r'function\s+(\w+)\s*\('),
+    re.compile(r'(?:const|let|var)\s+(\w+)\s*=\s*(?:async\s+)?\([^)]*\)\s*=>'),
+    re.compile(r'(\w+)\s*:\s*(?:async\s+)?function\s*\('),
+    re.compile(r'(\w+)\s*\([^)]*\)\s*\{')
+]
+_JS_CLASS_PATTERN = re.compile(r'class\s+(\w+)')
+_JS_IMPORT_PATTERNS = [
+    re.compile(r'import\s+.*\s+from\s+[\'"]([^\'"]+)[\'"]'),
+    re.compile(r'require\s*\(\s*[\'"]([^\'"]+)[\'"]\s*\)'),
+    re.compile(r'import\s*\(\s*[\'"]([^\'"]+)[\'"]\s*\)')
+]
+_JS_VAR_PATTERN = re.compile(r'(?:const|let|var)\s+(\w+)')
+_JS_COMPLEXITY_PATTERN = keyword_pattern(['if', 'while', 'for', 'switch', 'case', 'catch'])
+
+
+def detect_language(file_path: str) -> str:
+    """Language name from a file extension ('generic' when unknown)"""
+    return LANGUAGE_BY_EXTENSION.get(Path(file_path).suffix.lower(), 'generic')
+
+
+@dataclass
+class CodeChunk:
+    """A contiguous line span of a file (1-based, inclusive)
+    
+    ``symbol`` chunks are functions/methods whose body can be elided down to
+    the signature lines ``start_line..signature_end``; ``module`` chunks are
+    everything in between (imports, type declarations, constants).
+    """
+    name: str
+    kind: str
+    start_line: int
+    end_line: int
+    signature_end: int
+
+
 class ASTAnalyzer:
     """AST analyzer with support for multiple languages"""
     
@@ -76,6 +141,111 @@ class ASTAnalyzer:
         ast_info = self.parse_file(file_path)
         return ast_info.get("function_details", [])
     
+    def extract_chunks(self, content: str) -> List[CodeChunk]:
+        """Split a file into symbol and module chunks covering every line in order"""
+        lines = content.split('\n')
+        if not content.strip():
+            return []
+        
+        spans = None
+        if self.language == "python":
+            spans = self._python_symbol_spans(content)
+        if spans is None:
+            spans = self._brace_symbol_spans(lines)
+        
+        chunks = []
+        next_line = 1
+        for name, start, end, signature_end in spans:
+            if start > next_line:
+                chunks.append(CodeChunk("", "module", next_line, start - 1, start - 1))
+            chunks.append(CodeChunk(name, "symbol", start, end, signature_end))
+            next_line = end + 1
+        if next_line <= len(lines):
+            chunks.append(CodeChunk("", "module", next_line, len(lines), len(lines)))
+        
+        return chunks
+    
+    def _python_symbol_spans(self, content: str) -> Optional[List[Tuple[str, int, int, int]]]:
+        """Function and method spans from the Python AST (None on syntax errors)"""
+        try:
+            tree = ast.parse(content)
+        except SyntaxError:
+            return None
+        
+        spans = []
+        
+        def visit(body):
+            for node in body:
+                if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    start = min([node.lineno] + [d.lineno for d in node.decorator_list])
+                    first = node.body[0]
+                    # Keep the docstring with the signature
+                    if (isinstance(first, ast.Expr) and isinstance(getattr(first, 'value', None), ast.Constant)
+                            and isinstance(first.value.value, str) and len(node.body) > 1):
+                        signature_end = first.end_lineno
+                    else:
+                        signature_end = first.lineno - 1
+                    signature_end = max(signature_end, node.lineno)
+                    spans.append((node.name, start, node.end_lineno, min(signature_end, node.end_lineno)))
+                elif isinstance(node, ast.ClassDef):
+                    visit(node.body)
+        
+        visit(tree.body)
+        return spans
+    
+    def _brace_symbol_spans(self, lines: List[str]) -> List[Tuple[str, int, int, int]]:
+        """Function-like brace blocks (outermost only) for C-family languages"""
+        spans = []
+        i = 0
+        while i < len(lines):
+            stripped = lines[i].strip()
+            name = self._declaration_name(stripped)
+            
+            # The opening brace may sit on the declaration line or the next one
+            brace_line = None
+            if name and not stripped.endswith(';'):
+                if stripped.endswith('{'):
+                    brace_line = i
+                elif i + 1 < len(lines) and lines[i + 1].strip() == '{':
+                    brace_line = i + 1
+            
+            if brace_line is None:
+                i += 1
+                continue
+            
+            depth = 0
+            end = None
+            for j in range(brace_line, len(lines)):
+                code = _STRING_LITERAL_PATTERN.sub('""', lines[j]).split('//')[0]
+                depth += code.count('{') - code.count('}')
+                if depth <= 0:
+                    end = j
+                    break
+            
+            if end is None or end == brace_line:
+                i += 1
+                continue
+            
+            spans.append((name, i + 1, end + 1, brace_line + 1))
+            i = end + 1
+        
+        return spans
+    
+    @staticmethod
+    def _declaration_name(stripped: str) -> Optional[str]:
+        """Name of the function a line declares, if it looks like a declaration"""
+        if not stripped or stripped.startswith(('}', '//', '/*', '*', '#', '@')):
+            return None
+        first_word = _FIRST_WORD_PATTERN.split(stripped, 1)[0]
+        if first_word in _BLOCK_KEYWORDS or '(' not in stripped:
+            return None
+        
+        for match in _CALL_NAME_PATTERN.finditer(stripped):
+            name = match.group(1)
+            if name not in _BLOCK_KEYWORDS and name != 'func':
+                return name
+        return 'anonymous'
+    
     # Language-specific parsers
     
     def _parse_python(self, content: str, file_path: str) -> Dict[str, Any]:
@@ -142,25 +312,52 @@ class ASTAnalyzer:
             return self._empty_ast_result()
     
     def _parse_go(self, content: str, file_path: str) -> Dict[str, Any]:
-        """Parse Go code using regex patterns"""
+        """Parse Go code (syntax tree when tree-sitter is installed, else regex patterns)"""
+        lines = content.split('\n')
+        complexity = 1
+        
+        facts = syntax_facts(content, 'go')
+        if facts is not None:
+            functions, types = list(facts.functions), list(facts.types)
+            imports, variables = list(facts.imports), list(facts.variables)
+            function_details = [
+                {key: detail[key] for key in ("name", "args", "line_number", "is_method")}
+                for detail in facts.function_details
+            ]
+        else:
+            functions, types, imports, variables, function_details = self._scan_go(lines)
+        
+        # Calculate complexity (one point per distinct keyword on a line)
+        for line in lines:
+            complexity += len(set(_GO_COMPLEXITY_PATTERN.findall(line)))
+        
+        return {
+            "functions": functions,
+            "types": types,
+            "imports": imports,
+            "variables": variables,
+            "function_details": function_details,
+            "complexity": complexity,
+            "total_lines": len(lines),
+            "language": "go"
+        }
+    
+    def _scan_go(self, lines: List[str]) -> Tuple[List[str], List[str], List[str], List[str], List[Dict[str, Any]]]:
+        """Line-regex fallback for ``_parse_go``"""
         functions = []
         types = []
         imports = []
         variables = []
         function_details = []
-        complexity = 1
-        
-        lines = content.split('\n')
         
         # Extract functions
-        func_pattern = r'func\s+(?:\([^)]*\)\s+)?(\w+)\s*\([^)]*\)'
         for line_num, line in enumerate(lines, 1):
-            if match := re.search(func_pattern, line):
+            if match := _GO_FUNC_PATTERN.search(line):
                 func_name = match.group(1)
                 functions.append(func_name)
                 
                 # Extract parameters
-                param_match = re.search(r'func\s+(?:\([^)]*\)\s+)?\w+\s*\(([^)]*)\)', line)
+                param_match = _GO_PARAMS_PATTERN.search(line)
                 params = []
                 if param_match and param_match.group(1).strip():
                     param_str = param_match.group(1)
@@ -175,64 +372,66 @@ class ASTAnalyzer:
                 })
         
         # Extract types (structs, interfaces)
-        type_pattern = r'type\s+(\w+)\s+(?:struct|interface)'
         for line in lines:
-            if match := re.search(type_pattern, line):
+            if match := _GO_TYPE_PATTERN.search(line):
                 types.append(match.group(1))
         
         # Extract imports
-        import_pattern = r'import\s+(?:"([^"]+)"|`([^`]+)`)'
         for line in lines:
-            if match := re.search(import_pattern, line):
+            if match := _GO_IMPORT_PATTERN.search(line):
                 import_path = match.group(1) or match.group(2)
                 imports.append(import_path)
         
         # Extract variables (simplified)
-        var_pattern = r'(?:var|:=)\s+(\w+)'
         for line in lines:
-            if match := re.search(var_pattern, line):
+            if match := _GO_VAR_PATTERN.search(line):
                 variables.append(match.group(1))
         
-        # Calculate complexity
-        complexity_keywords = ['if', 'for', 'switch', 'case', 'select']
+        return functions, types, imports, variables, function_details
+    
+    def _parse_javascript(self, content: str, file_path: str) -> Dict[str, Any]:
+        """Parse JavaScript/TypeScript code (syntax tree when tree-sitter is installed, else regex patterns)"""
+        lines = content.split('\n')
+        complexity = 1
+        
+        facts = syntax_facts(content, syntax_language(self.language, file_path))
+        if facts is not None:
+            functions, classes = list(facts.functions), list(facts.types)
+            imports, variables = list(facts.imports), list(facts.variables)
+            function_details = [
+                {key: detail[key] for key in ("name", "line_number", "is_async")}
+                for detail in facts.function_details
+            ]
+        else:
+            functions, classes, imports, variables, function_details = self._scan_javascript(lines)
+        
+        # Calculate complexity (one point per distinct keyword on a line)
         for line in lines:
-            for keyword in complexity_keywords:
-                if re.search(rf'\b{keyword}\b', line):
-                    complexity += 1
+            complexity += len(set(_JS_COMPLEXITY_PATTERN.findall(line)))
         
         return {
             "functions": functions,
-            "types": types,
+            "classes": classes,
             "imports": imports,
             "variables": variables,
             "function_details": function_details,
             "complexity": complexity,
             "total_lines": len(lines),
-            "language": "go"
+            "language": self.language
         }
     
-    def _parse_javascript(self, content: str, file_path: str) -> Dict[str, Any]:
-        """Parse JavaScript/TypeScript code using regex patterns"""
+    def _scan_javascript(self, lines: List[str]) -> Tuple[List[str], List[str], List[str], List[str], List[Dict[str, Any]]]:
+        """Line-regex fallback for ``_parse_javascript``"""
         functions = []
         classes = []
         imports = []
         variables = []
         function_details = []
-        complexity = 1
-        
-        lines = content.split('\n')
         
         # Extract functions (including arrow functions)
-        func_patterns = [
-            r'function\s+(\w+)\s*\(',
-            r'(?:const|let|var)\s+(\w+)\s*=\s*(?:async\s+)?\([^)]*\)\s*=>',
-            r'(\w+)\s*:\s*(?:async\s+)?function\s*\(',
-            r'(\w+)\s*\([^)]*\)\s*\{'
-        ]
-        
         for line_num, line in enumerate(lines, 1):
-            for pattern in func_patterns:
-                if match := re.search(pattern, line):
+            for pattern in _JS_FUNC_PATTERNS:
+                if match := pattern.search(line):
                     func_name = match.group(1)
                     functions.append(func_name)
                     function_details.append({
@@ -243,46 +442,22 @@ class ASTAnalyzer:
                     break
         
         # Extract classes
-        class_pattern = r'class\s+(\w+)'
         for line in lines:
-            if match := re.search(class_pattern, line):
+            if match := _JS_CLASS_PATTERN.search(line):
                 classes.append(match.group(1))
         
         # Extract imports/requires
-        import_patterns = [
-            r'import\s+.*\s+from\s+[\'"]([^\'"]+)[\'"]',
-            r'require\s*\(\s*[\'"]([^\'"]+)[\'"]\s*\)',
-            r'import\s*\(\s*[\'"]([^\'"]+)[\'"]\s*\)'
-        ]
-        
         for line in lines:
-            for pattern in import_patterns:
-                if match := re.search(pattern, line):
+            for pattern in _JS_IMPORT_PATTERNS:
+                if match := pattern.search(line):
                     imports.append(match.group(1))
         
         # Extract variables
-        var_pattern = r'(?:const|let|var)\s+(\w+)'
         for line in lines:
-            if match := re.search(var_pattern, line):
+            if match := _JS_VAR_PATTERN.search(line):
                 variables.append(match.group(1))
         
-        # Calculate complexity
-        complexity_keywords = ['if', 'while', 'for', 'switch', 'case', 'catch']
-        for line in lines:
-            for keyword in complexity_keywords:
-                if re.search(rf'\b{keyword}\b', line):
-                    complexity += 1
-        
-        return {
-            "functions": functions,
-            "classes": classes,
-            "imports": imports,
-            "variables": variables,
-            "function_details": function_details,
-            "complexity": complexity,
-            "total_lines": len(lines),
-            "language": self.language
-        }
+        return functions, classes, imports, variables, function_details
     
     def _parse_generic(self, content: str, file_path: str) -> Dict[str, Any]:
         """Generic parsing for unsupported languages"""
@@ -290,9 +465,8 @@ class ASTAnalyzer:
         
         # Very basic symbol extraction
         symbols = []
-        word_pattern = r'\b[a-zA-Z_][a-zA-Z0-9_]*\b'
         for line in lines:
-            words = re.findall(word_pattern, line)
+            words = IDENTIFIER_PATTERN.findall(line)
             symbols.extend(words)
         
         # Remove common keywords and duplicates
@@ -325,20 +499,21 @@ class ASTAnalyzer:
         }
 
 
+_analyzers: Dict[str, ASTAnalyzer] = {}
+
+
+def get_ast_analyzer(language: str = "python") -> ASTAnalyzer:
+    """Process-wide shared ASTAnalyzer for a language (analyzers keep no per-file state)"""
+    language = language.lower()
+    analyzer = _analyzers.get(language)
+    if analyzer is None:
+        analyzer = _analyzers[language] = ASTAnalyzer(language)
+    return analyzer
+
+
 def analyze_code_structure(file_path: str, language: str = None) -> Dict[str, Any]:
     """Convenience function to analyze code structure"""
     if language is None:
-        # Detect language from file extension
-        ext = Path(file_path).suffix.lower()
-        language_map = {
-            '.py': 'python',
-            '.go': 'go',
-            '.js': 'javascript',
-            '.ts': 'typescript',
-            '.jsx': 'javascript',
-            '.tsx': 'typescript'
-        }
-        language = language_map.get(ext, 'generic')
+        language = detect_language(file_path)
     
-    analyzer = ASTAnalyzer(language)
-    return analyzer.parse_file(file_path) 
\ No newline at end of file
+    return get_ast_analyzer(language).parse_file(file_path) 
\ No newline at end of file
@@ -22,8 +22,12 @@ except ImportError:
     ANALYSIS_TOOLS_AVAILABLE = False
     logging.warning("Analysis tools (radon/lizard) not available. Using simplified metrics.")
 
+from ..utils.patterns import IDENTIFIER_PATTERN, compiled
+
 logger = logging.getLogger(__name__)
 
+_OPERATOR_PATTERN = re.compile(r'[+\-*/%=<>!&|^~]')
+
 
 class ComplexityAnalyzer:
     """Analyzes code complexity using multiple metrics"""
@@ -186,8 +190,13 @@ class ComplexityAnalyzer:
             'operands': 0
         }
         
-        # Language-specific patterns
+        # Language-specific patterns (compiled once per process)
         patterns = self._get_language_patterns(language)
+        counted = {
+            kind: [compiled(pattern, re.IGNORECASE) for pattern in patterns[kind]]
+            for kind in ('control_structures', 'functions', 'classes')
+        }
+        comment_patterns = [compiled(pattern) for pattern in patterns['comments']]
         
         lines = content.split('\n')
         
@@ -196,30 +205,23 @@ class ComplexityAnalyzer:
             if not line:
                 continue
             
-            # Count control structures
-            for pattern in patterns['control_structures']:
-                indicators['control_structures'] += len(re.findall(pattern, line, re.IGNORECASE))
-            
-            # Count functions
-            for pattern in patterns['functions']:
-                indicators['functions'] += len(re.findall(pattern, line, re.IGNORECASE))
-            
-            # Count classes
-            for pattern in patterns['classes']:
-                indicators['classes'] += len(re.findall(pattern, line, re.IGNORECASE))
+            # Count control structures, functions and classes
+            for kind, regexes in counted.items():
+                for regex in regexes:
+                    indicators[kind] += len(regex.findall(line))
             
             # Count comments
-            for pattern in patterns['comments']:
-                if re.search(pattern, line):
+            for regex in comment_patterns:
+                if regex.search(line):
                     indicators['comments'] += 1
                     break
             
             # Count operators and operands (simplified)
-            operators = re.findall(r'[+\-*/%=<>!&|^~]', line)
+            operators = _OPERATOR_PATTERN.findall(line)
             indicators['operators'] += len(operators)
             
             # Count identifiers as operands
-            identifiers = re.findall(r'\b[a-zA-Z_][a-zA-Z0-9_]*\b', line)
+            identifiers = IDENTIFIER_PATTERN.findall(line)
             indicators['operands'] += len(identifiers)
         
         return indicators
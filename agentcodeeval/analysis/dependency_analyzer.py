@@ -7,13 +7,74 @@ code relationships, import patterns, and dependency graphs.
 
 import re
 import os
+import posixpath
 from collections import defaultdict, deque
-from pathlib import Path
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
 from typing import Dict, List, Optional, Any, Set, Tuple
 import logging
 
+from ..utils.patterns import compiled
+from .syntax_tree import syntax_facts, syntax_language
+
 logger = logging.getLogger(__name__)
 
+_QUOTED_IMPORT_PATTERN = re.compile(r'["`]([^"`]+)["`]')
+_GO_MODULE_PATTERN = re.compile(r'^\s*module\s+(\S+)', re.MULTILINE)
+
+
+@dataclass
+class DependencyGraph:
+    """Internal file dependency graph of a single project
+    
+    ``imports`` holds the directed file -> imported-file edges; ``neighbors``
+    is the undirected view (imports, importers and same-package siblings),
+    with each neighbor list sorted by descending PageRank.
+    """
+    imports: Dict[str, List[str]]
+    neighbors: Dict[str, List[str]]
+    ranks: Dict[str, float]
+    edge_count: int = 0
+    
+    @property
+    def has_edges(self) -> bool:
+        return self.edge_count > 0
+    
+    def ranked_files(self, files: Optional[List[str]] = None) -> List[str]:
+        """Files (all, or the given subset) ordered by descending PageRank"""
+        candidates = self.ranks.keys() if files is None else [f for f in files if f in self.ranks]
+        return sorted(candidates, key=lambda f: (-self.ranks[f], f))
+    
+    def traverse(self, seeds: List[str], preferred: Optional[Set[str]] = None) -> List[str]:
+        """Breadth-first order of the files reachable from ``seeds``
+        
+        Seeds are expanded one at a time, each exhausting its connected
+        component before the next seed starts. Within a BFS layer, files in
+        ``preferred`` come first, then higher-ranked neighbors. Runs in
+        O(files + edges) overall.
+        """
+        visited: Set[str] = set()
+        order: List[str] = []
+        
+        for seed in seeds:
+            if seed not in self.neighbors or seed in visited:
+                continue
+            visited.add(seed)
+            queue = deque([seed])
+            
+            while queue:
+                current = queue.popleft()
+                order.append(current)
+                unvisited = [n for n in self.neighbors[current] if n not in visited]
+                if preferred:
+                    unvisited = ([n for n in unvisited if n in preferred] +
+                                 [n for n in unvisited if n not in preferred])
+                for neighbor in unvisited:
+                    visited.add(neighbor)
+                    queue.append(neighbor)
+        
+        return order
+
 
 class DependencyAnalyzer:
     """Analyzes dependencies between files and modules"""
@@ -35,6 +96,95 @@ class DependencyAnalyzer:
         
         return resolved_deps
     
+    def build_content_graph(self, files: Dict[str, str]) -> DependencyGraph:
+        """Build an internal dependency graph from in-memory ``{path: content}`` files
+        
+        Unlike ``analyze_dependencies`` this never touches the filesystem and
+        keeps only edges that resolve to files of the project: Go imports are
+        resolved to package directories (using ``go.mod`` when present),
+        Python modules by dotted path and JS/TS imports relative to the
+        importing file. Files in the same Go package are linked as siblings.
+        """
+        paths = sorted(files)
+        resolver = _ImportResolver(paths, files.get('go.mod', ''))
+        
+        imports: Dict[str, List[str]] = {}
+        for path in paths:
+            language = self._detect_language(path) if self.language is None else self.language
+            content = files[path]
+            if language == "python":
+                raw_deps = self._extract_python_dependencies(content)
+            elif language == "go":
+                raw_deps = self._extract_go_dependencies(content)
+            elif language in ["javascript", "typescript"]:
+                raw_deps = self._extract_javascript_dependencies(content, syntax_language(language, path))
+            else:
+                raw_deps = []
+            
+            resolved: Set[str] = set()
+            for dep in raw_deps:
+                resolved.update(resolver.resolve(path, dep, language))
+            resolved.discard(path)
+            imports[path] = sorted(resolved)
+        
+        # Undirected adjacency: imports in both directions plus Go package siblings
+        adjacency: Dict[str, Set[str]] = {path: set() for path in paths}
+        for path, deps in imports.items():
+            for dep in deps:
+                adjacency[path].add(dep)
+                adjacency[dep].add(path)
+        
+        for siblings in resolver.go_packages.values():
+            if len(siblings) > 1:
+                for path in siblings:
+                    adjacency[path].update(s for s in siblings if s != path)
+        
+        ranks = self.pagerank(imports, adjacency)
+        neighbors = {
+            path: sorted(adjacent, key=lambda f: (-ranks[f], f))
+            for path, adjacent in adjacency.items()
+        }
+        edge_count = sum(len(adjacent) for adjacent in adjacency.values()) // 2
+        
+        return DependencyGraph(imports=imports, neighbors=neighbors, ranks=ranks, edge_count=edge_count)
+    
+    def pagerank(self, imports: Dict[str, List[str]], adjacency: Optional[Dict[str, Set[str]]] = None,
+                 damping: float = 0.85, iterations: int = 30) -> Dict[str, float]:
+        """PageRank over import edges, so heavily imported core files rank highest
+        
+        Same-package sibling links from ``adjacency`` that are not imports are
+        followed in both directions. Each iteration is O(files + edges).
+        """
+        nodes = list(imports)
+        if not nodes:
+            return {}
+        
+        out_links: Dict[str, Set[str]] = {node: set(imports[node]) for node in nodes}
+        if adjacency:
+            for node, adjacent in adjacency.items():
+                for other in adjacent:
+                    # Sibling (non-import) link: treat as mutual
+                    if node not in out_links[other] and other not in out_links[node]:
+                        out_links[node].add(other)
+                        out_links[other].add(node)
+        
+        count = len(nodes)
+        ranks = {node: 1.0 / count for node in nodes}
+        base = (1.0 - damping) / count
+        
+        for _ in range(iterations):
+            dangling = sum(ranks[node] for node in nodes if not out_links[node])
+            new_ranks = {node: base + damping * dangling / count for node in nodes}
+            for node in nodes:
+                targets = out_links[node]
+                if targets:
+                    share = damping * ranks[node] / len(targets)
+                    for target in targets:
+                        new_ranks[target] += share
+            ranks = new_ranks
+        
+        return ranks
+    
     def build_dependency_graph(self, dependencies: Dict[str, List[str]]) -> Dict[str, Any]:
         """Build dependency graph with nodes and edges"""
         nodes = set()
@@ -134,7 +284,7 @@ class DependencyAnalyzer:
         elif language == "go":
             return self._extract_go_dependencies(content)
         elif language in ["javascript", "typescript"]:
-            return self._extract_javascript_dependencies(content)
+            return self._extract_javascript_dependencies(content, syntax_language(language, file_path))
         else:
             return self._extract_generic_dependencies(content)
     
@@ -165,7 +315,7 @@ class DependencyAnalyzer:
         lines = content.split('\n')
         for line in lines:
             for pattern in import_patterns:
-                match = re.search(pattern, line)
+                match = compiled(pattern).search(line)
                 if match:
                     module = match.group(1)
                     dependencies.append(module)
@@ -174,23 +324,27 @@ class DependencyAnalyzer:
     
     def _extract_go_dependencies(self, content: str) -> List[str]:
         """Extract Go import dependencies"""
+        facts = syntax_facts(content, 'go')
+        if facts is not None:
+            return list(set(facts.imports))
+        
         dependencies = []
         
         # Extract import blocks
         import_patterns = [
-            r'import\s+"([^"]+)"',
-            r'import\s+`([^`]+)`',
+            r'import\s+(?:[\w.]+\s+)?"([^"]+)"',
+            r'import\s+(?:[\w.]+\s+)?`([^`]+)`',
             r'import\s+\(\s*([^)]+)\s*\)'
         ]
         
         for pattern in import_patterns:
-            matches = re.findall(pattern, content, re.MULTILINE | re.DOTALL)
+            matches = compiled(pattern, re.MULTILINE | re.DOTALL).findall(content)
             for match in matches:
-                if '(' in pattern:  # Multi-line import block
+                if r'\(' in pattern:  # Multi-line import block
                     # Parse multi-line imports
                     import_lines = match.split('\n')
                     for line in import_lines:
-                        import_match = re.search(r'["`]([^"`]+)["`]', line)
+                        import_match = _QUOTED_IMPORT_PATTERN.search(line)
                         if import_match:
                             dependencies.append(import_match.group(1))
                 else:
@@ -198,8 +352,12 @@ class DependencyAnalyzer:
         
         return list(set(dependencies))
     
-    def _extract_javascript_dependencies(self, content: str) -> List[str]:
+    def _extract_javascript_dependencies(self, content: str, grammar: str = 'javascript') -> List[str]:
         """Extract JavaScript/TypeScript dependencies"""
+        facts = syntax_facts(content, grammar)
+        if facts is not None:
+            return list(set(facts.imports))
+        
         dependencies = []
         
         # Import patterns for ES6, CommonJS, and dynamic imports
@@ -211,7 +369,7 @@ class DependencyAnalyzer:
         ]
         
         for pattern in import_patterns:
-            matches = re.findall(pattern, content)
+            matches = compiled(pattern).findall(content)
             dependencies.extend(matches)
         
         return list(set(dependencies))
@@ -228,7 +386,7 @@ class DependencyAnalyzer:
         ]
         
         for pattern in generic_patterns:
-            matches = re.findall(pattern, content)
+            matches = compiled(pattern).findall(content)
             dependencies.extend(matches)
         
         return list(set(dependencies))
@@ -299,6 +457,75 @@ class DependencyAnalyzer:
         }
 
 
+class _ImportResolver:
+    """Resolves raw import strings to files of a project (paths are POSIX-relative)"""
+    
+    _JS_EXTENSIONS = ['', '.ts', '.tsx', '.js', '.jsx', '/index.ts', '/index.tsx', '/index.js', '/index.jsx']
+    
+    def __init__(self, paths: List[str], go_mod: str = ""):
+        self.paths = set(paths)
+        
+        # Go packages are directories; index every directory suffix
+        self.go_packages: Dict[str, List[str]] = defaultdict(list)
+        for path in paths:
+            if path.endswith('.go'):
+                self.go_packages[posixpath.dirname(path)].append(path)
+        self.go_dir_suffixes: Dict[str, List[str]] = defaultdict(list)
+        for directory in self.go_packages:
+            parts = PurePosixPath(directory).parts if directory else ()
+            for i in range(len(parts)):
+                self.go_dir_suffixes['/'.join(parts[i:])].append(directory)
+        
+        module_match = _GO_MODULE_PATTERN.search(go_mod)
+        self.go_module = module_match.group(1) if module_match else None
+        
+        # Python modules by every dotted suffix (pkg.mod -> pkg/mod.py, pkg/mod/__init__.py)
+        self.python_modules: Dict[str, List[str]] = defaultdict(list)
+        for path in paths:
+            if path.endswith('.py'):
+                module_parts = list(PurePosixPath(path).with_suffix('').parts)
+                if module_parts and module_parts[-1] == '__init__':
+                    module_parts = module_parts[:-1]
+                for i in range(len(module_parts)):
+                    self.python_modules['.'.join(module_parts[i:])].append(path)
+    
+    def resolve(self, importer: str, dep: str, language: str) -> List[str]:
+        if language == "go":
+            return self._resolve_go(dep)
+        if language == "python":
+            return self.python_modules.get(dep, [])
+        if language in ("javascript", "typescript"):
+            return self._resolve_js(importer, dep)
+        return []
+    
+    def _resolve_go(self, dep: str) -> List[str]:
+        if self.go_module:
+            if dep == self.go_module:
+                return self.go_packages.get('', [])
+            if not dep.startswith(self.go_module + '/'):
+                return []
+            return self.go_packages.get(dep[len(self.go_module) + 1:], [])
+        
+        # No go.mod: match the longest import-path suffix naming a project directory
+        if '/' not in dep:
+            return []  # standard library (fmt, os, ...)
+        parts = dep.split('/')
+        for i in range(1, len(parts)):
+            directories = self.go_dir_suffixes.get('/'.join(parts[i:]))
+            if directories:
+                return [f for directory in directories for f in self.go_packages[directory]]
+        return []
+    
+    def _resolve_js(self, importer: str, dep: str) -> List[str]:
+        if not dep.startswith('.'):
+            return []  # package import
+        base = posixpath.normpath(posixpath.join(posixpath.dirname(importer), dep))
+        for extension in self._JS_EXTENSIONS:
+            if base + extension in self.paths:
+                return [base + extension]
+        return []
+
+
 def analyze_project_dependencies(project_dir: str, language: str = "auto") -> Dict[str, Any]:
     """Convenience function to analyze dependencies for an entire project"""
     
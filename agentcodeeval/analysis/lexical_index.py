@@ -0,0 +1,163 @@
+"""
+BM25 lexical retrieval over the files of a generated project
+
+Identifiers are split into their camelCase / snake_case parts, so a query
+like "payment retry" finds ``PaymentService.retryCharge``. The index keeps
+per-file term frequencies keyed by content hash: updating it re-tokenizes
+only files whose content changed. It is persisted next to the project's
+content store under ``<project>/.ace_cache/``.
+"""
+
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+INDEX_DIR_NAME = ".ace_cache"
+INDEX_FILE_NAME = "lexical_index.json"
+INDEX_FORMAT_VERSION = 1
+
+_IDENTIFIER_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+_CAMEL_PATTERN = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|[0-9]+")
+
+# Keywords and filler words common to the generated languages; they match
+# nearly every file and carry no retrieval signal
+_STOPWORDS = frozenset("""
+    a an and are as at be by do else for from func function go if in import
+    is it let nil none null of on or package pass private protected public
+    return self static the this to true false try catch var void while with
+    def class const new int string str bool err
+""".split())
+
+
+def tokenize_code(text: str) -> List[str]:
+    """Lower-cased identifier parts (plus the whole identifier when compound)"""
+    terms = []
+    for identifier in _IDENTIFIER_PATTERN.findall(text):
+        parts = [
+            part.lower()
+            for chunk in identifier.split('_') if chunk
+            for part in _CAMEL_PATTERN.findall(chunk)
+        ]
+        terms.extend(part for part in parts if len(part) > 1 and part not in _STOPWORDS)
+        if len(parts) > 1:
+            terms.append(identifier.lower())
+    return terms
+
+
+class LexicalIndex:
+    """Incrementally updated BM25 index over ``{relative_path: content}``"""
+
+    def __init__(self, index_path: Optional[Path] = None, k1: float = 1.2, b: float = 0.75):
+        self.index_path = Path(index_path) if index_path else None
+        self.k1 = k1
+        self.b = b
+        self._docs: Dict[str, Dict] = {}
+        self._postings: Optional[Dict[str, Dict[str, int]]] = None
+        self._avg_length = 0.0
+
+    @classmethod
+    def open(cls, project_dir: Path) -> 'LexicalIndex':
+        """Load the project's persisted index (empty if none exists yet)"""
+        index = cls(Path(project_dir) / INDEX_DIR_NAME / INDEX_FILE_NAME)
+        try:
+            with open(index.index_path, 'r') as f:
+                data = json.load(f)
+            if data.get('version') == INDEX_FORMAT_VERSION:
+                index._docs = data.get('docs', {})
+        except FileNotFoundError:
+            pass
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable lexical index {index.index_path}: {e}")
+        return index
+
+    def update(self, files: Mapping[str, str], digest_of: Optional[Callable[[str], str]] = None) -> int:
+        """Bring the index in line with ``files``; returns the number of files (re)indexed
+
+        ``digest_of`` returns a file's SHA-1 without reading its content (for
+        content stores that already know it); files whose digest is unchanged
+        are not re-tokenized. Files missing from ``files`` are dropped.
+        """
+        changed = 0
+        for path in list(self._docs):
+            if path not in files:
+                del self._docs[path]
+                changed += 1
+
+        for path in files:
+            if digest_of is not None:
+                digest = digest_of(path)
+                content = None
+            else:
+                content = files[path]
+                digest = hashlib.sha1(content.encode('utf-8', errors='surrogatepass')).hexdigest()
+
+            doc = self._docs.get(path)
+            if doc is not None and doc['sha1'] == digest:
+                continue
+
+            if content is None:
+                content = files[path]
+            terms = tokenize_code(content)
+            self._docs[path] = {'sha1': digest, 'length': len(terms), 'tf': dict(Counter(terms))}
+            changed += 1
+
+        if changed:
+            self._postings = None
+        return changed
+
+    def save(self):
+        """Persist the index atomically"""
+        if self.index_path is None:
+            return
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_name(f"{self.index_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': INDEX_FORMAT_VERSION, 'docs': self._docs}, f, separators=(',', ':'))
+        os.replace(tmp_path, self.index_path)
+
+    def _build_postings(self):
+        postings: Dict[str, Dict[str, int]] = {}
+        for path, doc in self._docs.items():
+            for term, tf in doc['tf'].items():
+                postings.setdefault(term, {})[path] = tf
+        self._postings = postings
+        self._avg_length = (
+            sum(doc['length'] for doc in self._docs.values()) / len(self._docs) if self._docs else 0.0
+        )
+
+    def search(self, query: str, top_k: int = 10, exclude: Iterable[str] = ()) -> List[Tuple[str, float]]:
+        """Top-k ``(path, score)`` pairs for a free-text query, best first"""
+        if self._postings is None:
+            self._build_postings()
+
+        excluded = set(exclude)
+        num_docs = len(self._docs)
+        scores: Dict[str, float] = {}
+
+        for term in set(tokenize_code(query)):
+            matches = self._postings.get(term)
+            if not matches:
+                continue
+            idf = math.log(1 + (num_docs - len(matches) + 0.5) / (len(matches) + 0.5))
+            for path, tf in matches.items():
+                if path in excluded:
+                    continue
+                length_norm = 1 - self.b + self.b * self._docs[path]['length'] / (self._avg_length or 1)
+                scores[path] = scores.get(path, 0.0) + idf * tf * (self.k1 + 1) / (tf + self.k1 * length_norm)
+
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:top_k]
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, path: object) -> bool:
+        return path in self._docs
@@ -0,0 +1,208 @@
+"""
+Parse-once analysis of a generated solution, shared by all scoring stages
+
+Scoring a solution runs dozens of helpers over the same files (agent metrics,
+quality and security scans, style checks). Each used to lower-case, split
+and regex-scan every file again. ``SolutionAnalysis`` derives those views
+once per solution: every feature is computed on first use and then reused
+by every later helper, so a stage pays only for the features it reads.
+"""
+
+from bisect import bisect_right
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+from .ast_analyzer import detect_language
+from .syntax_tree import SyntaxFacts, syntax_facts, syntax_language
+from ..utils.patterns import (
+    CALL_NAME_PATTERN, GO_FUNC_NAME_PATTERN, GO_TYPE_NAME_PATTERN, GO_VAR_NAME_PATTERN,
+    PY_CLASS_NAME_PATTERN, PY_DEF_NAME_PATTERN, KeywordScanner, compiled
+)
+
+
+_ASSIGNED_NAME_PATTERN = compiled(r'([a-zA-Z_][a-zA-Z0-9_]*)\s*=')
+_DECLARED_NAME_PATTERN = compiled(r'([a-zA-Z_][a-zA-Z0-9_]*)\s*:?=')
+
+
+@dataclass
+class FileAnalysis:
+    """Derived views of one solution file"""
+    name: str
+    code: str
+    _mentions: Dict[str, bool] = field(default_factory=dict, repr=False)
+    _counts: Dict[str, int] = field(default_factory=dict, repr=False)
+    _keyword_counts: Dict[KeywordScanner, Counter] = field(default_factory=dict, repr=False)
+
+    @cached_property
+    def lower(self) -> str:
+        return self.code.lower()
+
+    @cached_property
+    def lines(self) -> List[str]:
+        return self.code.split('\n')
+
+    @cached_property
+    def stripped(self) -> List[str]:
+        """``lines`` with surrounding whitespace removed"""
+        return [line.strip() for line in self.lines]
+
+    @cached_property
+    def line_starts(self) -> List[int]:
+        """Offset of the first character of each line"""
+        starts = [0]
+        for line in self.lines[:-1]:
+            starts.append(starts[-1] + len(line) + 1)
+        return starts
+
+    @cached_property
+    def import_lines(self) -> List[str]:
+        return [line for line in self.stripped if line.startswith(('import ', 'from '))]
+
+    @cached_property
+    def py_defs(self) -> List[str]:
+        return PY_DEF_NAME_PATTERN.findall(self.code)
+
+    @cached_property
+    def py_classes(self) -> List[str]:
+        return PY_CLASS_NAME_PATTERN.findall(self.code)
+
+    @cached_property
+    def go_func_matches(self) -> List[Tuple[int, str]]:
+        """(offset, name) of every ``func`` declaration"""
+        return [(match.start(), match.group(1)) for match in GO_FUNC_NAME_PATTERN.finditer(self.code)]
+
+    @cached_property
+    def go_funcs(self) -> List[str]:
+        return [name for _, name in self.go_func_matches]
+
+    @cached_property
+    def go_vars(self) -> List[str]:
+        return GO_VAR_NAME_PATTERN.findall(self.code)
+
+    @cached_property
+    def go_types(self) -> List[str]:
+        return GO_TYPE_NAME_PATTERN.findall(self.code)
+
+    @cached_property
+    def calls(self) -> List[str]:
+        return CALL_NAME_PATTERN.findall(self.code)
+
+    @cached_property
+    def assigned_names(self) -> List[str]:
+        """Names on the left of ``=``"""
+        return _ASSIGNED_NAME_PATTERN.findall(self.code)
+
+    @cached_property
+    def declared_names(self) -> List[str]:
+        """Names on the left of ``=`` or ``:=``"""
+        return _DECLARED_NAME_PATTERN.findall(self.code)
+
+    @cached_property
+    def language(self) -> str:
+        return detect_language(self.name)
+
+    @cached_property
+    def syntax(self) -> Optional[SyntaxFacts]:
+        """Syntax-tree facts, or None without tree-sitter support for the language"""
+        if self.language == 'generic':
+            return None
+        return syntax_facts(self.code, syntax_language(self.language, self.name))
+
+    @cached_property
+    def functions(self) -> List[str]:
+        """Functions and methods defined in the file, for its own language"""
+        if self.syntax is not None:
+            return self.syntax.functions
+        if self.language == 'go':
+            return self.go_funcs
+        if self.language == 'python':
+            return self.py_defs
+        return self.py_defs + self.go_funcs
+
+    @cached_property
+    def types(self) -> List[str]:
+        """Classes, structs, interfaces and type aliases defined in the file"""
+        if self.syntax is not None:
+            return self.syntax.types
+        if self.language == 'go':
+            return self.go_types
+        if self.language == 'python':
+            return self.py_classes
+        return self.py_classes + self.go_types
+
+    @cached_property
+    def definitions(self) -> List[str]:
+        return self.functions + self.types
+
+    @cached_property
+    def call_names(self) -> List[str]:
+        """Called function/method names (syntax tree, or ``name(`` matches as fallback)"""
+        return self.syntax.calls if self.syntax is not None else self.calls
+
+    @cached_property
+    def identifiers(self) -> List[str]:
+        """Declared functions, variables and types"""
+        if self.syntax is not None:
+            return self.syntax.functions + self.syntax.variables + self.syntax.types
+        return self.go_funcs + self.go_vars + self.go_types + self.py_defs + self.declared_names
+
+    def mentions(self, term: str) -> bool:
+        """Whether ``term`` occurs in the lower-cased code"""
+        found = self._mentions.get(term)
+        if found is None:
+            found = self._mentions[term] = term in self.lower
+        return found
+
+    def keyword_counts(self, scanner: KeywordScanner) -> Counter:
+        """Occurrences of every ``scanner`` keyword in the lower-cased code (one pass, cached)"""
+        counts = self._keyword_counts.get(scanner)
+        if counts is None:
+            counts = self._keyword_counts[scanner] = scanner.counts(self.lower)
+            for keyword in scanner.keywords:
+                self._mentions[keyword] = counts[keyword] > 0
+        return counts
+
+    def count(self, substring: str) -> int:
+        """Occurrences of ``substring`` in the code as written"""
+        occurrences = self._counts.get(substring)
+        if occurrences is None:
+            occurrences = self._counts[substring] = self.code.count(substring)
+        return occurrences
+
+    def line_number(self, position: int) -> int:
+        """1-based line containing character offset ``position``"""
+        return bisect_right(self.line_starts, position)
+
+
+class SolutionAnalysis:
+    """Shared analysis of every file in a solution"""
+
+    def __init__(self, solution_code: Dict[str, str]):
+        self.solution_code = solution_code
+        self.files = [FileAnalysis(filename, code) for filename, code in solution_code.items()]
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    @cached_property
+    def defined_names(self) -> Set[str]:
+        """Functions and types defined anywhere in the solution"""
+        return {name for file in self.files for name in file.definitions}
+
+    @cached_property
+    def joined(self) -> str:
+        """All files joined with spaces (cross-file substring checks)"""
+        return ' '.join(self.solution_code.values())
+
+    @cached_property
+    def joined_lower(self) -> str:
+        return self.joined.lower()
+
+
+def analyze_solution(solution: Union[Dict[str, str], SolutionAnalysis]) -> SolutionAnalysis:
+    """Analysis of ``solution``, reusing it if it is already analyzed"""
+    if isinstance(solution, SolutionAnalysis):
+        return solution
+    return SolutionAnalysis(solution)
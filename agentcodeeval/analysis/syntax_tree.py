@@ -0,0 +1,229 @@
+"""
+Tree-sitter syntax layer for AgentCodeEval
+
+Parses a file once into a concrete syntax tree and extracts its structural
+facts (definitions, imports, calls, variables) with tree queries, so the
+same facts are available for Go, Python and JavaScript/TypeScript instead
+of per-language line regexes.
+
+tree-sitter and the grammar packages are optional: when they are not
+installed ``syntax_facts`` returns None and callers keep their regex
+parsers; ``syntax_backend`` names what is in use, since scores differ.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+try:
+    from tree_sitter import Language, Parser, Query
+    TREE_SITTER_AVAILABLE = True
+except ImportError:
+    TREE_SITTER_AVAILABLE = False
+
+try:
+    from tree_sitter import QueryCursor
+except ImportError:
+    QueryCursor = None
+
+logger = logging.getLogger(__name__)
+
+
+# Grammar package and language function for each supported language
+GRAMMARS = {
+    'python': ('tree_sitter_python', 'language'),
+    'go': ('tree_sitter_go', 'language'),
+    'javascript': ('tree_sitter_javascript', 'language'),
+    'typescript': ('tree_sitter_typescript', 'language_typescript'),
+    'tsx': ('tree_sitter_typescript', 'language_tsx'),
+}
+
+_JAVASCRIPT_QUERY = """
+(function_declaration name: (identifier) @function) @function.node
+(generator_function_declaration name: (identifier) @function) @function.node
+(method_definition name: (property_identifier) @function) @function.node
+(variable_declarator name: (identifier) @function value: [(arrow_function) (function_expression)] @function.node)
+(variable_declarator name: (identifier) @variable)
+(class_declaration name: (_) @type)
+(import_statement source: (string) @import)
+(call_expression function: (identifier) @_require arguments: (arguments . (string) @import) (#eq? @_require "require"))
+(call_expression function: (import) arguments: (arguments . (string) @import))
+(call_expression function: (identifier) @call)
+(call_expression function: (member_expression property: (property_identifier) @call))
+"""
+
+_TYPESCRIPT_QUERY = _JAVASCRIPT_QUERY + """
+(interface_declaration name: (type_identifier) @type)
+(type_alias_declaration name: (type_identifier) @type)
+(abstract_class_declaration name: (type_identifier) @type)
+"""
+
+# Captures: @function (name) with its @function.node, @type, @import, @call, @variable
+QUERIES = {
+    'python': """
+(function_definition name: (identifier) @function) @function.node
+(class_definition name: (identifier) @type)
+(import_statement name: (dotted_name) @import)
+(import_statement name: (aliased_import name: (dotted_name) @import))
+(import_from_statement module_name: (_) @import)
+(call function: (identifier) @call)
+(call function: (attribute attribute: (identifier) @call))
+(assignment left: (identifier) @variable)
+""",
+    'go': """
+(function_declaration name: (identifier) @function) @function.node
+(method_declaration name: (field_identifier) @function) @function.node
+(type_spec name: (type_identifier) @type)
+(import_spec path: (_) @import)
+(call_expression function: (identifier) @call)
+(call_expression function: (selector_expression field: (field_identifier) @call))
+(var_spec name: (identifier) @variable)
+(const_spec name: (identifier) @variable)
+(short_var_declaration left: (expression_list (identifier) @variable))
+""",
+    'javascript': _JAVASCRIPT_QUERY,
+    'typescript': _TYPESCRIPT_QUERY,
+    'tsx': _TYPESCRIPT_QUERY,
+}
+
+_METHOD_NODE_TYPES = {'method_declaration', 'method_definition'}
+
+
+@dataclass
+class SyntaxFacts:
+    """Structural facts of one file, in source order"""
+    language: str
+    functions: List[str] = field(default_factory=list)
+    types: List[str] = field(default_factory=list)  # classes, structs, interfaces, type aliases
+    imports: List[str] = field(default_factory=list)
+    calls: List[str] = field(default_factory=list)
+    variables: List[str] = field(default_factory=list)
+    function_details: List[Dict[str, Any]] = field(default_factory=list)
+    has_errors: bool = False
+
+
+@lru_cache(maxsize=None)
+def _language(language: str) -> Optional['Language']:
+    """Grammar for ``language``, or None if its package is not installed"""
+    if not TREE_SITTER_AVAILABLE or language not in GRAMMARS:
+        return None
+    module_name, function_name = GRAMMARS[language]
+    try:
+        module = __import__(module_name)
+        return Language(getattr(module, function_name)())
+    except (ImportError, AttributeError, ValueError, TypeError) as e:
+        logger.debug(f"tree-sitter grammar for {language} unavailable: {e}")
+        return None
+
+
+@lru_cache(maxsize=None)
+def _query(language: str) -> Optional['Query']:
+    grammar = _language(language)
+    return Query(grammar, QUERIES[language]) if grammar is not None else None
+
+
+def syntax_language(language: str, file_path: str = '') -> str:
+    """Grammar name for a detected language (``.tsx`` files need the TSX grammar)"""
+    if language == 'typescript' and file_path.endswith('.tsx'):
+        return 'tsx'
+    return language
+
+
+def syntax_available(language: str) -> bool:
+    """Whether ``language`` can be parsed with tree-sitter here"""
+    return _language(language) is not None
+
+
+def syntax_backend() -> str:
+    """Which parser extracts syntax facts here: ``tree-sitter``, ``regex``, or
+    ``tree-sitter:<languages>`` when only some grammars load
+
+    Scores computed with different backends are not comparable.
+    """
+    available = sorted(language for language in GRAMMARS if syntax_available(language))
+    if len(available) == len(GRAMMARS):
+        return 'tree-sitter'
+    if not available:
+        return 'regex'
+    return 'tree-sitter:' + ','.join(available)
+
+
+class SourceTree:
+    """A parsed file and its concrete syntax tree"""
+
+    def __init__(self, code: str, language: str):
+        self.language = language
+        self._parser = Parser(_language(language))
+        self.source = code.encode('utf-8')
+        self.tree = self._parser.parse(self.source)
+
+    def facts(self) -> SyntaxFacts:
+        """Definitions, imports, calls and variables found by the language query"""
+        root = self.tree.root_node
+        query = _query(self.language)
+        captures = QueryCursor(query).captures(root) if QueryCursor is not None else query.captures(root)
+        if isinstance(captures, list):  # older bindings return (node, name) pairs
+            grouped: Dict[str, list] = {}
+            for node, name in captures:
+                grouped.setdefault(name, []).append(node)
+            captures = grouped
+
+        def texts(name: str) -> List[str]:
+            nodes = sorted(captures.get(name, []), key=lambda node: node.start_byte)
+            return [node.text.decode('utf-8', errors='replace') for node in nodes]
+
+        return SyntaxFacts(
+            language=self.language,
+            functions=texts('function'),
+            types=texts('type'),
+            imports=[path.strip('"\'`') for path in texts('import')],
+            calls=texts('call'),
+            variables=texts('variable'),
+            function_details=[
+                self._function_detail(node)
+                for node in sorted(captures.get('function.node', []), key=lambda node: node.start_byte)
+            ],
+            has_errors=root.has_error
+        )
+
+    @staticmethod
+    def _function_detail(node) -> Dict[str, Any]:
+        # Arrow functions and function expressions take the name of their declarator
+        named = node if node.child_by_field_name('name') is not None else node.parent
+        name_node = named.child_by_field_name('name')
+        args = []
+        parameters = node.child_by_field_name('parameters') or node.child_by_field_name('parameter')
+        if parameters is not None:
+            for parameter in parameters.named_children:
+                names = (parameter.children_by_field_name('name') or parameter.children_by_field_name('pattern')
+                         or parameter.children_by_field_name('left'))
+                if not names:
+                    names = [parameter] if parameter.type == 'identifier' else [
+                        child for child in parameter.named_children[:1] if child.type == 'identifier'
+                    ]
+                args.extend(name.text.decode('utf-8', errors='replace') for name in names)
+        return {
+            "name": name_node.text.decode('utf-8', errors='replace') if name_node is not None else '',
+            "args": [arg for arg in args if arg not in ('self', 'cls')],
+            "line_number": node.start_point[0] + 1,
+            "is_method": node.type in _METHOD_NODE_TYPES or (
+                node.parent is not None and node.parent.type == 'block' and
+                node.parent.parent is not None and node.parent.parent.type == 'class_definition'
+            ),
+            "is_async": any(child.type == 'async' for child in node.children)
+        }
+
+
+def parse_source(code: str, language: str) -> Optional[SourceTree]:
+    """Syntax tree of ``code``, or None if ``language`` has no grammar here"""
+    if _language(language) is None:
+        return None
+    return SourceTree(code, language)
+
+
+@lru_cache(maxsize=512)
+def syntax_facts(code: str, language: str) -> Optional[SyntaxFacts]:
+    """Structural facts of ``code`` (memoized), or None without a grammar"""
+    tree = parse_source(code, language)
+    return tree.facts() if tree is not None else None
@@ -154,7 +154,9 @@ def status(config_path):
 @click.option('--force', is_flag=True, help='Force regeneration of already completed projects')
 @click.option('--max-concurrent', '-j', type=int, default=3, 
               help='Maximum concurrent operations (default: 3, recommended: 3-10)')
-def generate(config_path, phase, dry_run, force, max_concurrent):
+@click.option('--pipeline', is_flag=True,
+              help='With --phase all: stream each project through phases 1-4 instead of running phase by phase')
+def generate(config_path, phase, dry_run, force, max_concurrent, pipeline):
     """Generate AgentCodeEval benchmark instances"""
     console.print(Panel.fit(f"🏗️  AgentCodeEval Generation - Phase {phase}", style="bold green"))
     
@@ -164,6 +166,10 @@ def generate(config_path, phase, dry_run, force, max_concurrent):
     if max_concurrent > 1:
         console.print(f"🚀 Parallel mode: {max_concurrent} concurrent operations", style="bold blue")
     
+    if pipeline and phase != 'all':
+        console.print("❌ --pipeline requires --phase all", style="bold red")
+        sys.exit(1)
+    
     try:
         config = Config(config_path=config_path)
         
@@ -175,6 +181,15 @@ def generate(config_path, phase, dry_run, force, max_concurrent):
                 console.print(f"  • {error}", style="red")
             sys.exit(1)
         
+        if pipeline and not dry_run:
+            import asyncio
+            asyncio.run(run_pipelined_generation(config, force, max_concurrent))
+            console.print("\n✅ Generation complete!", style="bold green")
+            console.print("Next steps:")
+            console.print("  • Run evaluation: agentcodeeval evaluate")
+            console.print("  • Check status: agentcodeeval status")
+            return
+        
         if phase == '1' or phase == 'all':
             console.print("🎯 Phase 1: Synthetic Project Generation", style="bold")
             if not dry_run:
@@ -237,15 +252,63 @@ def generate(config_path, phase, dry_run, force, max_concurrent):
               help='Difficulty level to evaluate')
 @click.option('--output-file', '-o', type=click.Path(), help='Output file for results (auto-generated if not specified)')
 @click.option('--no-save', is_flag=True, help='Skip saving results to file (display only)')
-def evaluate(config_path, model, task_category, difficulty, output_file, no_save):
+@click.option('--shard', type=str, help='Evaluate only shard i of N (0-based), e.g. --shard 0/4')
+@click.option('--journal', type=click.Path(), help='Append each result to this JSONL journal (default for --shard runs)')
+@click.option('--enqueue', type=click.Path(), help='Only add jobs to this work-queue database for `agentcodeeval worker`')
+@click.option('--adaptive', is_flag=True, help='Sample scenarios (stratified) and stop once the ranking is settled')
+@click.option('--target-ci-width', type=float, default=0.05, help='Adaptive: stop when every model CI is narrower than this (default: 0.05)')
+@click.option('--confidence', type=click.FloatRange(0, 1, min_open=True, max_open=True), default=0.95, help='Adaptive: confidence level (default: 0.95)')
+@click.option('--batch-size', type=int, default=50, help='Adaptive: scenarios per sampling batch (default: 50)')
+@click.option('--max-scenarios', type=int, help='Adaptive: upper bound on scenarios evaluated')
+@click.option('--seed', type=int, default=42, help='Adaptive: sampling seed (default: 42)')
+def evaluate(config_path, model, task_category, difficulty, output_file, no_save, shard, journal, enqueue,
+             adaptive, target_ci_width, confidence, batch_size, max_scenarios, seed):
     """Evaluate models on AgentCodeEval benchmark"""
     console.print(Panel.fit("🧪 AgentCodeEval Evaluation", style="bold purple"))
     
+    if adaptive and (shard or enqueue):
+        console.print("❌ --adaptive cannot be combined with --shard or --enqueue", style="bold red")
+        sys.exit(1)
+    
     try:
         config = Config(config_path=config_path)
         
+        if enqueue:
+            from .evaluation.evaluator import enqueue_evaluation
+            stats = enqueue_evaluation(config, Path(enqueue), model, task_category, difficulty)
+            console.print(f"📋 Queue status: {stats['pending']} pending, {stats['leased']} leased, "
+                          f"{stats['done']} done, {stats['failed']} failed")
+            console.print(f"💡 Start workers with: agentcodeeval worker --queue {enqueue}")
+            return
+        
+        shard_spec = None
+        if shard:
+            from .evaluation.distributed import parse_shard_spec
+            shard_spec = parse_shard_spec(shard)
+            
+            # Sharded runs always journal so the shards can be merged afterwards
+            if not journal:
+                results_dir = Path("evaluation_results")
+                results_dir.mkdir(exist_ok=True)
+                journal = results_dir / f"shard_{shard_spec[0]}of{shard_spec[1]}_evaluation_journal.jsonl"
+            console.print(f"🧩 Shard {shard_spec[0]}/{shard_spec[1]} → journal: {journal}")
+        
         from .evaluation.evaluator import run_evaluation
-        evaluation_data = run_evaluation(config, model, task_category, difficulty)
+        adaptive_options = None
+        if adaptive:
+            adaptive_options = {
+                'target_ci_width': target_ci_width,
+                'confidence': confidence,
+                'batch_size': batch_size,
+                'max_scenarios': max_scenarios,
+                'seed': seed
+            }
+        
+        evaluation_data = run_evaluation(
+            config, model, task_category, difficulty,
+            shard=shard_spec, journal_path=Path(journal) if journal else None,
+            adaptive=adaptive_options
+        )
         
         # Check if evaluation succeeded
         if not evaluation_data.get('success', False):
@@ -282,6 +345,12 @@ def evaluate(config_path, model, task_category, difficulty, output_file, no_save
             # Difficulty part
             difficulty_part = difficulty if difficulty else "alldiff"
             
+            # Shard / sampling part
+            if shard_spec:
+                difficulty_part = f"{difficulty_part}_shard{shard_spec[0]}of{shard_spec[1]}"
+            elif adaptive:
+                difficulty_part = f"{difficulty_part}_adaptive"
+            
             # Construct filename
             output_file = f"{models_part}_{categories_part}_{difficulty_part}_{timestamp}_evaluation_results.json"
             
@@ -295,6 +364,12 @@ def evaluate(config_path, model, task_category, difficulty, output_file, no_save
         console.print(f"  • Models: {list(model) if model else 'All available'}")
         console.print(f"  • Categories: {list(task_category) if task_category else 'All categories'}")
         console.print(f"  • Difficulty: {difficulty if difficulty else 'All levels'}")
+        if shard_spec:
+            console.print(f"  • Shard: {shard_spec[0]}/{shard_spec[1]} (journal: {journal})")
+        adaptive_report = evaluation_data.get('adaptive_report')
+        if adaptive_report:
+            console.print(f"  • Adaptive: {adaptive_report.scenarios_evaluated}/{adaptive_report.scenarios_available} "
+                          f"scenarios, stopped on {adaptive_report.stop_reason}")
         if no_save:
             console.print(f"  • Output: Display only (saving disabled)")
         else:
@@ -309,7 +384,7 @@ def evaluate(config_path, model, task_category, difficulty, output_file, no_save
             if not no_save:
                 from pathlib import Path
                 output_path = Path(output_file)
-                evaluator.save_results(results, summaries, output_path)
+                evaluator.save_results(results, summaries, output_path, adaptive_report=adaptive_report)
         else:
             console.print("❌ No evaluation results generated", style="bold red")
         
@@ -318,6 +393,211 @@ def evaluate(config_path, model, task_category, difficulty, output_file, no_save
         sys.exit(1)
 
 
+@main.command()
+@click.option('--config-path', '-c', type=click.Path(), help='Path to configuration file')
+@click.option('--queue', '-q', 'queue_path', type=click.Path(exists=True), required=True,
+              help='Work-queue database created with `agentcodeeval evaluate --enqueue`')
+@click.option('--worker-id', help='Worker identifier (defaults to hostname-pid)')
+@click.option('--lease-seconds', type=float, default=600, help='Lease duration before a silent job is retried (default: 600)')
+@click.option('--heartbeat-interval', type=float, default=60, help='Seconds between lease renewals (default: 60)')
+@click.option('--max-jobs', type=int, help='Exit after this many jobs')
+def worker(config_path, queue_path, worker_id, lease_seconds, heartbeat_interval, max_jobs):
+    """Consume evaluation jobs from a shared work queue"""
+    console.print(Panel.fit("👷 AgentCodeEval Worker", style="bold purple"))
+    
+    if heartbeat_interval >= lease_seconds:
+        console.print("❌ --heartbeat-interval must be shorter than --lease-seconds", style="bold red")
+        sys.exit(1)
+    
+    try:
+        config = Config(config_path=config_path)
+        
+        from .evaluation.evaluator import run_worker
+        run_worker(
+            config, Path(queue_path), worker_id=worker_id,
+            lease_seconds=lease_seconds, heartbeat_interval=heartbeat_interval,
+            max_jobs=max_jobs
+        )
+        
+    except Exception as e:
+        console.print(f"❌ Worker failed: {e}", style="bold red")
+        sys.exit(1)
+
+
+@main.command()
+@click.argument('journals', nargs=-1, type=click.Path(exists=True))
+@click.option('--config-path', '-c', type=click.Path(), help='Path to configuration file')
+@click.option('--queue', '-q', 'queue_path', type=click.Path(exists=True), help='Also merge results from a work-queue database')
+@click.option('--output-file', '-o', type=click.Path(), help='Merged results file (auto-generated if not specified)')
+def merge(journals, config_path, queue_path, output_file):
+    """Merge shard result journals into a single results file"""
+    console.print(Panel.fit("🧩 AgentCodeEval Merge", style="bold purple"))
+    
+    if not journals and not queue_path:
+        console.print("❌ No journals given. Usage: agentcodeeval merge SHARD_JOURNAL... [--queue DB]", style="bold red")
+        sys.exit(1)
+    
+    try:
+        config = Config(config_path=config_path)
+        
+        from .evaluation.distributed import ResultJournal, merge_journal_records
+        from .evaluation.evaluator import AgentEvaluator
+        
+        records = []
+        for journal_path in journals:
+            records.extend(ResultJournal(Path(journal_path)).load())
+        
+        if queue_path:
+            from .evaluation.work_queue import WorkQueue
+            queue = WorkQueue(Path(queue_path))
+            try:
+                stats = queue.stats()
+                records.extend(queue.results())
+                for failure in queue.failures():
+                    console.print(f"  ⚠️  {failure['job_id']} failed after {failure['attempts']} attempts: {failure['error']}", style="yellow")
+            finally:
+                queue.close()
+            if stats['pending'] or stats['leased']:
+                console.print(f"⚠️  Queue not drained: {stats['pending']} pending, {stats['leased']} leased", style="yellow")
+        
+        results = merge_journal_records(records)
+        total = sum(len(model_results) for model_results in results.values())
+        sources = len(journals) + (1 if queue_path else 0)
+        console.print(f"📂 Loaded {total} evaluations for {len(results)} models from {sources} sources")
+        
+        if not results:
+            console.print("❌ Journals contain no evaluation results", style="bold red")
+            sys.exit(1)
+        
+        if not output_file:
+            from datetime import datetime
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            results_dir = Path("evaluation_results")
+            results_dir.mkdir(exist_ok=True)
+            output_file = results_dir / f"merged_{sources}sources_{timestamp}_evaluation_results.json"
+        
+        evaluator = AgentEvaluator(config)
+        summaries = evaluator.generate_evaluation_summary(results)
+        evaluator.display_results(summaries)
+        evaluator.save_results(results, summaries, Path(output_file))
+        
+    except Exception as e:
+        console.print(f"❌ Merge failed: {e}", style="bold red")
+        sys.exit(1)
+
+
+@main.command()
+@click.option('--config-path', '-c', type=click.Path(), help='Path to configuration file')
+@click.option('--threshold', type=float, default=0.8, help='Jaccard similarity at which scenarios count as duplicates (default: 0.8)')
+@click.option('--action', type=click.Choice(['report', 'drop']), default='report',
+              help='report: only write the report; drop: also remove duplicates from the scenario files')
+@click.option('--report-file', type=click.Path(), help='Report path (default: <output_dir>/scenarios_dedup_report.json)')
+def dedup(config_path, threshold, action, report_file):
+    """Find near-duplicate Phase 3 scenarios (MinHash/LSH)"""
+    console.print(Panel.fit("🧬 AgentCodeEval Scenario Deduplication", style="bold purple"))
+
+    try:
+        config = Config(config_path=config_path)
+
+        from .generation.build_manifest import BuildManifest, MANIFEST_FILE_NAME
+        from .generation.deduplication import deduplicate_scenario_files
+
+        scenarios_dir = Path(config.data.output_dir) / "scenarios"
+        if not scenarios_dir.exists():
+            console.print(f"❌ No scenarios found in {scenarios_dir}. Run Phase 3 first.", style="bold red")
+            sys.exit(1)
+
+        report_path = Path(report_file) if report_file else Path(config.data.output_dir) / "scenarios_dedup_report.json"
+        manifest = BuildManifest(Path(config.data.output_dir) / MANIFEST_FILE_NAME)
+        report = deduplicate_scenario_files(scenarios_dir, threshold=threshold,
+                                            drop=(action == 'drop'), report_file=report_path,
+                                            manifest=manifest)
+
+        table = Table(title="Near-Duplicate Scenarios")
+        table.add_column("Metric", style="cyan")
+        table.add_column("Value", style="green")
+        table.add_row("Scenarios", str(report.total_scenarios))
+        table.add_row("LSH bands x rows", f"{report.bands} x {report.rows}")
+        table.add_row("Candidate pairs", str(report.candidate_pairs))
+        table.add_row("Duplicate clusters", str(len(report.clusters)))
+        table.add_row("Duplicate scenarios", str(report.duplicate_count))
+        table.add_row("Unique scenarios", str(report.total_scenarios - report.duplicate_count))
+        console.print(table)
+
+        if action == 'drop' and report.duplicate_count:
+            console.print(f"🗑️  Dropped {report.duplicate_count} duplicates; their scenario files are marked stale, so rerun Phase 3 to regenerate them", style="yellow")
+        console.print(f"💾 Report saved to: {report_path}", style="green")
+
+    except Exception as e:
+        console.print(f"❌ Deduplication failed: {e}", style="bold red")
+        sys.exit(1)
+
+
+@main.command()
+@click.option('--suite', type=click.Choice(['overhead', 'parsing', 'fuzz']), default='overhead',
+              help='overhead: per-call microbenchmarks; parsing: time each parser strategy on the response corpus; fuzz: search for super-linear parser inputs')
+@click.option('--iterations', '-n', type=int, default=2000, help='Calls per timing run for the overhead suite (default: 2000)')
+@click.option('--corpus', type=click.Path(), help='Recorded response corpus (JSONL from evaluation.response_corpus) added to the built-in samples')
+@click.option('--trials', type=int, default=50, help='Generated inputs for the fuzz suite (default: 50)')
+@click.option('--seed', type=int, default=0, help='Random seed for the fuzz suite (default: 0)')
+def benchmark(suite, iterations, corpus, trials, seed):
+    """Microbenchmark parsing and analysis overhead"""
+    console.print(Panel.fit("⏱️  AgentCodeEval Microbenchmarks", style="bold blue"))
+
+    if suite == 'parsing':
+        from .utils.parse_corpus import ResponseCorpus, benchmark_parser, synthetic_corpus
+
+        entries = synthetic_corpus()
+        if corpus:
+            recorded = ResponseCorpus(Path(corpus)).entries()
+            console.print(f"📚 Loaded {len(recorded)} recorded responses from {corpus}")
+            entries += recorded
+
+        table = Table(title="Parser Strategies by Response Kind")
+        table.add_column("Kind", style="cyan")
+        table.add_column("Strategy")
+        table.add_column("Responses", justify="right")
+        table.add_column("µs/response", justify="right", style="green")
+        table.add_column("MB/s", justify="right", style="bold")
+        for timing in benchmark_parser(entries):
+            table.add_row(timing.kind, timing.strategy, str(timing.responses),
+                          f"{timing.us_per_response:.0f}", f"{timing.mb_per_second:.1f}")
+        console.print(table)
+        return
+
+    if suite == 'fuzz':
+        from .utils.parse_corpus import fuzz_parser
+
+        findings = fuzz_parser(seed=seed, trials=trials)
+        if not findings:
+            console.print(f"✅ No super-linear inputs found in {trials} trials (seed {seed})", style="green")
+            return
+        table = Table(title="Super-Linear Parser Inputs")
+        table.add_column("Motif", style="cyan")
+        table.add_column("Small (ms)", justify="right")
+        table.add_column("Large (ms)", justify="right")
+        table.add_column("Growth", justify="right", style="bold red")
+        for finding in findings:
+            table.add_row(repr(''.join(finding.motif)), f"{finding.small_seconds * 1000:.1f}",
+                          f"{finding.large_seconds * 1000:.1f}", f"{finding.growth:.1f}x")
+        console.print(table)
+        console.print(f"❌ {len(findings)} inputs grew super-linearly (seed {seed})", style="bold red")
+        sys.exit(1)
+
+    from .utils.microbench import run_overhead_benchmark
+
+    results = run_overhead_benchmark(iterations=iterations)
+
+    table = Table(title="Per-Call Overhead")
+    table.add_column("Case", style="cyan")
+    table.add_column("Baseline (µs)", justify="right")
+    table.add_column("Shared (µs)", justify="right", style="green")
+    table.add_column("Speedup", justify="right", style="bold")
+    for result in results:
+        table.add_row(result.name, f"{result.baseline_us:.1f}", f"{result.shared_us:.1f}", f"{result.speedup:.1f}x")
+    console.print(table)
+
+
 @main.command()
 def version():
     """Show AgentCodeEval version information"""
@@ -327,6 +607,110 @@ def version():
     console.print("\nFor more information: https://github.com/AgentCodeEval/AgentCodeEval")
 
 
+def _save_project_specification(generator, spec, language, domain):
+    """Create the project directory and write its Phase 1 metadata"""
+    import json
+    import time
+    
+    project_name = f"{language}_{domain.value}_project"
+    project_dir = generator.generated_dir / project_name
+    project_dir.mkdir(exist_ok=True)
+    
+    metadata = {
+        "specification": spec.to_dict(),
+        "generated_timestamp": time.time(),
+        "phase_1_complete": True
+    }
+    
+    with open(project_dir / "project_metadata.json", 'w') as f:
+        json.dump(metadata, f, indent=2)
+    
+    return project_dir, metadata
+
+
+def _save_project_files(project_dir, project_data, project_files, generation_time):
+    """Write Phase 2 files and record them in the project metadata; returns (files, lines)"""
+    from .analysis.lexical_index import LexicalIndex
+    import json
+    import time
+    
+    files_created = 0
+    lines_created = 0
+    
+    for file_data in project_files:
+        file_path = project_dir / file_data['path']
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(file_data['content'])
+        
+        files_created += 1
+        lines_created += len(file_data['content'].splitlines())
+    
+    project_data['files'] = [{'path': f['path'], 'type': f['type']} for f in project_files]
+    project_data['generated_stats'] = {
+        'files_count': files_created,
+        'lines_count': lines_created,
+        'generation_time': generation_time,
+        'timestamp': time.time()
+    }
+    
+    with open(project_dir / "project_metadata.json", 'w') as f:
+        json.dump(project_data, f, indent=2)
+    
+    # Keep the project's retrieval index in step with its files
+    lexical_index = LexicalIndex.open(project_dir)
+    lexical_index.update({f['path']: f['content'] for f in project_files})
+    lexical_index.save()
+    
+    return files_created, lines_created
+
+
+def _save_scenario_file(scenario_file, project_name, project_id, category_name, scenarios, generation_time):
+    """Write one Phase 3 project+category scenario file"""
+    import json
+    import time
+    
+    scenario_data = {
+        'project_name': project_name,
+        'project_id': project_id,
+        'task_category': category_name,
+        'generated_timestamp': time.time(),
+        'generation_time': generation_time,
+        'scenarios': scenarios
+    }
+    
+    with open(scenario_file, 'w') as f:
+        json.dump(scenario_data, f, indent=2)
+
+
+def _save_test_suite_file(test_suite_file, scenario_file, test_suites, generation_time):
+    """Write the Phase 4 test suites of one scenario file"""
+    import json
+    import time
+    
+    test_suite_data = {
+        'source_file': scenario_file.name,
+        'generated_timestamp': time.time(),
+        'generation_time': generation_time,
+        'test_suites': test_suites
+    }
+    
+    with open(test_suite_file, 'w') as f:
+        json.dump(test_suite_data, f, indent=2)
+
+
+def _remove_obsolete_outputs(manifest, section, keep):
+    """Delete outputs tracked in a manifest section that are not in ``keep`` (resolved paths)"""
+    for tracked_file in manifest.tracked_outputs(section):
+        if tracked_file.resolve() not in keep:
+            if tracked_file.exists():
+                tracked_file.unlink()
+                console.print(f"🗑️  [yellow]Removed obsolete {tracked_file.name}[/yellow]")
+            manifest.forget(section, tracked_file, save=False)
+    manifest.save()
+
+
 async def run_phase_1_generation(config, max_concurrent=3):
     """Run Phase 1: Synthetic Project Generation"""
     from .generation.synthetic_generator import SyntheticProjectGenerator, ProjectDomain, ProjectComplexity
@@ -398,22 +782,8 @@ async def run_phase_1_generation(config, max_concurrent=3):
                 generation_time = time.time() - start_time
                 
                 # Save specification to project directory
-                project_name = f"{language}_{domain.value}_project"
-                
-                # Create project directory and save specification
-                project_dir = generator.generated_dir / project_name
-                project_dir.mkdir(exist_ok=True)
-                
-                # Save specification metadata
-                metadata = {
-                    "specification": spec.to_dict(),
-                    "generated_timestamp": time.time(),
-                    "phase_1_complete": True
-                }
-                
-                with open(project_dir / "project_metadata.json", 'w') as f:
-                    import json
-                    json.dump(metadata, f, indent=2)
+                project_dir, _ = _save_project_specification(generator, spec, language, domain)
+                project_name = project_dir.name
                 
                 console.print(f"   ✅ [green]Generated {project_name}![/green] {spec.target_file_count} files, ~{spec.target_token_count:,} tokens ({generation_time:.1f}s)")
                 
@@ -577,34 +947,9 @@ async def run_phase_2_generation(config, force_regenerate=False, max_concurrent=
                 generation_time = time.time() - start_time
                 console.print(f"   ⏱️  Generated in {generation_time:.1f}s")
                 
-                # Save generated files to project directory
-                files_created = 0
-                lines_created = 0
-                
+                # Save generated files and updated metadata to project directory
                 console.print(f"   💾 Saving {len(project_files)} files...")
-                for file_data in project_files:
-                    file_path = project_dir / file_data['path']
-                    file_path.parent.mkdir(parents=True, exist_ok=True)
-                    
-                    with open(file_path, 'w', encoding='utf-8') as f:
-                        f.write(file_data['content'])
-                    
-                    file_lines = len(file_data['content'].splitlines())
-                    files_created += 1
-                    lines_created += file_lines
-                
-                # Update project metadata with generated files
-                project_data['files'] = [{'path': f['path'], 'type': f['type']} for f in project_files]
-                project_data['generated_stats'] = {
-                    'files_count': files_created,
-                    'lines_count': lines_created,
-                    'generation_time': generation_time,
-                    'timestamp': time.time()
-                }
-                
-                # Save updated metadata
-                with open(project_dir / "project_metadata.json", 'w') as f:
-                    json.dump(project_data, f, indent=2)
+                files_created, lines_created = _save_project_files(project_dir, project_data, project_files, generation_time)
                 
                 console.print(f"   ✅ [green]Completed {project_name}![/green] {files_created} files, {lines_created:,} lines")
                 
@@ -671,6 +1016,8 @@ async def run_phase_2_generation(config, force_regenerate=False, max_concurrent=
 async def run_phase_3_generation(config, force_regenerate=False, max_concurrent=3):
     """Run Phase 3: Agent Evaluation Scenario Creation with parallel processing"""
     from .generation.scenario_generator import ScenarioGenerator
+    from .generation.scenario_planner import ScenarioPlanner, ScenarioPlan, PLAN_FILE_NAME
+    from .generation.build_manifest import BuildManifest, MANIFEST_FILE_NAME, fingerprint
     from .core.task import TaskCategory
     from pathlib import Path
     import json
@@ -717,35 +1064,69 @@ async def run_phase_3_generation(config, force_regenerate=False, max_concurrent=
     # Task categories from enum
     task_categories = list(TaskCategory)
     
-    # Calculate target instances per project based on configuration
-    total_projects_all_languages = len(completed_projects)
-    target_instances_per_project = max(1, config.benchmark.total_instances // total_projects_all_languages // len(task_categories))
-    
-    console.print(f"📋 Target: {target_instances_per_project} scenarios per project per category")
-    console.print(f"🎯 Total scenarios to generate: {len(completed_projects)} projects × {len(task_categories)} categories × {target_instances_per_project} = {len(completed_projects) * len(task_categories) * target_instances_per_project}")
-    
-    # Prepare scenario generation tasks
+    # Plan every (project, category, difficulty) slot up front so the quotas in
+    # task_distribution and difficulty_distribution are met exactly; slots of
+    # unchanged projects are carried over from the previous plan
+    completed_projects.sort(key=lambda item: item[0].name)
+    project_tokens = {
+        project_dir.name: generator.project_token_count(project_dir, project_data)
+        for project_dir, project_data in completed_projects
+    }
+    plan_file = Path(config.data.output_dir) / PLAN_FILE_NAME
+    previous_plan = None if force_regenerate else ScenarioPlan.load(plan_file)
+    plan = ScenarioPlanner(config).plan(project_tokens, previous=previous_plan)
+    plan.save(plan_file)
+    
+    console.print(f"📋 Planned {plan.total} scenarios across {len(completed_projects)} projects × {len(task_categories)} categories")
+    console.print(f"   📂 Categories: " + ", ".join(f"{k}={v}" for k, v in plan.category_counts().items()))
+    console.print(f"   🎚️  Difficulties: " + ", ".join(f"{k}={v}" for k, v in plan.difficulty_counts().items()))
+    for level, count in plan.demoted.items():
+        console.print(f"   ⚠️  [yellow]No project is large enough for {level}: {count} scenarios planned at a lower tier[/yellow]")
+    
+    # Prepare scenario generation tasks; the build manifest tracks the inputs
+    # each scenario file was generated from, so only changed ones are rebuilt
+    manifest = BuildManifest(Path(config.data.output_dir) / MANIFEST_FILE_NAME)
     scenario_tasks = []
     scenarios_skipped = 0
+    planned_files = set()
     
     for project_dir, project_data in completed_projects:
         for task_category in task_categories:
-            # Check if scenarios already exist for this project+category
+            slots = plan.slots_for(project_dir.name, task_category)
+            if not slots:
+                continue
+            
             scenario_file = scenarios_dir / f"{project_dir.name}_{task_category.value}.json"
+            planned_files.add(scenario_file.resolve())
+            inputs_hash = fingerprint(generator.scenario_inputs(project_dir, project_data, task_category, slots))
+            build_status = manifest.status('scenarios', scenario_file, inputs_hash)
             
-            if not force_regenerate and scenario_file.exists():
-                console.print(f"✅ [green]{project_dir.name} - {task_category.value} scenarios already exist[/green]")
-                scenarios_skipped += 1
-                continue
+            if not force_regenerate:
+                if build_status == 'current':
+                    console.print(f"✅ [green]{project_dir.name} - {task_category.value} scenarios up to date[/green]")
+                    scenarios_skipped += 1
+                    continue
+                if build_status == 'untracked':
+                    # Generated before the manifest existed: adopt as-is rather than regenerate
+                    manifest.record('scenarios', scenario_file, inputs_hash, save=False)
+                    console.print(f"✅ [green]{project_dir.name} - {task_category.value} scenarios already exist[/green]")
+                    scenarios_skipped += 1
+                    continue
+                if build_status == 'stale':
+                    console.print(f"♻️  [yellow]{project_dir.name} - {task_category.value} inputs changed, regenerating[/yellow]")
             
             scenario_tasks.append({
                 'project_dir': project_dir,
                 'project_data': project_data,
                 'task_category': task_category,
-                'target_instances': target_instances_per_project,
-                'scenario_file': scenario_file
+                'slots': slots,
+                'scenario_file': scenario_file,
+                'inputs_hash': inputs_hash
             })
     
+    # Remove scenario files this pipeline generated that are no longer planned
+    _remove_obsolete_outputs(manifest, 'scenarios', planned_files)
+    
     if not scenario_tasks:
         console.print("✅ All scenarios already completed! Use --force to regenerate.")
         return
@@ -765,7 +1146,7 @@ async def run_phase_3_generation(config, force_regenerate=False, max_concurrent=
             project_dir = task_info['project_dir']
             project_data = task_info['project_data']
             task_category = task_info['task_category']
-            target_instances = task_info['target_instances']
+            slots = task_info['slots']
             scenario_file = task_info['scenario_file']
             
             project_name = project_data['specification']['name']
@@ -780,23 +1161,14 @@ async def run_phase_3_generation(config, force_regenerate=False, max_concurrent=
                 
                 # Generate scenarios for this project+category
                 scenarios = await generator.generate_task_scenarios(
-                    project_dir, project_data, task_category, target_instances
+                    project_dir, project_data, task_category, slots=slots
                 )
                 
                 generation_time = time.time() - start_time
                 
                 # Save scenarios to file
-                scenario_data = {
-                    'project_name': project_name,
-                    'project_id': project_dir.name,
-                    'task_category': category_name,
-                    'generated_timestamp': time.time(),
-                    'generation_time': generation_time,
-                    'scenarios': scenarios
-                }
-                
-                with open(scenario_file, 'w') as f:
-                    json.dump(scenario_data, f, indent=2)
+                _save_scenario_file(scenario_file, project_name, project_dir.name, category_name, scenarios, generation_time)
+                manifest.record('scenarios', scenario_file, task_info['inputs_hash'])
                 
                 console.print(f"   ✅ [green]Completed {project_name} - {category_name}![/green] {len(scenarios)} scenarios in {generation_time:.1f}s")
                 
@@ -863,7 +1235,8 @@ async def run_phase_3_generation(config, force_regenerate=False, max_concurrent=
 
 async def run_phase_4_generation(config, force_regenerate=False, max_concurrent=3):
     """Run Phase 4: Automated Test-Driven Validation Framework with parallel processing"""
-    from .generation.validation_framework import AutomatedValidator
+    from .generation.validation_framework import AutomatedValidator, TEST_SUITE_GENERATOR_VERSION
+    from .generation.build_manifest import BuildManifest, MANIFEST_FILE_NAME, fingerprint, file_digest
     from .core.task import TaskCategory
     from pathlib import Path
     import json
@@ -900,27 +1273,47 @@ async def run_phase_4_generation(config, force_regenerate=False, max_concurrent=
     console.print("🎯 Creating automated test suites for evaluation...")
     console.print(f"⚖️  Evaluation weights: Functional (40%) | Agent Metrics (30%) | Quality (20%) | Style (10%)")
     
-    # Prepare test suite generation tasks
+    # Prepare test suite generation tasks; a test suite is rebuilt when its
+    # scenario file or the test suite generator changed (build manifest)
+    manifest = BuildManifest(Path(config.data.output_dir) / MANIFEST_FILE_NAME)
+    validation_dir = Path(config.data.output_dir) / "validation" / "test_suites"
+    validation_dir.mkdir(parents=True, exist_ok=True)
     validation_tasks = []
     test_suites_skipped = 0
+    expected_files = set()
     
     for scenario_file in scenario_files:
-        # Check if test suite already exists
-        validation_dir = Path(config.data.output_dir) / "validation" / "test_suites"
-        validation_dir.mkdir(parents=True, exist_ok=True)
-        
         test_suite_file = validation_dir / f"{scenario_file.stem}_test_suite.json"
+        expected_files.add(test_suite_file.resolve())
+        inputs_hash = fingerprint({
+            'generator_version': TEST_SUITE_GENERATOR_VERSION,
+            'scenario_file': file_digest(scenario_file)
+        })
+        build_status = manifest.status('test_suites', test_suite_file, inputs_hash)
         
-        if not force_regenerate and test_suite_file.exists():
-            console.print(f"✅ [green]{scenario_file.name} - test suite already exists[/green]")
-            test_suites_skipped += 1
-            continue
+        if not force_regenerate:
+            if build_status == 'current':
+                console.print(f"✅ [green]{scenario_file.name} - test suite up to date[/green]")
+                test_suites_skipped += 1
+                continue
+            if build_status == 'untracked':
+                # Generated before the manifest existed: adopt as-is rather than regenerate
+                manifest.record('test_suites', test_suite_file, inputs_hash, save=False)
+                console.print(f"✅ [green]{scenario_file.name} - test suite already exists[/green]")
+                test_suites_skipped += 1
+                continue
+            if build_status == 'stale':
+                console.print(f"♻️  [yellow]{scenario_file.name} changed, regenerating test suite[/yellow]")
         
         validation_tasks.append({
             'scenario_file': scenario_file,
-            'test_suite_file': test_suite_file
+            'test_suite_file': test_suite_file,
+            'inputs_hash': inputs_hash
         })
     
+    # Remove test suites this pipeline generated whose scenario file is gone
+    _remove_obsolete_outputs(manifest, 'test_suites', expected_files)
+    
     if not validation_tasks:
         console.print("✅ All test suites already completed! Use --force to regenerate.")
         return
@@ -968,15 +1361,8 @@ async def run_phase_4_generation(config, force_regenerate=False, max_concurrent=
                 generation_time = time.time() - start_time
                 
                 # Save test suites
-                test_suite_data = {
-                    'source_file': scenario_file.name,
-                    'generated_timestamp': time.time(),
-                    'generation_time': generation_time,
-                    'test_suites': test_suites
-                }
-                
-                with open(test_suite_file, 'w') as f:
-                    json.dump(test_suite_data, f, indent=2)
+                _save_test_suite_file(test_suite_file, scenario_file, test_suites, generation_time)
+                manifest.record('test_suites', test_suite_file, task_info['inputs_hash'])
                 
                 console.print(f"   ✅ [green]Completed {scenario_file.name}![/green] {len(test_suites)} test suites in {generation_time:.1f}s")
                 
@@ -1039,5 +1425,281 @@ async def run_phase_4_generation(config, force_regenerate=False, max_concurrent=
     console.print(f"\n💡 [dim]Tip: Use --force to regenerate all test suites[/dim]")
 
 
+async def run_pipelined_generation(config, force_regenerate=False, max_concurrent=3):
+    """Run Phases 1-4 as a streaming pipeline
+    
+    Each project flows through spec → files → scenarios → test suites as soon
+    as its previous stage finishes. Stages are connected by asyncio queues and
+    each stage runs ``max_concurrent`` workers.
+    
+    A project's scenario slots are assigned as soon as its files exist, by
+    re-planning with its generated token count: projects already assigned
+    keep their slots, and projects still in Phase 2 are planned from their
+    size in the previous plan (or their spec's target). Once every project's
+    files exist the plan is the one ``--phase 3`` makes from the same token
+    counts, so switching modes does not regenerate scenarios.
+    """
+    from .generation.synthetic_generator import SyntheticProjectGenerator, ProjectDomain, ProjectComplexity
+    from .generation.scenario_generator import ScenarioGenerator
+    from .generation.scenario_planner import ScenarioPlanner, ScenarioPlan, PLAN_FILE_NAME
+    from .generation.validation_framework import AutomatedValidator, TEST_SUITE_GENERATOR_VERSION
+    from .generation.build_manifest import BuildManifest, MANIFEST_FILE_NAME, fingerprint, file_digest
+    from .core.task import TaskCategory
+    from pathlib import Path
+    import json
+    import time
+    import asyncio
+    
+    console.print("\n🚰 [bold]Pipelined Generation (Phases 1-4)[/bold]")
+    console.print("=" * 60)
+    
+    project_generator = SyntheticProjectGenerator(config)
+    scenario_generator = ScenarioGenerator(config)
+    validator = AutomatedValidator(config)
+    manifest = BuildManifest(Path(config.data.output_dir) / MANIFEST_FILE_NAME)
+    
+    scenarios_dir = Path(config.data.output_dir) / "scenarios"
+    validation_dir = Path(config.data.output_dir) / "validation" / "test_suites"
+    scenarios_dir.mkdir(parents=True, exist_ok=True)
+    validation_dir.mkdir(parents=True, exist_ok=True)
+    
+    # Same spec assignment as Phase 1
+    domains = list(ProjectDomain)
+    complexities = list(ProjectComplexity)
+    spec_tasks = [
+        {'language': language, 'domain': domains[i % len(domains)], 'complexity': complexities[i % len(complexities)]}
+        for language in config.data.supported_languages
+        for i in range(config.data.projects_per_language)
+    ]
+    
+    console.print(f"🎯 {len(spec_tasks)} projects, {max_concurrent} workers per stage")
+    
+    stop = object()
+    stage_workers = max(1, max_concurrent)
+    
+    # Spec → code is unbounded: slot assignment needs every spec's size, so
+    # the spec stage must be able to finish even while code workers wait
+    spec_queue = asyncio.Queue()
+    code_queue = asyncio.Queue()
+    scenario_queue = asyncio.Queue(maxsize=stage_workers * 2)
+    test_queue = asyncio.Queue(maxsize=stage_workers * 2)
+    
+    planner = ScenarioPlanner(config)
+    plan_file = Path(config.data.output_dir) / PLAN_FILE_NAME
+    plan_holder = {'plan': None if force_regenerate else ScenarioPlan.load(plan_file)}
+    estimated_tokens = {}  # projects still in Phase 2
+    project_tokens = {}  # generated token counts of projects with assigned slots
+    claimed_projects = set()
+    specs_ready = asyncio.Event()
+    
+    counts = {'specs': 0, 'projects': 0, 'scenarios': 0, 'test_suites': 0, 'skipped': 0}
+    failures = []
+    start_time = time.time()
+    first_scenario_at = None
+    
+    async def spec_stage(task_info):
+        language, domain, complexity = task_info['language'], task_info['domain'], task_info['complexity']
+        project_dir = project_generator.generated_dir / f"{language}_{domain.value}_project"
+        metadata_file = project_dir / "project_metadata.json"
+        
+        # Spec assignments repeat once projects_per_language exceeds the domain count
+        if project_dir.name in claimed_projects:
+            return
+        claimed_projects.add(project_dir.name)
+        
+        if not force_regenerate and metadata_file.exists():
+            with open(metadata_file, 'r') as f:
+                project_data = json.load(f)
+            counts['skipped'] += 1
+        else:
+            console.print(f"📐 [cyan]Spec: {language} {domain.value} ({complexity.value})[/cyan]")
+            spec = await project_generator.generate_project_specification(domain, complexity, language)
+            project_dir, project_data = _save_project_specification(project_generator, spec, language, domain)
+            counts['specs'] += 1
+        
+        previous_plan = plan_holder['plan']
+        if previous_plan is not None and project_dir.name in previous_plan.project_tokens:
+            estimated_tokens[project_dir.name] = previous_plan.project_tokens[project_dir.name]
+        else:
+            estimated_tokens[project_dir.name] = project_data['specification'].get('target_token_count', 0)
+        await code_queue.put((project_dir, project_data))
+    
+    async def code_stage(item):
+        project_dir, project_data = item
+        spec = project_data['specification']
+        
+        stats = project_data.get('generated_stats', {})
+        complete = (
+            stats.get('files_count', 0) > 0
+            and all((project_dir / f['path']).exists() for f in project_data.get('files', []))
+        )
+        if force_regenerate or not complete:
+            console.print(f"💻 [cyan]Code: {spec['name']} ({spec['language']})[/cyan]")
+            generation_start = time.time()
+            project_files = await project_generator.generate_project_files(
+                spec, spec.get('target_file_count', 10), spec.get('target_token_count', 20000)
+            )
+            files_created, lines_created = _save_project_files(
+                project_dir, project_data, project_files, time.time() - generation_start
+            )
+            counts['projects'] += 1
+            console.print(f"   ✅ [green]{spec['name']}: {files_created} files, {lines_created:,} lines[/green]")
+        else:
+            counts['skipped'] += 1
+        
+        token_count = scenario_generator.project_token_count(project_dir, project_data)
+        
+        # Assign this project's slots now; projects assigned earlier keep theirs
+        await specs_ready.wait()
+        pinned = set(project_tokens)
+        project_tokens[project_dir.name] = token_count
+        estimated_tokens.pop(project_dir.name, None)
+        plan_holder['plan'] = planner.plan({**estimated_tokens, **project_tokens},
+                                           previous=plan_holder['plan'], pinned=pinned)
+        plan_holder['plan'].save(plan_file)
+        await scenario_queue.put((project_dir, project_data))
+    
+    async def scenario_stage(item):
+        nonlocal first_scenario_at
+        project_dir, project_data = item
+        plan = plan_holder['plan']
+        project_name = project_data['specification']['name']
+        
+        for task_category in TaskCategory:
+            slots = plan.slots_for(project_dir.name, task_category)
+            if not slots:
+                continue
+            
+            scenario_file = scenarios_dir / f"{project_dir.name}_{task_category.value}.json"
+            inputs_hash = fingerprint(scenario_generator.scenario_inputs(project_dir, project_data, task_category, slots))
+            build_status = manifest.status('scenarios', scenario_file, inputs_hash)
+            
+            if not force_regenerate and build_status in ('current', 'untracked'):
+                if build_status == 'untracked':
+                    manifest.record('scenarios', scenario_file, inputs_hash)
+                counts['skipped'] += 1
+            else:
+                console.print(f"🎮 [cyan]Scenarios: {project_name} - {task_category.value}[/cyan]")
+                generation_start = time.time()
+                scenarios = await scenario_generator.generate_task_scenarios(
+                    project_dir, project_data, task_category, slots=slots
+                )
+                _save_scenario_file(scenario_file, project_name, project_dir.name, task_category.value,
+                                    scenarios, time.time() - generation_start)
+                manifest.record('scenarios', scenario_file, inputs_hash)
+                counts['scenarios'] += len(scenarios)
+                if first_scenario_at is None:
+                    first_scenario_at = time.time() - start_time
+                    console.print(f"⏱️  [bold green]First scenarios ready after {first_scenario_at:.1f}s[/bold green]")
+            
+            await test_queue.put(scenario_file)
+    
+    async def test_stage(scenario_file):
+        test_suite_file = validation_dir / f"{scenario_file.stem}_test_suite.json"
+        inputs_hash = fingerprint({
+            'generator_version': TEST_SUITE_GENERATOR_VERSION,
+            'scenario_file': file_digest(scenario_file)
+        })
+        build_status = manifest.status('test_suites', test_suite_file, inputs_hash)
+        
+        if not force_regenerate and build_status in ('current', 'untracked'):
+            if build_status == 'untracked':
+                manifest.record('test_suites', test_suite_file, inputs_hash)
+            counts['skipped'] += 1
+            return
+        
+        with open(scenario_file, 'r') as f:
+            scenarios = json.load(f).get('scenarios', [])
+        
+        generation_start = time.time()
+        test_suites = []
+        for scenario in scenarios:
+            test_suite = await validator.generate_test_suite(scenario)
+            test_suites.append({'scenario_id': scenario.get('id', 'unknown'), 'test_suite': test_suite.to_dict()})
+        
+        _save_test_suite_file(test_suite_file, scenario_file, test_suites, time.time() - generation_start)
+        manifest.record('test_suites', test_suite_file, inputs_hash)
+        counts['test_suites'] += len(test_suites)
+    
+    async def run_stage(name, handler, in_queue, out_queue):
+        """Drain ``in_queue`` with stage workers, then tell the next stage to stop"""
+        async def worker():
+            while True:
+                item = await in_queue.get()
+                if item is stop:
+                    return
+                try:
+                    await handler(item)
+                except Exception as e:
+                    console.print(f"   ❌ [red]{name} failed: {str(e)}[/red]")
+                    failures.append(f"{name}: {str(e)}")
+        
+        await asyncio.gather(*(worker() for _ in range(stage_workers)))
+        
+        if name == 'spec':
+            specs_ready.set()
+        
+        if name == 'code':
+            # Slots planned for projects whose code failed go to the others
+            if estimated_tokens:
+                console.print(f"⚠️  [yellow]{len(estimated_tokens)} projects have no code; their scenario slots "
+                              f"are reassigned (rerun to generate those scenarios)[/yellow]")
+                estimated_tokens.clear()
+                plan_holder['plan'] = planner.plan(project_tokens, previous=plan_holder['plan'],
+                                                   pinned=set(project_tokens))
+                plan_holder['plan'].save(plan_file)
+            plan = plan_holder['plan']
+            if plan is not None:
+                console.print(f"📋 [bold]Planned {plan.total} scenarios across {len(project_tokens)} projects[/bold]")
+                _remove_obsolete_outputs(manifest, 'scenarios', {
+                    (scenarios_dir / f"{project}_{category.value}.json").resolve() for project, category in plan.slots
+                })
+        
+        if out_queue is not None:
+            for _ in range(stage_workers):
+                await out_queue.put(stop)
+    
+    for task_info in spec_tasks:
+        spec_queue.put_nowait(task_info)
+    for _ in range(stage_workers):
+        spec_queue.put_nowait(stop)
+    
+    await asyncio.gather(
+        run_stage('spec', spec_stage, spec_queue, code_queue),
+        run_stage('code', code_stage, code_queue, scenario_queue),
+        run_stage('scenarios', scenario_stage, scenario_queue, test_queue),
+        run_stage('test suites', test_stage, test_queue, None)
+    )
+    
+    # Remove test suites this pipeline generated whose scenario file is no longer planned
+    if plan_holder['plan'] is not None:
+        _remove_obsolete_outputs(manifest, 'test_suites', {
+            (validation_dir / f"{project}_{category.value}_test_suite.json").resolve()
+            for project, category in plan_holder['plan'].slots
+        })
+    
+    total_time = time.time() - start_time
+    
+    # Final summary
+    console.print(f"\n📊 [bold]Pipeline Summary:[/bold]")
+    console.print(f"   📐 Specifications generated: {counts['specs']}")
+    console.print(f"   💻 Projects generated: {counts['projects']}")
+    console.print(f"   🎯 Scenarios generated: {counts['scenarios']}")
+    console.print(f"   🧪 Test suites generated: {counts['test_suites']}")
+    console.print(f"   ⚠️  Skipped: {counts['skipped']} up-to-date outputs")
+    console.print(f"   ❌ Failed: {len(failures)} stage tasks")
+    if first_scenario_at is not None:
+        console.print(f"   ⏱️  First scenarios after {first_scenario_at:.1f}s, total {total_time:.1f}s")
+    else:
+        console.print(f"   ⏱️  Total {total_time:.1f}s")
+    
+    if failures:
+        console.print(f"\n⚠️  [yellow]Failed tasks:[/yellow]")
+        for failed in failures[:5]:
+            console.print(f"   • {failed}")
+        if len(failures) > 5:
+            console.print(f"   • ... and {len(failures) - 5} more")
+
+
 if __name__ == '__main__':
     main() 
\ No newline at end of file
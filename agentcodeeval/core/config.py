@@ -26,6 +26,12 @@ class APIConfig:
     default_model_openai: str = "o3"                                  # ✅ Elite: OpenAI o3 (reasoning model)
     default_model_anthropic: str = "claude-sonnet-4-20250514"         # ✅ Elite: Claude Sonnet 4 via AWS Bedrock
     default_model_google: str = "gemini-2.5-pro"                      # ✅ Elite: Gemini 2.5 Pro (latest)
+    
+    # Output token budgets by task (requirements, architecture, implementation,
+    # scenarios, solution); tasks not listed use 'default'
+    max_output_tokens: Dict[str, int] = field(default_factory=lambda: {"default": 4000})
+    # Follow-up requests that resume a response cut off at its token budget
+    max_continuations: int = 2
 
 
 @dataclass
@@ -94,6 +100,9 @@ class BenchmarkConfig:
         "expert": (200000, 500000)
     })
     
+    # Tiers whose contexts are packed at function level (signatures kept, bodies by relevance)
+    chunked_context_tiers: List[str] = field(default_factory=lambda: ["expert"])
+    
     # Information coverage requirements
     min_information_coverage: float = 0.7
     target_information_coverage: Dict[str, float] = field(default_factory=lambda: {
@@ -130,6 +139,12 @@ class EvaluationConfig:
     task_timeout: int = 300
     session_timeout: int = 1800
     
+    # Extra files retrieved (BM25) into solution prompts; 0 keeps scenario contexts as generated
+    retrieval_top_k: int = 0
+    
+    # JSONL file raw solution responses are recorded to (parser benchmark corpus); None disables
+    response_corpus: Optional[str] = None
+    
     # Validation settings
     human_validation_ratio: float = 0.05  # 5% manual validation
     inter_rater_agreement_threshold: float = 0.8
@@ -213,6 +228,8 @@ class Config:
                 'default_model_openai': self.api.default_model_openai,
                 'default_model_anthropic': self.api.default_model_anthropic,
                 'default_model_google': self.api.default_model_google,
+                'max_output_tokens': self.api.max_output_tokens,
+                'max_continuations': self.api.max_continuations,
             },
             'data': {
                 'output_dir': self.data.output_dir,
@@ -234,12 +251,15 @@ class Config:
                 'context_ranges': self.benchmark.context_ranges,
                 'min_information_coverage': self.benchmark.min_information_coverage,
                 'target_information_coverage': self.benchmark.target_information_coverage,
+                'chunked_context_tiers': self.benchmark.chunked_context_tiers,
             },
             'evaluation': {
                 'metric_weights': self.evaluation.metric_weights,
                 'score_thresholds': self.evaluation.score_thresholds,
                 'task_timeout': self.evaluation.task_timeout,
                 'session_timeout': self.evaluation.session_timeout,
+                'retrieval_top_k': self.evaluation.retrieval_top_k,
+                'response_corpus': self.evaluation.response_corpus,
                 'human_validation_ratio': self.evaluation.human_validation_ratio,
                 'inter_rater_agreement_threshold': self.evaluation.inter_rater_agreement_threshold,
             }
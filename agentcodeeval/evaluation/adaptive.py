@@ -0,0 +1,172 @@
+"""
+Adaptive (early-stopping) evaluation for AgentCodeEval
+
+Instead of running every model on every scenario, scenarios are drawn in
+batches from a stratified sample over (task_category, difficulty). After
+each batch the running mean and a normal-approximation confidence interval
+are updated per model, and evaluation stops once the model ranking is
+settled or every interval is narrower than a target width.
+
+All models are evaluated on the same scenarios, so ranking decisions use
+paired score differences, which are far less noisy than comparing the
+per-model intervals directly.
+"""
+
+import math
+import random
+from collections import defaultdict
+from dataclasses import dataclass, field
+from statistics import NormalDist
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class RunningStats:
+    """Running mean/variance using Welford's online algorithm"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std_error(self) -> float:
+        return math.sqrt(self.variance / self.count) if self.count > 1 else float('inf')
+
+    def half_width(self, z: float) -> float:
+        """Half-width of the confidence interval for the mean"""
+        return z * self.std_error
+
+
+def stratified_order(scenarios: List[Dict[str, Any]], seed: int = 42) -> List[Dict[str, Any]]:
+    """Order scenarios so that every prefix is a proportional stratified sample.
+
+    Scenarios are grouped by (task_category, difficulty) and shuffled within
+    each stratum; the next scenario is always taken from the stratum that is
+    furthest below its proportional share of the prefix drawn so far.
+    """
+    rng = random.Random(seed)
+
+    strata: Dict[Tuple[str, str], List[Dict[str, Any]]] = defaultdict(list)
+    for scenario in scenarios:
+        strata[(scenario.get('task_category', 'unknown'), scenario.get('difficulty', 'unknown'))].append(scenario)
+
+    keys = sorted(strata)
+    for key in keys:
+        rng.shuffle(strata[key])
+
+    total = len(scenarios)
+    drawn = {key: 0 for key in keys}
+    ordered = []
+
+    for position in range(1, total + 1):
+        best_key = max(
+            (key for key in keys if drawn[key] < len(strata[key])),
+            key=lambda key: position * len(strata[key]) / total - drawn[key]
+        )
+        ordered.append(strata[best_key][drawn[best_key]])
+        drawn[best_key] += 1
+
+    return ordered
+
+
+@dataclass
+class AdaptiveReport:
+    """Outcome of an adaptive evaluation run"""
+    scenarios_evaluated: int
+    scenarios_available: int
+    stop_reason: str
+    confidence: float
+    model_intervals: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    ranking: List[str] = field(default_factory=list)
+
+    @property
+    def savings(self) -> float:
+        """Fraction of the scenario pool that did not need to be evaluated"""
+        if not self.scenarios_available:
+            return 0.0
+        return 1.0 - self.scenarios_evaluated / self.scenarios_available
+
+
+class AdaptiveStopping:
+    """Sequential stopping rule over per-model running statistics"""
+
+    def __init__(self, model_names: List[str], confidence: float = 0.95,
+                 target_ci_width: Optional[float] = 0.05, min_scenarios: int = 30):
+        self.model_names = list(model_names)
+        self.confidence = confidence
+        self.target_ci_width = target_ci_width
+        self.min_scenarios = min_scenarios
+
+        self.stats: Dict[str, RunningStats] = {name: RunningStats() for name in self.model_names}
+        self.scores: Dict[str, Dict[str, float]] = {name: {} for name in self.model_names}
+
+        self._z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        # Bonferroni correction across the adjacent comparisons of the ranking
+        comparisons = max(1, len(self.model_names) - 1)
+        self._z_pairwise = NormalDist().inv_cdf(1 - (1 - confidence) / (2 * comparisons))
+
+    def add(self, model_name: str, scenario_id: str, score: float) -> None:
+        self.stats[model_name].add(score)
+        self.scores[model_name][scenario_id] = score
+
+    def ranking(self) -> List[str]:
+        return sorted(self.model_names, key=lambda name: self.stats[name].mean, reverse=True)
+
+    def intervals(self) -> Dict[str, Dict[str, float]]:
+        intervals = {}
+        for name, stats in self.stats.items():
+            half_width = stats.half_width(self._z)
+            intervals[name] = {
+                'n': stats.count,
+                'mean': stats.mean,
+                'lower': stats.mean - half_width,
+                'upper': stats.mean + half_width,
+                'width': 2 * half_width
+            }
+        return intervals
+
+    def _paired_difference(self, better: str, worse: str) -> RunningStats:
+        diff = RunningStats()
+        worse_scores = self.scores[worse]
+        for scenario_id, score in self.scores[better].items():
+            if scenario_id in worse_scores:
+                diff.add(score - worse_scores[scenario_id])
+        return diff
+
+    def ranking_settled(self) -> bool:
+        """True when every adjacent pair in the ranking differs significantly"""
+        if len(self.model_names) < 2:
+            return False
+
+        ranking = self.ranking()
+        for better, worse in zip(ranking, ranking[1:]):
+            diff = self._paired_difference(better, worse)
+            if diff.count < self.min_scenarios or diff.mean - diff.half_width(self._z_pairwise) <= 0:
+                return False
+        return True
+
+    def width_reached(self) -> bool:
+        """True when every model's confidence interval is narrower than the target"""
+        if self.target_ci_width is None:
+            return False
+        return all(
+            stats.count >= self.min_scenarios and 2 * stats.half_width(self._z) <= self.target_ci_width
+            for stats in self.stats.values()
+        )
+
+    def stop_reason(self) -> Optional[str]:
+        if self.ranking_settled():
+            return "ranking settled"
+        if self.width_reached():
+            return f"CI width below {self.target_ci_width}"
+        return None
@@ -0,0 +1,143 @@
+"""
+Distributed evaluation support for AgentCodeEval
+
+This module provides deterministic sharding of (model, scenario) pairs and
+append-only result journals, so a large evaluation run can be split across
+several processes or hosts and merged back into a single results file.
+"""
+
+import hashlib
+import json
+import logging
+from collections import Counter
+from dataclasses import asdict, fields
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def parse_shard_spec(spec: str) -> Tuple[int, int]:
+    """Parse a shard specification of the form ``i/N`` (0-based index)"""
+    try:
+        index_str, count_str = spec.split('/', 1)
+        index, count = int(index_str), int(count_str)
+    except ValueError:
+        raise ValueError(f"Invalid shard specification '{spec}', expected i/N (e.g. 0/4)")
+
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Invalid shard specification '{spec}': index must satisfy 0 <= i < N")
+
+    return index, count
+
+
+def shard_for_pair(model_name: str, scenario_id: str, shard_count: int) -> int:
+    """Return the shard a (model, scenario) pair belongs to.
+
+    Uses a stable content hash rather than Python's randomized ``hash()`` so
+    every host computes the same partition.
+    """
+    digest = hashlib.sha1(f"{model_name}\x00{scenario_id}".encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') % shard_count
+
+
+def in_shard(model_name: str, scenario_id: str, shard: Optional[Tuple[int, int]]) -> bool:
+    """Check whether a (model, scenario) pair should be evaluated by this shard"""
+    if shard is None:
+        return True
+    index, count = shard
+    return shard_for_pair(model_name, scenario_id, count) == index
+
+
+class ResultJournal:
+    """Append-only JSONL journal of ``ModelEvaluationResult`` records"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def append(self, result) -> None:
+        """Append a single evaluation result and flush it to disk"""
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(asdict(result)) + '\n')
+            f.flush()
+
+    def load(self) -> List[Dict]:
+        """Load all records from the journal, skipping torn or corrupt lines"""
+        records = []
+        if not self.path.exists():
+            return records
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line_num, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # A shard killed mid-write leaves a partial last line
+                    logger.warning(f"Skipping corrupt journal line {line_num} in {self.path}")
+
+        return records
+
+
+def merge_journal_records(records: Iterable[Dict]) -> Dict[str, List]:
+    """Combine journal records into the ``{model: [ModelEvaluationResult]}`` shape.
+
+    If the same (model, scenario) pair appears more than once (e.g. a shard
+    was re-run), the last record wins. Records scored by a different
+    ``SCORING_VERSION`` (unstamped records are version 1) are skipped, since
+    their scores are not comparable. So are records whose syntax backend
+    differs from the rest: when shards used different backends, the records
+    of this host's backend are kept if there are any, else the most common.
+    """
+    from .evaluator import ModelEvaluationResult
+    from ..analysis.syntax_tree import syntax_backend
+    from ..generation.validation_framework import SCORING_VERSION
+
+    field_names = {f.name for f in fields(ModelEvaluationResult)}
+    latest: Dict[Tuple[str, str], ModelEvaluationResult] = {}
+    outdated = 0
+
+    current = []
+    for record in records:
+        if record.get('scoring_version', 1) != SCORING_VERSION:
+            outdated += 1
+            continue
+        current.append(record)
+
+    if outdated:
+        logger.warning(f"Skipped {outdated} records scored by another scoring version "
+                       f"(current: {SCORING_VERSION}); re-run those evaluations")
+
+    backends = Counter(record.get('scoring_backend') for record in current)
+    if len(backends) > 1:
+        backend = syntax_backend()
+        if backend not in backends:
+            backend = backends.most_common(1)[0][0]
+        skipped = sum(count for other, count in backends.items() if other != backend)
+        logger.warning(f"Skipped {skipped} records scored with another syntax backend "
+                       f"(kept: {backend}; found: {dict(backends)}); re-run those evaluations "
+                       f"on a host with the same backend")
+        current = [record for record in current if record.get('scoring_backend') == backend]
+
+    for record in current:
+        result = ModelEvaluationResult(**{k: v for k, v in record.items() if k in field_names})
+        latest[(result.model_name, result.scenario_id)] = result
+
+    results: Dict[str, List] = {}
+    for (model_name, _), result in sorted(latest.items()):
+        results.setdefault(model_name, []).append(result)
+
+    return results
+
+
+def load_journals(journal_paths: Iterable[Path]) -> Dict[str, List]:
+    """Load and merge several shard journals"""
+    records = []
+    for path in journal_paths:
+        journal_records = ResultJournal(path).load()
+        logger.info(f"Loaded {len(journal_records)} records from {path}")
+        records.extend(journal_records)
+    return merge_journal_records(records)
@@ -8,9 +8,10 @@ on agent-specific development tasks using our automated validation framework.
 import asyncio
 import json
 import time
+from collections import OrderedDict
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Tuple
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 import logging
 from datetime import datetime
 
@@ -21,13 +22,51 @@ from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskID
 
 from ..core.config import Config
 from ..core.task import TaskCategory, DifficultyLevel
-from ..generation.validation_framework import AutomatedValidator, ValidationResult
+from ..analysis.lexical_index import LexicalIndex
+from ..analysis.syntax_tree import syntax_backend
+from ..generation.validation_framework import AutomatedValidator, ValidationResult, SCORING_VERSION
 from ..generation.synthetic_generator import MultiLLMGenerator
-from ..utils.llm_parsing import parse_llm_response
+from ..generation.context_packer import render_file
+from ..utils.llm_parsing import StreamingFileExtractor, get_response_parser, parse_llm_response, response_is_truncated
+from ..utils.parse_corpus import ResponseCorpus
+from .adaptive import AdaptiveReport, AdaptiveStopping, stratified_order
+from .distributed import ResultJournal, in_shard
+from .work_queue import WorkQueue, default_worker_id
 
 logger = logging.getLogger(__name__)
 console = Console()
 
+# Number of scenario prompt prefixes kept in memory; expert-tier prefixes
+# can be close to a megabyte each
+PROMPT_PREFIX_CACHE_SIZE = 64
+
+SOLUTION_INSTRUCTIONS = """**CRITICAL INSTRUCTIONS**:
+1. You MUST respond with valid JSON in the exact format shown below
+2. Each file MUST contain complete, syntactically correct Go code
+3. Do NOT truncate your response - provide the complete solution
+4. Use proper Go imports, error handling, and best practices
+
+**REQUIRED RESPONSE FORMAT**:
+```json
+{
+    "approach": "Your solution strategy (keep under 200 words)",
+    "files": {
+        "main.go": "package main\\n\\nimport \\"fmt\\"\\n\\nfunc main() {\\n    fmt.Println(\\"Hello\\")\\n}",
+        "utils.go": "package main\\n\\n// Additional file content if needed"
+    },
+    "explanation": "Implementation details (keep under 300 words)"
+}
+```
+
+**VALIDATION CHECKLIST**:
+- ✅ Response is valid JSON wrapped in ```json blocks
+- ✅ All strings are properly escaped (\\n for newlines, \\" for quotes)
+- ✅ Each file contains complete Go code with package declaration
+- ✅ Code compiles and addresses all requirements
+- ✅ Response is complete (not truncated)
+
+Generate your response now:"""
+
 
 @dataclass
 class ModelEvaluationResult:
@@ -54,6 +93,8 @@ class ModelEvaluationResult:
     # Detailed breakdown
     detailed_results: Dict[str, Any]
     timestamp: str
+    scoring_version: int = SCORING_VERSION
+    scoring_backend: str = field(default_factory=syntax_backend)
 
 
 @dataclass
@@ -90,6 +131,16 @@ class AgentEvaluator:
         self.llm_generator = MultiLLMGenerator(config)
         self.results: List[ModelEvaluationResult] = []
         
+        # Materialized prompt prefixes, shared across models and retries (LRU)
+        self._prompt_prefix_cache: OrderedDict[str, str] = OrderedDict()
+        
+        # Per-project BM25 indexes for retrieving related files (retrieval_top_k)
+        self._lexical_indexes: Dict[str, LexicalIndex] = {}
+        
+        # Raw responses recorded for parser benchmarks (evaluation.response_corpus)
+        corpus_path = config.evaluation.response_corpus
+        self.response_corpus = ResponseCorpus(Path(corpus_path)) if corpus_path else None
+        
     async def evaluate_model_on_scenario(self, model_name: str, scenario: Dict[str, Any]) -> Optional[ModelEvaluationResult]:
         """Evaluate a single model on a single scenario"""
         
@@ -110,8 +161,8 @@ class AgentEvaluator:
             total_lines = sum(len(code.split('\n')) for code in solution_code.values())
             parsing_success = code_files_count > 0 and total_lines > 5  # Minimum viable solution
             
-            # Generate test suite for this scenario
-            test_suite = await self.validator.generate_test_suite(scenario)
+            # Test suite for this scenario (generated once, shared across models)
+            test_suite = await self.validator.get_test_suite(scenario)
             
             # Validate the solution using our framework
             validation_result = await self.validator.validate_solution(
@@ -149,19 +200,33 @@ class AgentEvaluator:
 
     async def evaluate_models(self, model_names: List[str], scenarios: List[Dict[str, Any]], 
                             task_categories: Optional[List[str]] = None,
-                            difficulty_levels: Optional[List[str]] = None) -> Dict[str, List[ModelEvaluationResult]]:
-        """Evaluate multiple models on multiple scenarios"""
+                            difficulty_levels: Optional[List[str]] = None,
+                            shard: Optional[Tuple[int, int]] = None,
+                            journal: Optional[ResultJournal] = None) -> Dict[str, List[ModelEvaluationResult]]:
+        """Evaluate multiple models on multiple scenarios
+        
+        When ``shard`` is given as ``(index, count)``, only the (model, scenario)
+        pairs hashed to that shard are evaluated. Each completed result is
+        appended to ``journal`` (if provided) so shards can be merged later.
+        """
         
         # Filter scenarios based on criteria
         filtered_scenarios = self._filter_scenarios(scenarios, task_categories, difficulty_levels)
         
         console.print(f"🎯 Evaluating {len(model_names)} models on {len(filtered_scenarios)} scenarios")
+        if shard:
+            console.print(f"🧩 Shard {shard[0]}/{shard[1]}: evaluating only this shard's (model, scenario) pairs")
         
         results = {}
         
         for model_name in model_names:
             console.print(f"\n🤖 Evaluating model: [bold]{model_name}[/bold]")
             
+            model_scenarios = [
+                s for s in filtered_scenarios
+                if in_shard(model_name, s.get('id', 'unknown'), shard)
+            ]
+            
             model_results = []
             failed_count = 0
             
@@ -174,9 +239,9 @@ class AgentEvaluator:
                 console=console
             ) as progress:
                 
-                task = progress.add_task(f"Evaluating {model_name}", total=len(filtered_scenarios))
+                task = progress.add_task(f"Evaluating {model_name}", total=len(model_scenarios))
                 
-                for i, scenario in enumerate(filtered_scenarios):
+                for i, scenario in enumerate(model_scenarios):
                     scenario_title = scenario.get('title', 'Unknown')[:50]
                     progress.update(task, description=f"🧪 {scenario_title}...")
                     
@@ -184,6 +249,8 @@ class AgentEvaluator:
                     
                     if result:
                         model_results.append(result)
+                        if journal:
+                            journal.append(result)
                         grade = self._get_letter_grade(result.total_score)
                         console.print(f"  ✅ {scenario_title}: {result.total_score:.3f} ({grade})")
                     else:
@@ -201,6 +268,79 @@ class AgentEvaluator:
         
         return results
 
+    async def evaluate_models_adaptive(self, model_names: List[str], scenarios: List[Dict[str, Any]],
+                                       task_categories: Optional[List[str]] = None,
+                                       difficulty_levels: Optional[List[str]] = None,
+                                       target_ci_width: Optional[float] = 0.05,
+                                       confidence: float = 0.95,
+                                       batch_size: int = 50,
+                                       min_scenarios: int = 30,
+                                       max_scenarios: Optional[int] = None,
+                                       seed: int = 42,
+                                       journal: Optional[ResultJournal] = None
+                                       ) -> Tuple[Dict[str, List[ModelEvaluationResult]], AdaptiveReport]:
+        """Evaluate models on a stratified sample of scenarios, stopping early
+        
+        Scenarios are drawn in batches (stratified by task category and
+        difficulty) and every model is run on each batch. Evaluation stops as
+        soon as the ranking is statistically settled or every model's
+        confidence interval is narrower than ``target_ci_width``.
+        """
+        
+        filtered_scenarios = self._filter_scenarios(scenarios, task_categories, difficulty_levels)
+        ordered = stratified_order(filtered_scenarios, seed=seed)
+        if max_scenarios:
+            ordered = ordered[:max_scenarios]
+        
+        console.print(f"🎯 Adaptive evaluation of {len(model_names)} models on up to {len(ordered)} of "
+                      f"{len(filtered_scenarios)} scenarios (batch {batch_size}, {confidence:.0%} confidence)")
+        
+        stopping = AdaptiveStopping(model_names, confidence=confidence,
+                                    target_ci_width=target_ci_width, min_scenarios=min_scenarios)
+        results = {model_name: [] for model_name in model_names}
+        stop_reason = "scenario pool exhausted"
+        evaluated = 0
+        
+        for batch_start in range(0, len(ordered), batch_size):
+            batch = ordered[batch_start:batch_start + batch_size]
+            
+            for model_name in model_names:
+                for scenario in batch:
+                    result = await self.evaluate_model_on_scenario(model_name, scenario)
+                    if result:
+                        results[model_name].append(result)
+                        stopping.add(model_name, result.scenario_id, result.total_score)
+                        if journal:
+                            journal.append(result)
+            
+            evaluated += len(batch)
+            
+            intervals = stopping.intervals()
+            progress_line = ", ".join(
+                f"{name} {intervals[name]['mean']:.3f}±{intervals[name]['width'] / 2:.3f}"
+                for name in stopping.ranking()
+            )
+            console.print(f"  📈 {evaluated} scenarios: {progress_line}")
+            
+            reason = stopping.stop_reason()
+            if reason:
+                stop_reason = reason
+                break
+        
+        report = AdaptiveReport(
+            scenarios_evaluated=evaluated,
+            scenarios_available=len(filtered_scenarios),
+            stop_reason=stop_reason,
+            confidence=confidence,
+            model_intervals=stopping.intervals(),
+            ranking=stopping.ranking()
+        )
+        
+        console.print(f"🛑 Stopped after {evaluated}/{len(filtered_scenarios)} scenarios: {stop_reason} "
+                      f"({report.savings:.0%} of evaluations saved)")
+        
+        return results, report
+
     def generate_evaluation_summary(self, results: Dict[str, List[ModelEvaluationResult]]) -> Dict[str, EvaluationSummary]:
         """Generate comprehensive evaluation summaries"""
         
@@ -320,7 +460,7 @@ class AgentEvaluator:
 
     def save_results(self, results: Dict[str, List[ModelEvaluationResult]], 
                     summaries: Dict[str, EvaluationSummary], 
-                    output_file: Path):
+                    output_file: Path, adaptive_report: Optional[AdaptiveReport] = None):
         """Save comprehensive evaluation results to file"""
         
         # Calculate additional analytics
@@ -359,6 +499,8 @@ class AgentEvaluator:
             'metadata': {
                 'evaluation_timestamp': datetime.now().isoformat(),
                 'framework_version': '1.0.0',
+                'scoring_version': SCORING_VERSION,
+                'scoring_backend': syntax_backend(),
                 'config_file': str(self.config.config_path) if hasattr(self.config, 'config_path') else 'default',
                 'total_models': len(results),
                 'total_scenarios': sum(len(model_results) for model_results in results.values()),
@@ -372,7 +514,10 @@ class AgentEvaluator:
                 'system_info': {
                     'total_evaluation_time': sum(s.total_evaluation_time for s in summaries.values()),
                     'avg_parsing_success_rate': sum(s.parsing_success_rate for s in summaries.values()) / len(summaries) if summaries else 0
-                }
+                },
+                'adaptive': (
+                    {**asdict(adaptive_report), 'savings': adaptive_report.savings} if adaptive_report else None
+                )
             },
             'configuration': {
                 'api_settings': {
@@ -441,44 +586,9 @@ class AgentEvaluator:
     async def _generate_solution(self, model_name: str, scenario: Dict[str, Any]) -> Optional[Dict[str, str]]:
         """Generate solution using specified model with enhanced prompts and retry logic"""
         
-        # Create enhanced solution prompt (proven to work in testing)
-        solution_prompt = f"""You are an expert Go software engineer. Your task is to provide a complete, working solution.
-
-**TASK**: {scenario.get('title', 'Development Task')}
-
-**DESCRIPTION**: {scenario.get('description', '')}
-
-**REQUIREMENTS**: 
-{scenario.get('task_prompt', '')}
-
-**CONTEXT FILES**: {', '.join(scenario.get('context_files', []))}
-
-**CRITICAL INSTRUCTIONS**:
-1. You MUST respond with valid JSON in the exact format shown below
-2. Each file MUST contain complete, syntactically correct Go code
-3. Do NOT truncate your response - provide the complete solution
-4. Use proper Go imports, error handling, and best practices
-
-**REQUIRED RESPONSE FORMAT**:
-```json
-{{
-    "approach": "Your solution strategy (keep under 200 words)",
-    "files": {{
-        "main.go": "package main\\n\\nimport \\"fmt\\"\\n\\nfunc main() {{\\n    fmt.Println(\\"Hello\\")\\n}}",
-        "utils.go": "package main\\n\\n// Additional file content if needed"
-    }},
-    "explanation": "Implementation details (keep under 300 words)"
-}}
-```
-
-**VALIDATION CHECKLIST**:
-- ✅ Response is valid JSON wrapped in ```json blocks
-- ✅ All strings are properly escaped (\\n for newlines, \\" for quotes)
-- ✅ Each file contains complete Go code with package declaration
-- ✅ Code compiles and addresses all requirements
-- ✅ Response is complete (not truncated)
-
-Generate your response now:"""
+        # Stable scenario prefix (shared across models and retries) + fixed instructions
+        prompt_prefix = self._get_prompt_prefix(scenario)
+        solution_prompt = SOLUTION_INSTRUCTIONS
 
         # Map model names to our generator keys
         model_key_mapping = {
@@ -492,11 +602,34 @@ Generate your response now:"""
         
         model_key = model_key_mapping.get(model_name.lower(), 'openai')
         
+        # Files are extracted while the response streams in, so each one is
+        # available as soon as its JSON string closes
+        extractor = StreamingFileExtractor()
+        request_start = time.time()
+        first_file_after: List[float] = []
+        
+        def _on_chunk(chunk: Optional[str]):
+            if chunk is None:
+                extractor.reset()
+                first_file_after.clear()
+            elif extractor.feed(chunk) and not first_file_after:
+                first_file_after.append(time.time() - request_start)
+        
         # Retry logic for empty responses
         max_retries = 3
         for attempt in range(max_retries):
             try:
-                response = await self.llm_generator.generate_with_model(model_key, solution_prompt)
+                request_start = time.time()
+                response = await self.llm_generator.generate_with_model(
+                    model_key, solution_prompt, cacheable_prefix=prompt_prefix, on_chunk=_on_chunk,
+                    task="solution", is_truncated=response_is_truncated
+                )
+                
+                if self.response_corpus is not None and response:
+                    try:
+                        self.response_corpus.record(response, model=model_name, scenario_id=scenario.get('id'))
+                    except OSError as e:
+                        logger.warning(f"Could not record response to {self.response_corpus.path}: {e}")
                 
                 # Validate response before parsing
                 if not response or len(response.strip()) < 50:
@@ -507,8 +640,13 @@ Generate your response now:"""
                         logger.error(f"All retry attempts failed for {model_name}")
                         return None
                 
-                # Parse the response using our enhanced parser
-                solution_code = parse_llm_response(response, expected_language='go')
+                if extractor.complete and get_response_parser()._is_viable_result(extractor.files):
+                    # The streamed "files" object closed cleanly with real code; no re-parse needed
+                    solution_code = dict(extractor.files)
+                    logger.debug(f"First file from {model_name} streamed after {first_file_after[0]:.1f}s")
+                else:
+                    # Parse the response using our enhanced parser
+                    solution_code = parse_llm_response(response, expected_language='go')
                 
                 # Validate parsed result
                 if not solution_code:
@@ -540,7 +678,105 @@ Generate your response now:"""
         
         return None
 
-    def _filter_scenarios(self, scenarios: List[Dict[str, Any]], 
+    def _get_prompt_prefix(self, scenario: Dict[str, Any]) -> str:
+        """Build (or reuse) the cacheable part of the solution prompt for a scenario"""
+        
+        scenario_id = scenario.get('id', 'unknown')
+        prefix = self._prompt_prefix_cache.get(scenario_id)
+        if prefix is not None:
+            self._prompt_prefix_cache.move_to_end(scenario_id)
+            return prefix
+        
+        context_contents = self._load_context_contents(scenario)
+        context_sections = []
+        for file_path in scenario.get('context_files', []):
+            content = context_contents.get(file_path)
+            if content is None:
+                continue
+            language = Path(file_path).suffix.lstrip('.')
+            context_sections.append(f"### {file_path}\n```{language}\n{content}\n```")
+        
+        prefix = f"""You are an expert Go software engineer. Your task is to provide a complete, working solution.
+
+**TASK**: {scenario.get('title', 'Development Task')}
+
+**DESCRIPTION**: {scenario.get('description', '')}
+
+**REQUIREMENTS**: 
+{scenario.get('task_prompt', '')}
+
+**CONTEXT FILES**: {', '.join(scenario.get('context_files', []))}
+"""
+        if context_sections:
+            prefix += "\n" + "\n\n".join(context_sections) + "\n"
+        
+        related_sections = []
+        for file_path, content in self._load_related_contents(scenario).items():
+            language = Path(file_path).suffix.lstrip('.')
+            related_sections.append(f"### {file_path}\n```{language}\n{content}\n```")
+        if related_sections:
+            prefix += "\n**RELATED FILES** (retrieved for this task):\n\n" + "\n\n".join(related_sections) + "\n"
+        
+        self._prompt_prefix_cache[scenario_id] = prefix
+        if len(self._prompt_prefix_cache) > PROMPT_PREFIX_CACHE_SIZE:
+            self._prompt_prefix_cache.popitem(last=False)
+        
+        return prefix
+
+    def _load_context_contents(self, scenario: Dict[str, Any]) -> Dict[str, str]:
+        """Read a scenario's context files from its generated project directory"""
+        
+        project_id = scenario.get('project_id')
+        if not project_id:
+            return {}
+        
+        project_dir = Path(self.config.data.generated_dir) / project_id
+        context_chunks = scenario.get('context_chunks', {})
+        contents = {}
+        for file_path in scenario.get('context_files', []):
+            full_path = project_dir / file_path
+            try:
+                with open(full_path, 'r', encoding='utf-8') as f:
+                    contents[file_path] = f.read()
+            except OSError as e:
+                logger.warning(f"Could not read context file {full_path}: {e}")
+                continue
+            
+            # Function-level packed scenarios show elided bodies as generated
+            if file_path in context_chunks:
+                contents[file_path] = render_file(contents[file_path], context_chunks[file_path], file_path)
+        
+        return contents
+
+    def _load_related_contents(self, scenario: Dict[str, Any]) -> Dict[str, str]:
+        """Read the top ``retrieval_top_k`` project files matching the task, beyond its context files"""
+        
+        top_k = self.config.evaluation.retrieval_top_k
+        project_id = scenario.get('project_id')
+        if top_k <= 0 or not project_id:
+            return {}
+        
+        project_dir = Path(self.config.data.generated_dir) / project_id
+        index = self._lexical_indexes.get(project_id)
+        if index is None:
+            index = LexicalIndex.open(project_dir)
+            self._lexical_indexes[project_id] = index
+        if not len(index):
+            return {}
+        
+        query = " ".join(str(scenario.get(key, '')) for key in ('title', 'description', 'task_prompt'))
+        contents = {}
+        for file_path, _ in index.search(query, top_k=top_k, exclude=scenario.get('context_files', [])):
+            try:
+                with open(project_dir / file_path, 'r', encoding='utf-8') as f:
+                    contents[file_path] = f.read()
+            except OSError as e:
+                logger.warning(f"Could not read related file {project_dir / file_path}: {e}")
+        
+        return contents
+
+    @staticmethod
+    def _filter_scenarios(scenarios: List[Dict[str, Any]], 
                          task_categories: Optional[List[str]], 
                          difficulty_levels: Optional[List[str]]) -> List[Dict[str, Any]]:
         """Filter scenarios based on criteria"""
@@ -600,28 +836,50 @@ Generate your response now:"""
             console.print(category_table)
 
 
+def load_scenarios(config: Config) -> List[Dict[str, Any]]:
+    """Load all Phase 3 scenarios from the scenarios directory"""
+    
+    scenarios_dir = Path(config.data.output_dir) / "scenarios"
+    if not scenarios_dir.exists():
+        raise FileNotFoundError("No scenarios found. Run Phase 3 first!")
+    
+    # Sort files so every shard sees scenarios in the same order
+    all_scenarios = []
+    for scenario_file in sorted(scenarios_dir.glob("*.json")):
+        with open(scenario_file, 'r') as f:
+            scenario_data = json.load(f)
+        
+        # Record the source project so context files can be read at evaluation time
+        project_id = scenario_data.get('project_id')
+        for scenario in scenario_data.get('scenarios', []):
+            if project_id:
+                scenario.setdefault('project_id', project_id)
+            all_scenarios.append(scenario)
+    
+    if not all_scenarios:
+        raise ValueError("No scenarios found in scenario files!")
+    
+    return all_scenarios
+
+
 def run_evaluation(config: Config, models: Optional[List[str]] = None, 
                   categories: Optional[List[str]] = None, 
-                  difficulty: Optional[str] = None) -> Dict[str, Any]:
-    """Main evaluation function called by CLI"""
+                  difficulty: Optional[str] = None,
+                  shard: Optional[Tuple[int, int]] = None,
+                  journal_path: Optional[Path] = None,
+                  adaptive: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Main evaluation function called by CLI
+    
+    ``adaptive`` holds keyword arguments for ``evaluate_models_adaptive``;
+    when given, scenarios are sampled until the ranking is settled instead of
+    evaluating the full set.
+    """
     
     async def _async_evaluation():
         evaluator = AgentEvaluator(config)
         
         # Load scenarios from Phase 3
-        scenarios_dir = Path(config.data.output_dir) / "scenarios"
-        if not scenarios_dir.exists():
-            raise FileNotFoundError("No scenarios found. Run Phase 3 first!")
-        
-        # Load all scenarios
-        all_scenarios = []
-        for scenario_file in scenarios_dir.glob("*.json"):
-            with open(scenario_file, 'r') as f:
-                scenario_data = json.load(f)
-                all_scenarios.extend(scenario_data.get('scenarios', []))
-        
-        if not all_scenarios:
-            raise ValueError("No scenarios found in scenario files!")
+        all_scenarios = load_scenarios(config)
         
         # Default models if none specified
         if not models:
@@ -632,10 +890,20 @@ def run_evaluation(config: Config, models: Optional[List[str]] = None,
         # Convert difficulty to list if specified
         difficulty_levels = [difficulty] if difficulty else None
         
+        journal = ResultJournal(journal_path) if journal_path else None
+        
         # Run evaluation
-        results = await evaluator.evaluate_models(
-            available_models, all_scenarios, categories, difficulty_levels
-        )
+        adaptive_report = None
+        if adaptive is not None:
+            results, adaptive_report = await evaluator.evaluate_models_adaptive(
+                available_models, all_scenarios, categories, difficulty_levels,
+                journal=journal, **adaptive
+            )
+        else:
+            results = await evaluator.evaluate_models(
+                available_models, all_scenarios, categories, difficulty_levels,
+                shard=shard, journal=journal
+            )
         
         # Generate summaries
         summaries = evaluator.generate_evaluation_summary(results)
@@ -644,6 +912,7 @@ def run_evaluation(config: Config, models: Optional[List[str]] = None,
             'evaluator': evaluator,
             'results': results,
             'summaries': summaries,
+            'adaptive_report': adaptive_report,
             'success': True
         }
     
@@ -657,4 +926,82 @@ def run_evaluation(config: Config, models: Optional[List[str]] = None,
             'error': str(e),
             'results': {},
             'summaries': {}
-        } 
\ No newline at end of file
+        }
+
+
+def enqueue_evaluation(config: Config, queue_path: Path,
+                       models: Optional[List[str]] = None,
+                       categories: Optional[List[str]] = None,
+                       difficulty: Optional[str] = None) -> Dict[str, int]:
+    """Populate a work queue with (model, scenario) jobs for ``agentcodeeval worker``"""
+    
+    all_scenarios = load_scenarios(config)
+    model_names = list(models) if models else ['openai-o3', 'claude-sonnet-4', 'gemini-2.5-pro']
+    difficulty_levels = [difficulty] if difficulty else None
+    scenarios = AgentEvaluator._filter_scenarios(all_scenarios, categories, difficulty_levels)
+    
+    queue = WorkQueue(queue_path)
+    try:
+        added = queue.enqueue(model_names, scenarios)
+        console.print(f"📥 Enqueued {added} new jobs ({len(model_names)} models × {len(scenarios)} scenarios) in {queue_path}")
+        return queue.stats()
+    finally:
+        queue.close()
+
+
+def run_worker(config: Config, queue_path: Path, worker_id: Optional[str] = None,
+               lease_seconds: float = 600, heartbeat_interval: float = 60,
+               poll_interval: float = 10, max_jobs: Optional[int] = None) -> Dict[str, int]:
+    """Claim and evaluate jobs from a work queue until it is drained"""
+    
+    worker_id = worker_id or default_worker_id()
+    
+    async def _heartbeat(queue: WorkQueue, job_id: str):
+        while True:
+            await asyncio.sleep(heartbeat_interval)
+            if not queue.heartbeat(job_id, worker_id):
+                logger.warning(f"Worker {worker_id} lost the lease on {job_id}")
+                return
+    
+    async def _worker_loop():
+        evaluator = AgentEvaluator(config)
+        queue = WorkQueue(queue_path, lease_seconds=lease_seconds)
+        counts = {'completed': 0, 'failed': 0}
+        
+        console.print(f"👷 Worker {worker_id} consuming {queue_path}")
+        
+        try:
+            while max_jobs is None or counts['completed'] + counts['failed'] < max_jobs:
+                job = queue.claim(worker_id)
+                
+                if job is None:
+                    if queue.is_drained():
+                        break
+                    # Other workers still hold leases; wait in case one of them dies
+                    await asyncio.sleep(poll_interval)
+                    continue
+                
+                scenario_title = job.scenario.get('title', 'Unknown')[:50]
+                console.print(f"🧪 [{job.model_name}] {scenario_title} (attempt {job.attempts})")
+                
+                heartbeat = asyncio.create_task(_heartbeat(queue, job.job_id))
+                try:
+                    result = await evaluator.evaluate_model_on_scenario(job.model_name, job.scenario)
+                finally:
+                    heartbeat.cancel()
+                
+                if result:
+                    queue.complete(job.job_id, worker_id, asdict(result))
+                    counts['completed'] += 1
+                    console.print(f"  ✅ {scenario_title}: {result.total_score:.3f} ({evaluator._get_letter_grade(result.total_score)})")
+                else:
+                    queue.fail(job.job_id, worker_id, "evaluation returned no result")
+                    counts['failed'] += 1
+                    console.print(f"  ❌ {scenario_title}: Failed")
+            
+            console.print(f"📊 Worker {worker_id}: {counts['completed']} completed, {counts['failed']} failed")
+            return counts
+        finally:
+            queue.close()
+    
+    return asyncio.run(_worker_loop())
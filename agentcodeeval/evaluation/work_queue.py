@@ -0,0 +1,217 @@
+"""
+SQLite-backed work queue for multi-worker evaluation
+
+A coordinator enqueues (model, scenario) jobs once; any number of worker
+processes (``agentcodeeval worker``) then claim jobs under a time-limited
+lease, heartbeat while they run, and record the result. Jobs whose lease
+expires (e.g. the worker died) are handed to another worker, up to
+``max_attempts`` times. Expensive jobs are claimed first so very long
+expert-tier scenarios do not end up as stragglers at the tail of a run.
+"""
+
+import json
+import logging
+import os
+import socket
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+JOB_PENDING = 'pending'
+JOB_LEASED = 'leased'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    model_name TEXT NOT NULL,
+    scenario_id TEXT NOT NULL,
+    scenario_json TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker_id TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result_json TEXT,
+    error TEXT,
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs (status, priority DESC);
+"""
+
+
+@dataclass
+class QueueJob:
+    """A claimed (model, scenario) evaluation job"""
+    job_id: str
+    model_name: str
+    scenario: Dict[str, Any]
+    attempts: int
+
+
+def default_worker_id() -> str:
+    """Worker identifier that is unique per host and process"""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class WorkQueue:
+    """Lease-based job queue stored in a single SQLite database file"""
+
+    def __init__(self, db_path: Path, lease_seconds: float = 600, max_attempts: int = 3):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+        # Autocommit mode; write transactions are opened explicitly below
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def enqueue(self, model_names: Iterable[str], scenarios: List[Dict[str, Any]]) -> int:
+        """Add a job for every (model, scenario) pair; existing jobs are left untouched"""
+        now = time.time()
+        rows = []
+        for model_name in model_names:
+            for scenario in scenarios:
+                scenario_id = scenario.get('id', 'unknown')
+                rows.append((
+                    f"{model_name}::{scenario_id}",
+                    model_name,
+                    scenario_id,
+                    json.dumps(scenario),
+                    int(scenario.get('context_length', 0) or 0),
+                    now
+                ))
+
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO jobs (job_id, model_name, scenario_id, scenario_json, priority, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            added = self._conn.total_changes - before
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+
+        return added
+
+    def claim(self, worker_id: str) -> Optional[QueueJob]:
+        """Lease the most expensive pending job, or return None if none is available"""
+        now = time.time()
+
+        # BEGIN IMMEDIATE takes the write lock up front so two workers can
+        # never select the same pending row
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._release_expired(now)
+
+            row = self._conn.execute(
+                "SELECT job_id, model_name, scenario_json, attempts FROM jobs "
+                "WHERE status = ? ORDER BY priority DESC, job_id LIMIT 1",
+                (JOB_PENDING,)
+            ).fetchone()
+
+            if row is None:
+                self._conn.execute("COMMIT")
+                return None
+
+            job_id, model_name, scenario_json, attempts = row
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, worker_id = ?, lease_expires = ?, attempts = ?, updated_at = ? "
+                "WHERE job_id = ?",
+                (JOB_LEASED, worker_id, now + self.lease_seconds, attempts + 1, now, job_id)
+            )
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+
+        return QueueJob(
+            job_id=job_id,
+            model_name=model_name,
+            scenario=json.loads(scenario_json),
+            attempts=attempts + 1
+        )
+
+    def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        """Extend the lease on a job; returns False if the lease was lost"""
+        now = time.time()
+        cursor = self._conn.execute(
+            "UPDATE jobs SET lease_expires = ?, updated_at = ? "
+            "WHERE job_id = ? AND worker_id = ? AND status = ?",
+            (now + self.lease_seconds, now, job_id, worker_id, JOB_LEASED)
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: str, worker_id: str, result: Dict[str, Any]) -> bool:
+        """Record a job's result; ignored if another worker has taken over the lease"""
+        cursor = self._conn.execute(
+            "UPDATE jobs SET status = ?, result_json = ?, error = NULL, lease_expires = NULL, updated_at = ? "
+            "WHERE job_id = ? AND worker_id = ? AND status = ?",
+            (JOB_DONE, json.dumps(result), time.time(), job_id, worker_id, JOB_LEASED)
+        )
+        return cursor.rowcount == 1
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> None:
+        """Return a failed job to the queue, or mark it failed after max_attempts"""
+        self._conn.execute(
+            "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+            "error = ?, worker_id = NULL, lease_expires = NULL, updated_at = ? "
+            "WHERE job_id = ? AND worker_id = ? AND status = ?",
+            (self.max_attempts, JOB_FAILED, JOB_PENDING, error, time.time(), job_id, worker_id, JOB_LEASED)
+        )
+
+    def _release_expired(self, now: float) -> None:
+        """Requeue jobs whose worker stopped heartbeating (caller holds the write lock)"""
+        cursor = self._conn.execute(
+            "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+            "error = 'lease expired', worker_id = NULL, lease_expires = NULL, updated_at = ? "
+            "WHERE status = ? AND lease_expires < ?",
+            (self.max_attempts, JOB_FAILED, JOB_PENDING, now, JOB_LEASED, now)
+        )
+        if cursor.rowcount:
+            logger.warning(f"Released {cursor.rowcount} expired job leases")
+
+    def stats(self) -> Dict[str, int]:
+        """Number of jobs in each state"""
+        counts = {JOB_PENDING: 0, JOB_LEASED: 0, JOB_DONE: 0, JOB_FAILED: 0}
+        for status, count in self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status"):
+            counts[status] = count
+        return counts
+
+    def is_drained(self) -> bool:
+        """True when no job is pending or leased"""
+        counts = self.stats()
+        return counts[JOB_PENDING] == 0 and counts[JOB_LEASED] == 0
+
+    def results(self) -> List[Dict[str, Any]]:
+        """All completed job results, in the journal record format"""
+        return [
+            json.loads(result_json)
+            for (result_json,) in self._conn.execute(
+                "SELECT result_json FROM jobs WHERE status = ? ORDER BY job_id", (JOB_DONE,)
+            )
+        ]
+
+    def failures(self) -> List[Dict[str, Any]]:
+        """Jobs that exhausted their attempts"""
+        return [
+            {'job_id': job_id, 'attempts': attempts, 'error': error}
+            for job_id, attempts, error in self._conn.execute(
+                "SELECT job_id, attempts, error FROM jobs WHERE status = ? ORDER BY job_id", (JOB_FAILED,)
+            )
+        ]
@@ -0,0 +1,109 @@
+"""
+Build manifest for incremental Phase 3/4 regeneration
+
+Each generated output (a Phase 3 scenario file or a Phase 4 test suite file)
+is recorded with a fingerprint of the inputs it was built from: project
+content hashes, generator/prompt versions and the relevant configuration.
+On resume, an output is rebuilt only when it is missing or its input
+fingerprint changed, so editing one project or bumping one prompt version
+regenerates just the affected files.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+MANIFEST_FILE_NAME = "build_manifest.json"
+MANIFEST_FORMAT_VERSION = 1
+
+
+def fingerprint(inputs: Any) -> str:
+    """Stable SHA-1 of JSON-serializable inputs"""
+    payload = json.dumps(inputs, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def file_digest(path: Path) -> str:
+    """SHA-1 of a file's bytes"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    """Input fingerprints of generated outputs, grouped by section (phase)
+
+    Output paths are stored relative to the manifest's directory, so the
+    output tree can be moved as a whole.
+    """
+
+    def __init__(self, manifest_path: Path):
+        self.manifest_path = Path(manifest_path)
+        self.root = self.manifest_path.parent
+        self._sections: Dict[str, Dict[str, Dict[str, Any]]] = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        try:
+            with open(self.manifest_path, 'r') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable build manifest {self.manifest_path}: {e}")
+            return {}
+        if data.get('version') != MANIFEST_FORMAT_VERSION:
+            return {}
+        return data.get('sections', {})
+
+    def _key(self, output: Path) -> str:
+        output = Path(output)
+        try:
+            return output.resolve().relative_to(self.root.resolve()).as_posix()
+        except ValueError:
+            return str(output.resolve())
+
+    def status(self, section: str, output: Path, inputs_hash: str) -> str:
+        """'current', 'stale', 'untracked' (exists, never recorded) or 'missing'"""
+        if not Path(output).exists():
+            return 'missing'
+        record = self._sections.get(section, {}).get(self._key(output))
+        if record is None:
+            return 'untracked'
+        return 'current' if record['inputs'] == inputs_hash else 'stale'
+
+    def record(self, section: str, output: Path, inputs_hash: str, save: bool = True):
+        """Record that ``output`` was built from inputs with this fingerprint"""
+        self._sections.setdefault(section, {})[self._key(output)] = {'inputs': inputs_hash}
+        if save:
+            self.save()
+
+    def invalidate(self, section: str, output: Path, save: bool = True):
+        """Mark ``output`` stale so the next run rebuilds it even though its inputs are unchanged"""
+        self._sections.setdefault(section, {})[self._key(output)] = {'inputs': None}
+        if save:
+            self.save()
+
+    def forget(self, section: str, output: Path, save: bool = True):
+        self._sections.get(section, {}).pop(self._key(output), None)
+        if save:
+            self.save()
+
+    def tracked_outputs(self, section: str) -> List[Path]:
+        """Outputs recorded in a section (whether or not they still exist)"""
+        return [self.root / key for key in self._sections.get(section, {})]
+
+    def save(self):
+        """Write the manifest atomically"""
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_name(f"{self.manifest_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': MANIFEST_FORMAT_VERSION, 'sections': self._sections}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
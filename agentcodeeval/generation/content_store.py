@@ -0,0 +1,165 @@
+"""
+Packed, memory-mapped file content store for generated projects
+
+Phase 3 generates scenarios for every task category of a project, and each
+category task needs the project's source files. Instead of re-reading and
+holding every file per task, the files of a project are packed once into a
+single ``content.pack`` file with a JSON offsets index under
+``<project>/.ace_cache/``. The pack is memory-mapped and shared by all tasks;
+file contents are sliced zero-copy as ``memoryview`` and only decoded to
+``str`` when a caller actually needs the text.
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+CACHE_DIR_NAME = ".ace_cache"
+PACK_FILE_NAME = "content.pack"
+INDEX_FILE_NAME = "content_index.json"
+STORE_FORMAT_VERSION = 1
+
+
+class ProjectContentStore(Mapping):
+    """Read-only ``{relative_path: content}`` mapping backed by a memory-mapped pack"""
+
+    def __init__(self, pack_path: Path, index: Dict[str, Dict[str, Any]]):
+        self.pack_path = Path(pack_path)
+        self._index = index
+        self._file = None
+        self._mmap: Optional[mmap.mmap] = None
+
+        if any(entry['length'] for entry in index.values()):
+            self._file = open(self.pack_path, 'rb')
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @classmethod
+    def open(cls, project_dir: Path, relative_paths: List[str]) -> 'ProjectContentStore':
+        """Open the project's content store, (re)building it if any file changed"""
+        project_dir = Path(project_dir)
+        cache_dir = project_dir / CACHE_DIR_NAME
+        pack_path = cache_dir / PACK_FILE_NAME
+        index_path = cache_dir / INDEX_FILE_NAME
+
+        file_stats = {}
+        for relative_path in relative_paths:
+            try:
+                stat = (project_dir / relative_path).stat()
+            except OSError:
+                continue
+            file_stats[relative_path] = (stat.st_size, stat.st_mtime_ns)
+
+        index = cls._load_index(index_path)
+        if index is None or not pack_path.exists() or not cls._index_matches(index, file_stats):
+            index = cls._build(project_dir, file_stats, pack_path, index_path)
+
+        return cls(pack_path, index)
+
+    @staticmethod
+    def _load_index(index_path: Path) -> Optional[Dict[str, Dict[str, Any]]]:
+        try:
+            with open(index_path, 'r') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if data.get('version') != STORE_FORMAT_VERSION:
+            return None
+        return data.get('files', {})
+
+    @staticmethod
+    def _index_matches(index: Dict[str, Dict[str, Any]], file_stats: Dict[str, tuple]) -> bool:
+        if index.keys() != file_stats.keys():
+            return False
+        return all(
+            (entry['source_size'], entry['source_mtime_ns']) == file_stats[path]
+            for path, entry in index.items()
+        )
+
+    @staticmethod
+    def _build(project_dir: Path, file_stats: Dict[str, tuple], pack_path: Path,
+               index_path: Path) -> Dict[str, Dict[str, Any]]:
+        """Write the pack and its index atomically (temp files + rename)"""
+        pack_path.parent.mkdir(parents=True, exist_ok=True)
+        index = {}
+        offset = 0
+
+        tmp_pack = pack_path.with_name(f"{pack_path.name}.{os.getpid()}.tmp")
+        with open(tmp_pack, 'wb') as pack:
+            for relative_path in sorted(file_stats):
+                try:
+                    data = (project_dir / relative_path).read_bytes()
+                    data.decode('utf-8')
+                except (OSError, UnicodeDecodeError) as e:
+                    logger.warning(f"Could not read file {project_dir / relative_path}: {e}")
+                    continue
+
+                pack.write(data)
+                size, mtime_ns = file_stats[relative_path]
+                index[relative_path] = {
+                    'offset': offset,
+                    'length': len(data),
+                    'sha1': hashlib.sha1(data).hexdigest(),
+                    'source_size': size,
+                    'source_mtime_ns': mtime_ns
+                }
+                offset += len(data)
+
+        tmp_index = index_path.with_name(f"{index_path.name}.{os.getpid()}.tmp")
+        with open(tmp_index, 'w') as f:
+            json.dump({'version': STORE_FORMAT_VERSION, 'files': index}, f)
+
+        os.replace(tmp_pack, pack_path)
+        os.replace(tmp_index, index_path)
+
+        logger.info(f"Packed {len(index)} files ({offset:,} bytes) into {pack_path}")
+        return index
+
+    def view(self, path: str) -> memoryview:
+        """Zero-copy view of a file's UTF-8 bytes"""
+        entry = self._index[path]
+        if not entry['length']:
+            return memoryview(b'')
+        return memoryview(self._mmap)[entry['offset']:entry['offset'] + entry['length']]
+
+    def size(self, path: str) -> int:
+        """File size in bytes, without touching the content"""
+        return self._index[path]['length']
+
+    def digest(self, path: str) -> str:
+        """SHA-1 of the file's UTF-8 content"""
+        return self._index[path]['sha1']
+
+    def fingerprint(self) -> str:
+        """SHA-1 over all (path, content hash) pairs; changes when any file does"""
+        digest = hashlib.sha1()
+        for path in sorted(self._index):
+            digest.update(f"{path}\0{self._index[path]['sha1']}\n".encode('utf-8'))
+        return digest.hexdigest()
+    
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __getitem__(self, path: str) -> str:
+        return str(self.view(path), 'utf-8')
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, path: object) -> bool:
+        return path in self._index
@@ -0,0 +1,154 @@
+"""
+Symbol-level context packing for large (expert-tier) scenarios
+
+Whole-file inclusion spends much of a 200k+ token budget on function bodies
+that are irrelevant to the task. ``ContextPacker`` splits files into
+function-level chunks (``ASTAnalyzer.extract_chunks``), keeps every
+signature and all module-level code (imports, types, constants) as a
+skeleton, and then restores full bodies in order of BM25 relevance to the
+task until the token budget is spent. Elided bodies are replaced by a
+one-line marker, so more of the project fits in the same window.
+
+The chosen layout is stored with the scenario (``context_chunks``) and
+re-rendered from the project files at evaluation time.
+"""
+
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Optional
+
+from ..analysis.ast_analyzer import CodeChunk, detect_language, get_ast_analyzer
+from ..analysis.lexical_index import LexicalIndex
+from ..utils.tokenizer import TokenCounter, get_token_counter
+
+logger = logging.getLogger(__name__)
+
+
+ELIDED_MARKER = "... body omitted ..."
+
+
+@dataclass
+class PackedContext:
+    """Rendered files plus the chunk layout they were rendered from
+
+    ``layout`` maps each path to ``[start_line, end_line, signature_end, full]``
+    spans covering the file.
+    """
+    files: Dict[str, str] = field(default_factory=dict)
+    layout: Dict[str, List[List[int]]] = field(default_factory=dict)
+    tokens: int = 0
+    full_chunks: int = 0
+    elided_chunks: int = 0
+
+
+def _elision_line(lines: List[str], chunk_start: int, signature_end: int, path: str) -> str:
+    """Marker line indented like the elided body"""
+    body_line = lines[signature_end] if signature_end < len(lines) else ''
+    indent = body_line[:len(body_line) - len(body_line.lstrip())]
+    if not body_line.strip():
+        header = lines[chunk_start - 1]
+        indent = header[:len(header) - len(header.lstrip())] + '    '
+    if detect_language(path) == 'python':
+        return f"{indent}...  # {ELIDED_MARKER}"
+    return f"{indent}// {ELIDED_MARKER}"
+
+
+def render_file(content: str, spans: List[List[int]], path: str) -> str:
+    """Render a file from its chunk layout, eliding bodies of non-full spans"""
+    lines = content.split('\n')
+    rendered = []
+    for start, end, signature_end, full in spans:
+        if full or signature_end >= end:
+            rendered.extend(lines[start - 1:end])
+            continue
+        rendered.extend(lines[start - 1:signature_end])
+        rendered.append(_elision_line(lines, start, signature_end, path))
+        # Keep the closing brace line of brace-delimited bodies
+        closing = lines[end - 1] if end - 1 < len(lines) else ''
+        if closing.strip().startswith('}'):
+            rendered.append(closing)
+    return '\n'.join(rendered)
+
+
+class ContextPacker:
+    """Packs function-level chunks of prioritized files into a token budget"""
+
+    def __init__(self, token_counter: Optional[TokenCounter] = None):
+        self.token_counter = token_counter or get_token_counter()
+
+    def _chunks(self, path: str, content: str) -> List[CodeChunk]:
+        return get_ast_analyzer(detect_language(path)).extract_chunks(content)
+
+    def pack(self, files: Mapping[str, str], query: str, max_tokens: int) -> PackedContext:
+        """Pack ``files`` (in priority order) under ``max_tokens``
+
+        Files are admitted in order while their skeleton (module code plus
+        signatures) fits; bodies are then restored by relevance to ``query``.
+        """
+        file_chunks = OrderedDict()
+        chunk_texts = {}
+        costs = {}
+
+        used = 0
+        for path, content in files.items():
+            lines = content.split('\n')
+            chunks = self._chunks(path, content)
+            skeleton = 0
+            file_costs = []
+            for index, chunk in enumerate(chunks):
+                full_text = '\n'.join(lines[chunk.start_line - 1:chunk.end_line])
+                full_tokens = self.token_counter.count(full_text)
+                if chunk.kind == 'symbol' and chunk.signature_end < chunk.end_line:
+                    signature_text = render_file(content, [[chunk.start_line, chunk.end_line, chunk.signature_end, 0]], path)
+                    signature_tokens = min(self.token_counter.count(signature_text), full_tokens)
+                else:
+                    signature_tokens = full_tokens
+                file_costs.append((full_tokens, signature_tokens))
+                skeleton += signature_tokens
+                if chunk.kind == 'symbol':
+                    chunk_texts[(path, index)] = full_text
+
+            if used + skeleton > max_tokens:
+                # Later, smaller files may still fit
+                continue
+            used += skeleton
+            file_chunks[path] = chunks
+            costs[path] = file_costs
+
+        # Rank elidable bodies by relevance, then by file priority and position
+        priority = {path: rank for rank, path in enumerate(file_chunks)}
+        index = LexicalIndex()
+        index.update({f"{path}\0{i}": text for (path, i), text in chunk_texts.items() if path in file_chunks})
+        scores = {key: score for key, score in index.search(query, top_k=len(index))}
+
+        candidates = [
+            (path, i) for path, chunks in file_chunks.items()
+            for i, chunk in enumerate(chunks)
+            if costs[path][i][0] > costs[path][i][1]
+        ]
+        candidates.sort(key=lambda key: (-scores.get(f"{key[0]}\0{key[1]}", 0.0), priority[key[0]], key[1]))
+
+        restored = set()
+        for path, i in candidates:
+            extra = costs[path][i][0] - costs[path][i][1]
+            if used + extra <= max_tokens:
+                restored.add((path, i))
+                used += extra
+
+        packed = PackedContext(tokens=used)
+        for path, chunks in file_chunks.items():
+            spans = []
+            for i, chunk in enumerate(chunks):
+                full_tokens, signature_tokens = costs[path][i]
+                full = (path, i) in restored or full_tokens <= signature_tokens
+                spans.append([chunk.start_line, chunk.end_line, chunk.signature_end, int(full)])
+                if chunk.kind == 'symbol':
+                    if full:
+                        packed.full_chunks += 1
+                    else:
+                        packed.elided_chunks += 1
+            packed.layout[path] = spans
+            packed.files[path] = render_file(files[path], spans, path)
+
+        return packed
@@ -0,0 +1,264 @@
+"""
+Near-duplicate scenario detection for AgentCodeEval (post-Phase 3)
+
+Scenarios generated by sampling often repeat: the same context files with
+near-identical task prompts. This module computes MinHash signatures over
+each scenario's text shingles and context-file set, buckets them with
+locality-sensitive hashing (LSH) to find candidate pairs in sub-quadratic
+time, verifies candidates with exact Jaccard similarity, and groups
+duplicates into clusters. One scenario per cluster is kept.
+"""
+
+import hashlib
+import json
+import logging
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .build_manifest import BuildManifest
+
+logger = logging.getLogger(__name__)
+
+
+_WORD_PATTERN = re.compile(r"[a-z0-9_]+")
+
+
+def scenario_shingles(scenario: Dict[str, Any], shingle_size: int = 3) -> Set[str]:
+    """Word n-gram shingles of the scenario text plus one token per context file"""
+    text = " ".join(
+        str(scenario.get(key, '')) for key in ('title', 'description', 'task_prompt')
+    ).lower()
+    words = _WORD_PATTERN.findall(text)
+
+    shingles = {
+        " ".join(words[i:i + shingle_size])
+        for i in range(max(1, len(words) - shingle_size + 1))
+    } if words else set()
+
+    project_id = scenario.get('project_id', '')
+    shingles.update(f"file:{project_id}/{path}" for path in scenario.get('context_files', []))
+    return shingles
+
+
+def _hash_shingles(shingles: Set[str]) -> np.ndarray:
+    """Stable 32-bit hashes of the shingles"""
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=4).digest(), 'little') for s in shingles),
+        dtype=np.uint64,
+        count=len(shingles)
+    )
+
+
+def choose_bands(num_perm: int, threshold: float, recall_margin: float = 0.1) -> Tuple[int, int]:
+    """Pick (bands, rows) with bands * rows == num_perm whose LSH threshold
+    ``(1/bands) ** (1/rows)`` sits ``recall_margin`` below the similarity
+    threshold. Candidates are verified exactly, so erring towards recall only
+    costs a few extra comparisons."""
+    threshold = max(0.0, threshold - recall_margin)
+    best = (num_perm, 1)
+    best_error = float('inf')
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        error = abs((1.0 / bands) ** (1.0 / rows) - threshold)
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+class MinHasher:
+    """MinHash signatures using multiply-shift hashing on 64-bit words"""
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        # Odd multipliers; products wrap modulo 2**64 and the high 32 bits are kept
+        self._a = (rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) << np.uint64(1)) | np.uint64(1)
+        self._b = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+        self.num_perm = num_perm
+
+    def signature(self, shingles: Set[str]) -> np.ndarray:
+        if not shingles:
+            return np.full(self.num_perm, np.iinfo(np.uint32).max, dtype=np.uint64)
+        hashes = _hash_shingles(shingles)
+        with np.errstate(over='ignore'):
+            permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) >> np.uint64(32)
+        return permuted.min(axis=1)
+
+
+@dataclass
+class DuplicateCluster:
+    """A group of near-duplicate scenarios; ``kept`` survives deduplication"""
+    kept: str
+    duplicates: List[str]
+    similarities: Dict[str, float] = field(default_factory=dict)
+
+
+@dataclass
+class DeduplicationReport:
+    total_scenarios: int
+    threshold: float
+    bands: int
+    rows: int
+    candidate_pairs: int
+    clusters: List[DuplicateCluster]
+
+    @property
+    def duplicate_count(self) -> int:
+        return sum(len(cluster.duplicates) for cluster in self.clusters)
+
+    def duplicate_ids(self) -> Set[str]:
+        return {scenario_id for cluster in self.clusters for scenario_id in cluster.duplicates}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'total_scenarios': self.total_scenarios,
+            'duplicate_scenarios': self.duplicate_count,
+            'unique_scenarios': self.total_scenarios - self.duplicate_count,
+            'threshold': self.threshold,
+            'lsh_bands': self.bands,
+            'lsh_rows': self.rows,
+            'candidate_pairs': self.candidate_pairs,
+            'clusters': [
+                {'kept': c.kept, 'duplicates': c.duplicates, 'similarities': c.similarities}
+                for c in self.clusters
+            ]
+        }
+
+
+def _jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def find_near_duplicates(scenarios: List[Dict[str, Any]], threshold: float = 0.8,
+                         num_perm: int = 128, seed: int = 1) -> DeduplicationReport:
+    """Cluster scenarios whose shingle sets have Jaccard similarity >= threshold
+
+    Within a cluster, the scenario with the smallest id is kept.
+    """
+    hasher = MinHasher(num_perm=num_perm, seed=seed)
+    bands, rows = choose_bands(num_perm, threshold)
+
+    ids = [scenario.get('id', f'scenario_{i}') for i, scenario in enumerate(scenarios)]
+    shingle_sets = [scenario_shingles(scenario) for scenario in scenarios]
+    signatures = np.stack([hasher.signature(s) for s in shingle_sets]) if scenarios else np.empty((0, num_perm))
+
+    # LSH: scenarios that agree on every row of any band become candidates
+    candidates: Set[Tuple[int, int]] = set()
+    for band in range(bands):
+        buckets: Dict[bytes, List[int]] = defaultdict(list)
+        band_slice = signatures[:, band * rows:(band + 1) * rows]
+        for index in range(len(scenarios)):
+            buckets[band_slice[index].tobytes()].append(index)
+        for members in buckets.values():
+            # Pair each member with the bucket's first member and its predecessor;
+            # clustering is transitive, so this stays linear in the bucket size
+            for k in range(1, len(members)):
+                candidates.add((members[0], members[k]))
+                candidates.add((members[k - 1], members[k]))
+
+    # Verify candidates exactly and union them into clusters
+    parent = list(range(len(scenarios)))
+
+    def find(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    similarities: Dict[Tuple[int, int], float] = {}
+    for i, j in candidates:
+        similarity = _jaccard(shingle_sets[i], shingle_sets[j])
+        if similarity >= threshold:
+            similarities[(i, j)] = similarity
+            root_i, root_j = find(i), find(j)
+            if root_i != root_j:
+                parent[root_j] = root_i
+
+    groups: Dict[int, List[int]] = defaultdict(list)
+    for index in range(len(scenarios)):
+        groups[find(index)].append(index)
+
+    # Highest verified similarity per scenario, for the report
+    best_similarity: Dict[int, float] = {}
+    for (i, j), similarity in similarities.items():
+        for index in (i, j):
+            best_similarity[index] = max(best_similarity.get(index, 0.0), similarity)
+
+    clusters = []
+    for members in groups.values():
+        if len(members) < 2:
+            continue
+        members.sort(key=lambda index: ids[index])
+        clusters.append(DuplicateCluster(
+            kept=ids[members[0]],
+            duplicates=[ids[index] for index in members[1:]],
+            similarities={ids[index]: round(best_similarity[index], 3) for index in members[1:]}
+        ))
+
+    clusters.sort(key=lambda cluster: cluster.kept)
+
+    return DeduplicationReport(
+        total_scenarios=len(scenarios),
+        threshold=threshold,
+        bands=bands,
+        rows=rows,
+        candidate_pairs=len(candidates),
+        clusters=clusters
+    )
+
+
+def deduplicate_scenario_files(scenarios_dir: Path, threshold: float = 0.8, drop: bool = False,
+                               report_file: Optional[Path] = None,
+                               manifest: Optional[BuildManifest] = None) -> DeduplicationReport:
+    """Find near-duplicates across all Phase 3 scenario files
+
+    With ``drop=True`` the duplicates are removed from their scenario files in
+    place, and each rewritten file is marked stale in ``manifest`` (when given)
+    so the next Phase 3 run regenerates it to refill the dropped slots. The
+    report is written to ``report_file`` when given.
+    """
+    scenario_files = sorted(Path(scenarios_dir).glob("*.json"))
+    file_data = {}
+    all_scenarios = []
+
+    for scenario_file in scenario_files:
+        with open(scenario_file, 'r') as f:
+            data = json.load(f)
+        file_data[scenario_file] = data
+        project_id = data.get('project_id')
+        for scenario in data.get('scenarios', []):
+            # Tag with the project so equal file paths in different projects don't collide
+            all_scenarios.append(dict(scenario, project_id=scenario.get('project_id', project_id)))
+
+    report = find_near_duplicates(all_scenarios, threshold=threshold)
+
+    if drop and report.clusters:
+        duplicate_ids = report.duplicate_ids()
+        for scenario_file, data in file_data.items():
+            scenarios = data.get('scenarios', [])
+            kept = [s for s in scenarios if s.get('id') not in duplicate_ids]
+            if len(kept) != len(scenarios):
+                data['scenarios'] = kept
+                with open(scenario_file, 'w') as f:
+                    json.dump(data, f, indent=2)
+                if manifest is not None:
+                    manifest.invalidate('scenarios', scenario_file, save=False)
+                logger.info(f"Dropped {len(scenarios) - len(kept)} duplicates from {scenario_file.name}")
+        if manifest is not None:
+            manifest.save()
+
+    if report_file:
+        report_file = Path(report_file)
+        report_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(report_file, 'w') as f:
+            json.dump(dict(report.to_dict(), action='drop' if drop else 'report'), f, indent=2)
+
+    return report
@@ -7,262 +7,483 @@ These metrics evaluate software development agent capabilities beyond traditiona
 import ast
 import re
 from collections import defaultdict, Counter
+from dataclasses import dataclass
+from functools import cached_property
 from pathlib import Path
-from typing import Dict, List, Any, Tuple, Set
+from typing import Dict, List, Any, Optional, Sequence, Tuple, Set, Union
 import difflib
 
+import numpy as np
+
+from ..analysis.solution_analysis import FileAnalysis, SolutionAnalysis, analyze_solution
+from ..utils.patterns import CAPITALIZED_WORD_PATTERN, KeywordScanner
+
+
+_CLASS_DECLARATION_PATTERN = re.compile(r'class\s+\w+')
+_DEF_DECLARATION_PATTERN = re.compile(r'def\s+\w+')
+_INTERFACE_NAME_PATTERN = re.compile(r'interface\s+([A-Za-z]+)')
+_CONCEPT_PATTERN = re.compile(r'\b[A-Z][a-z]+\b|\b(?:func|struct|interface|package|import)\b')
+_REQUIREMENT_KEYWORD_PATTERN = re.compile(r'\b[A-Z][a-z]+(?:[A-Z][a-z]*)*\b')
+
+# Name fragments that mark two identifiers as the same concept (e.g. getUser / get_user)
+CONCEPT_ROOTS = ('get', 'set', 'create', 'update', 'delete', 'handle', 'process')
+
+
+# Indicator vocabularies matched against lower-cased solution code. They are
+# all compiled into one KeywordScanner, so each file is scanned once however
+# many tables and metrics consult it.
+ARCHITECTURAL_PATTERNS = {
+    'mvc': ['model', 'view', 'controller', 'models', 'views', 'controllers'],
+    'repository': ['repository', 'repo', 'dao', 'data_access'],
+    'factory': ['factory', 'builder', 'create'],
+    'observer': ['observer', 'listener', 'subscriber', 'event'],
+    'strategy': ['strategy', 'algorithm', 'policy'],
+    'adapter': ['adapter', 'wrapper', 'bridge']
+}
+
+_APPROACH_INDICATORS = {
+    'error_handling': ['try', 'catch', 'error', 'exception', 'if err'],
+    'data_structures': ['map', 'slice', 'array', 'list', 'dict'],
+    'patterns': ['interface', 'struct', 'class', 'factory', 'builder'],
+    'style': ['func', 'function', 'method', 'procedure']
+}
+
+_STATE_INDICATORS = {
+    'immutability': ['const', 'readonly', 'immutable', 'copy'],
+    'shared_state': ['global', 'static', 'shared', 'singleton'],
+    'state_isolation': ['private', 'encapsulated', 'local'],
+    'state_validation': ['validate', 'check', 'verify', 'assert']
+}
+
+_INTERFACE_PATTERNS = {
+    'interface_definition': ['interface', 'protocol', 'abstract'],
+    'dependency_injection': ['inject', 'provide', 'wire', 'bind'],
+    'abstraction': ['implement', 'extend', 'inherit', 'override'],
+    'contracts': ['requires', 'ensures', 'contract', 'guarantee']
+}
+
+_COORDINATION_PATTERNS = {
+    'synchronization': ['mutex', 'lock', 'sync', 'atomic', 'synchronized'],
+    'messaging': ['channel', 'queue', 'event', 'message', 'signal'],
+    'coordination': ['wait', 'notify', 'coordinate', 'barrier'],
+    'isolation': ['goroutine', 'thread', 'process', 'worker']
+}
+
+_MODIFICATION_PATTERNS = {
+    'transaction': ['transaction', 'commit', 'rollback', 'begin'],
+    'validation': ['validate', 'check', 'verify', 'ensure'],
+    'consistency': ['consistent', 'atomic', 'ACID', 'integrity'],
+    'error_recovery': ['recover', 'retry', 'fallback', 'compensate']
+}
+
+_DATA_FLOW_PATTERNS = {
+    'input_validation': ['validate', 'sanitize', 'check', 'verify'],
+    'data_transformation': ['transform', 'convert', 'map', 'filter'],
+    'output_formatting': ['format', 'serialize', 'marshal', 'encode'],
+    'error_propagation': ['error', 'exception', 'fail', 'panic']
+}
+
+_COMPATIBILITY_INDICATORS = {
+    'versioning': ['version', 'v1', 'v2', 'deprecated', 'legacy'],
+    'adaptation': ['adapter', 'wrapper', 'bridge', 'facade'],
+    'migration': ['migrate', 'upgrade', 'transition', 'convert'],
+    'deprecation': ['deprecated', 'obsolete', 'remove', 'replace']
+}
+
+_REUSE_PATTERNS = {
+    'functions': ['func', 'function', 'def', 'method'],
+    'modules': ['import', 'include', 'require', 'use'],
+    'inheritance': ['extends', 'inherit', 'implement', 'interface'],
+    'composition': ['compose', 'mixin', 'trait', 'delegate']
+}
+
+_EXTENSIBILITY_PATTERNS = {
+    'interfaces': ['interface', 'protocol', 'contract'],
+    'plugins': ['plugin', 'extension', 'addon', 'module'],
+    'hooks': ['hook', 'callback', 'listener', 'event'],
+    'factories': ['factory', 'builder', 'creator', 'generator']
+}
+
+_DISRUPTION_INDICATORS = {
+    'breaking_changes': ['breaking', 'remove', 'delete', 'replace'],
+    'non_breaking': ['add', 'extend', 'enhance', 'backward', 'compatible'],
+    'isolation': ['separate', 'isolate', 'encapsulate', 'module'],
+    'integration': ['integrate', 'connect', 'link', 'bridge']
+}
+
+_SHARED_STATE_MARKERS = ['global', 'static', 'shared']
+_CHANGE_TRACKING_MARKERS = ['version', 'changelog']
+_FLOW_STAGE_MARKERS = {
+    'input': ['input', 'request', 'param'],
+    'process': ['process', 'handle', 'execute'],
+    'output': ['output', 'response', 'return']
+}
+_API_MARKERS = ['api', 'breaking']
+_CONFIGURATION_MARKERS = ['config', 'setting', 'option', 'parameter']
+_MODULARITY_MARKERS = ['module', 'component', 'service', 'package']
+
+
+def _vocabulary(*tables) -> List[str]:
+    """Every keyword in indicator tables (dicts of keyword lists) and keyword lists"""
+    keywords = []
+    for table in tables:
+        for entry in (table.values() if isinstance(table, dict) else [table]):
+            keywords.extend(entry)
+    return keywords
+
+
+_INDICATOR_SCANNER = KeywordScanner(_vocabulary(
+    ARCHITECTURAL_PATTERNS, _APPROACH_INDICATORS, _STATE_INDICATORS, _INTERFACE_PATTERNS,
+    _COORDINATION_PATTERNS, _MODIFICATION_PATTERNS, _DATA_FLOW_PATTERNS, _COMPATIBILITY_INDICATORS,
+    _REUSE_PATTERNS, _EXTENSIBILITY_PATTERNS, _DISRUPTION_INDICATORS, _SHARED_STATE_MARKERS, _CHANGE_TRACKING_MARKERS, _FLOW_STAGE_MARKERS, _API_MARKERS,
+    _CONFIGURATION_MARKERS, _MODULARITY_MARKERS
+))
+
+
+# Task prompt words that make a scenario a modification, compatibility or
+# integration task
+_MODIFICATION_TASK_WORDS = ('update', 'modify', 'change', 'edit', 'alter', 'refactor')
+_COMPATIBILITY_TASK_WORDS = ('update', 'upgrade', 'migrate', 'compatibility', 'legacy')
+_INTEGRATION_TASK_WORDS = ('add', 'integrate', 'extend', 'enhance', 'modify')
+_REQUIREMENT_VERBS = ['implement', 'create', 'add', 'update', 'fix', 'analyze']
+
+# Scenario terms (description and task prompt) checked by the information extraction metrics
+_ARCHITECTURE_TERMS = (
+    'middleware', 'handler', 'controller', 'service', 'repository', 'model',
+    'mvc', 'rest', 'api', 'router', 'endpoint', 'interface', 'struct',
+    'package', 'module', 'component', 'layer', 'tier'
+)
+_STRUCTURAL_TERMS = ('function', 'method', 'class', 'struct', 'interface', 'package')
+_DEPENDENCY_TERMS = ('import', 'dependency', 'require', 'use', 'call', 'invoke')
+_BUSINESS_TERMS = (
+    'user', 'customer', 'order', 'product', 'payment', 'account', 'profile',
+    'create', 'update', 'delete', 'get', 'list', 'search', 'filter',
+    'validate', 'process', 'calculate', 'generate', 'send', 'receive'
+)
+_DATA_TERMS = (
+    'input', 'output', 'request', 'response', 'data', 'parameter',
+    'return', 'result', 'json', 'xml', 'struct', 'map', 'array', 'slice'
+)
+_ERROR_TERMS = ('error', 'exception', 'fail', 'invalid', 'check', 'validate')
+_ACTION_TERMS = (
+    'implement', 'create', 'build', 'add', 'update', 'modify', 'delete',
+    'handle', 'process', 'manage', 'execute', 'run', 'start', 'stop'
+)
+_TECH_TERMS = (
+    'http', 'json', 'api', 'rest', 'endpoint', 'server', 'client',
+    'database', 'sql', 'query', 'connection', 'session', 'cookie'
+)
+
+AGENT_METRICS = ('acs', 'dta', 'mmr', 'cfrd', 'idc', 'icu')
+
+# Component weights of each metric, in the order of _metric_components
+METRIC_WEIGHTS = {
+    'acs': (0.4, 0.3, 0.2, 0.1),
+    'dta': (0.4, 0.35, 0.25),
+    'mmr': (0.4, 0.35, 0.25),
+    'cfrd': (0.35, 0.30, 0.25, 0.10),
+    'idc': (0.4, 0.3, 0.2, 0.1),
+    'icu': (0.4, 0.35, 0.25),
+}
+
+# Agent-metric mix per task category; other categories use DEFAULT_CATEGORY_WEIGHTS
+CATEGORY_METRIC_WEIGHTS = {
+    'architectural_understanding': {'acs': 0.6, 'dta': 0.4},
+    'cross_file_refactoring': {'cfrd': 0.7, 'acs': 0.3},
+    'multi_session_development': {'mmr': 0.6, 'idc': 0.4},
+}
+DEFAULT_CATEGORY_WEIGHTS = {'icu': 0.5, 'cfrd': 0.5}
+
+
+def category_metric_weights(task_category: str) -> Dict[str, float]:
+    """Agent metrics scored for a task category, with their weights"""
+    return CATEGORY_METRIC_WEIGHTS.get(task_category, DEFAULT_CATEGORY_WEIGHTS)
+
+
+class ScenarioFeatures:
+    """Scenario-side inputs of the agent metrics, derived once per scenario
+
+    The metrics read the task prompt, description and context files of the
+    scenario for every solution; scoring several solutions against one
+    ``ScenarioFeatures`` shares that work.
+    """
+
+    def __init__(self, scenario: Dict[str, Any]):
+        self.scenario = scenario
+        self.task_category = scenario.get('task_category', '')
+        self.task_prompt = scenario.get('task_prompt', '')
+        self.description = scenario.get('description', '')
+        self.context_files = scenario.get('context_files', [])
+        self._mentioned: Dict[Tuple[str, ...], List[str]] = {}
+
+    @cached_property
+    def task_prompt_lower(self) -> str:
+        return self.task_prompt.lower()
+
+    @cached_property
+    def combined_text(self) -> str:
+        """Lower-cased description and task prompt"""
+        return self.description.lower() + ' ' + self.task_prompt_lower
+
+    @cached_property
+    def context_names(self) -> List[str]:
+        """Lower-cased stems of the context files"""
+        return [Path(context_file).stem.lower() for context_file in self.context_files]
+
+    @cached_property
+    def domain_terms(self) -> List[str]:
+        """Distinct capitalized words of the task prompt"""
+        return list(set(CAPITALIZED_WORD_PATTERN.findall(self.task_prompt)))
+
+    @cached_property
+    def requirement_keywords(self) -> List[str]:
+        """Lower-cased requirement words of the task prompt plus common task verbs"""
+        keywords = set(_REQUIREMENT_KEYWORD_PATTERN.findall(self.task_prompt) + _REQUIREMENT_VERBS)
+        return [keyword.lower() for keyword in keywords]
+
+    @cached_property
+    def concepts(self) -> List[str]:
+        """Concept words of the lower-cased description and task prompt"""
+        return _CONCEPT_PATTERN.findall(self.combined_text)
+
+    def prompt_mentions_any(self, words: Tuple[str, ...]) -> bool:
+        return any(word in self.task_prompt_lower for word in words)
+
+    def mentioned(self, terms: Tuple[str, ...]) -> List[str]:
+        """``terms`` that occur in the description or task prompt (memoized)"""
+        found = self._mentioned.get(terms)
+        if found is None:
+            found = self._mentioned[terms] = [term for term in terms if term in self.combined_text]
+        return found
+
+
+def scenario_features(scenario: Union[Dict[str, Any], ScenarioFeatures]) -> ScenarioFeatures:
+    """Features of ``scenario``, reusing them if already derived"""
+    if isinstance(scenario, ScenarioFeatures):
+        return scenario
+    return ScenarioFeatures(scenario)
+
+
+@dataclass
+class BatchScores:
+    """Agent metrics of several solutions to one scenario (one row per solution)"""
+    metrics: List[str]
+    scores: np.ndarray  # (solutions, metrics)
+    agent_scores: Optional[np.ndarray]  # category-weighted mix; None if a category metric was not scored
+
+    def as_dicts(self) -> List[Dict[str, float]]:
+        return [dict(zip(self.metrics, map(float, row))) for row in self.scores]
+
 
 class AgentMetricsCalculator:
     """Calculates the 6 novel agent-specific metrics using code analysis"""
     
     def __init__(self):
-        self.architectural_patterns = {
-            'mvc': ['model', 'view', 'controller', 'models', 'views', 'controllers'],
-            'repository': ['repository', 'repo', 'dao', 'data_access'],
-            'factory': ['factory', 'builder', 'create'],
-            'observer': ['observer', 'listener', 'subscriber', 'event'],
-            'strategy': ['strategy', 'algorithm', 'policy'],
-            'adapter': ['adapter', 'wrapper', 'bridge']
-        }
-
-    def calculate_architectural_coherence_score(self, scenario: Dict[str, Any], 
-                                             solution_code: Dict[str, str]) -> float:
+        self.architectural_patterns = ARCHITECTURAL_PATTERNS
+
+    def calculate_architectural_coherence_score(self, scenario: Union[Dict[str, Any], ScenarioFeatures],
+                                             solution_code: Union[Dict[str, str], SolutionAnalysis]) -> float:
         """
         ACS: Architectural Coherence Score
         Measures consistency with existing architectural patterns and design principles
         """
-        
-        context_files = scenario.get('context_files', [])
-        task_category = scenario.get('task_category', '')
-        
-        # 1. Pattern consistency analysis (40%)
-        pattern_score = self._analyze_pattern_consistency(solution_code, context_files)
-        
-        # 2. File organization coherence (30%)
-        organization_score = self._analyze_file_organization(solution_code)
-        
-        # 3. Naming convention consistency (20%)
-        naming_score = self._analyze_naming_consistency(solution_code)
-        
-        # 4. Import/dependency structure (10%)
-        dependency_score = self._analyze_dependency_structure(solution_code)
-        
-        acs_score = (
-            pattern_score * 0.4 +
-            organization_score * 0.3 +
-            naming_score * 0.2 +
-            dependency_score * 0.1
-        )
-        
-        return min(max(acs_score, 0.0), 1.0)
+        return self.calculate_metric('acs', scenario, solution_code)
 
-    def calculate_dependency_traversal_accuracy(self, scenario: Dict[str, Any], 
-                                              solution_code: Dict[str, str]) -> float:
+    def calculate_dependency_traversal_accuracy(self, scenario: Union[Dict[str, Any], ScenarioFeatures],
+                                              solution_code: Union[Dict[str, str], SolutionAnalysis]) -> float:
         """
         DTA: Dependency Traversal Accuracy
         Measures how accurately the agent navigates complex dependency relationships
         """
-        
-        # 1. Import resolution accuracy (40%)
-        import_score = self._analyze_import_accuracy(solution_code)
-        
-        # 2. Cross-file reference validity (35%)
-        reference_score = self._analyze_cross_file_references(solution_code)
-        
-        # 3. Dependency order correctness (25%)
-        order_score = self._analyze_dependency_order(solution_code)
-        
-        dta_score = (
-            import_score * 0.4 +
-            reference_score * 0.35 +
-            order_score * 0.25
-        )
-        
-        return min(max(dta_score, 0.0), 1.0)
+        return self.calculate_metric('dta', scenario, solution_code)
 
-    def calculate_multi_session_memory_retention(self, scenario: Dict[str, Any], 
-                                               solution_code: Dict[str, str]) -> float:
+    def calculate_multi_session_memory_retention(self, scenario: Union[Dict[str, Any], ScenarioFeatures],
+                                               solution_code: Union[Dict[str, str], SolutionAnalysis]) -> float:
         """
         MMR: Multi-Session Memory Retention
         Measures context persistence and consistency across development sessions
         """
-        
-        task_category = scenario.get('task_category', '')
-        
-        # Only applicable for multi-session tasks
-        if task_category != 'multi_session_development':
-            return self._calculate_context_consistency(scenario, solution_code)
-        
-        # 1. Variable/function name consistency (40%)
-        naming_consistency = self._analyze_naming_consistency_across_sessions(solution_code)
-        
-        # 2. Approach consistency (35%)
-        approach_consistency = self._analyze_approach_consistency(solution_code)
-        
-        # 3. State management continuity (25%)
-        state_consistency = self._analyze_state_management(solution_code)
-        
-        mmr_score = (
-            naming_consistency * 0.4 +
-            approach_consistency * 0.35 +
-            state_consistency * 0.25
-        )
-        
-        return min(max(mmr_score, 0.0), 1.0)
+        return self.calculate_metric('mmr', scenario, solution_code)
 
-    def calculate_cross_file_reasoning_depth(self, scenario: Dict[str, Any], 
-                                           solution_code: Dict[str, str]) -> float:
+    def calculate_cross_file_reasoning_depth(self, scenario: Union[Dict[str, Any], ScenarioFeatures],
+                                           solution_code: Union[Dict[str, str], SolutionAnalysis]) -> float:
         """
         CFRD: Cross-File Reasoning Depth
         Measures understanding of multi-file relationships and coordination
         """
-        
-        # 1. Interface usage correctness (35%)
-        interface_score = self._analyze_interface_usage(solution_code)
-        
-        # 2. Shared state coordination (30%)
-        shared_state_score = self._analyze_shared_state_coordination(solution_code)
-        
-        # 3. Cross-file modification coordination (25%)
-        modification_score = self._analyze_modification_coordination(solution_code, scenario)
-        
-        # 4. Data flow understanding (10%)
-        dataflow_score = self._analyze_data_flow_understanding(solution_code)
-        
-        cfrd_score = (
-            interface_score * 0.35 +
-            shared_state_score * 0.30 +
-            modification_score * 0.25 +
-            dataflow_score * 0.10
-        )
-        
-        return min(max(cfrd_score, 0.0), 1.0)
+        return self.calculate_metric('cfrd', scenario, solution_code)
 
-    def calculate_incremental_development_capability(self, scenario: Dict[str, Any], 
-                                                   solution_code: Dict[str, str]) -> float:
+    def calculate_incremental_development_capability(self, scenario: Union[Dict[str, Any], ScenarioFeatures],
+                                                   solution_code: Union[Dict[str, str], SolutionAnalysis]) -> float:
         """
         IDC: Incremental Development Capability
         Measures ability to build incrementally on existing work
         """
-        
-        # 1. Backward compatibility preservation (40%)
-        compatibility_score = self._analyze_backward_compatibility(solution_code, scenario)
-        
-        # 2. Code reuse efficiency (30%)
-        reuse_score = self._analyze_code_reuse(solution_code, scenario)
-        
-        # 3. Extension pattern usage (20%)
-        extension_score = self._analyze_extension_patterns(solution_code)
-        
-        # 4. Minimal disruption principle (10%)
-        disruption_score = self._analyze_minimal_disruption(solution_code, scenario)
-        
-        idc_score = (
-            compatibility_score * 0.4 +
-            reuse_score * 0.3 +
-            extension_score * 0.2 +
-            disruption_score * 0.1
-        )
-        
-        return min(max(idc_score, 0.0), 1.0)
+        return self.calculate_metric('idc', scenario, solution_code)
 
-    def calculate_information_coverage_utilization(self, scenario: Dict[str, Any], 
-                                                 solution_code: Dict[str, str]) -> float:
+    def calculate_information_coverage_utilization(self, scenario: Union[Dict[str, Any], ScenarioFeatures],
+                                                 solution_code: Union[Dict[str, str], SolutionAnalysis]) -> float:
         """
         ICU: Information Coverage Utilization
         Measures how effectively the agent uses available context information
         """
-        
-        context_files = scenario.get('context_files', [])
-        task_prompt = scenario.get('task_prompt', '')
-        
-        # 1. Context file usage efficiency (40%)
-        context_usage_score = self._analyze_context_usage(solution_code, context_files)
-        
-        # 2. Requirement coverage completeness (35%)
-        requirement_score = self._analyze_requirement_coverage(solution_code, task_prompt)
-        
-        # 3. Information extraction accuracy (25%)
-        extraction_score = self._analyze_information_extraction(solution_code, scenario)
-        
-        icu_score = (
-            context_usage_score * 0.4 +
-            requirement_score * 0.35 +
-            extraction_score * 0.25
-        )
-        
-        return min(max(icu_score, 0.0), 1.0)
+        return self.calculate_metric('icu', scenario, solution_code)
+
+    def calculate_metric(self, metric: str, scenario: Union[Dict[str, Any], ScenarioFeatures],
+                         solution_code: Union[Dict[str, str], SolutionAnalysis]) -> float:
+        """One agent metric (a key of ``METRIC_WEIGHTS``) for one solution"""
+        components = self._metric_components(metric, analyze_solution(solution_code), scenario_features(scenario))
+        score = sum(component * weight for component, weight in zip(components, METRIC_WEIGHTS[metric]))
+        return min(max(score, 0.0), 1.0)
+
+    def score_solutions(self, scenario: Union[Dict[str, Any], ScenarioFeatures],
+                        solutions: Sequence[Union[Dict[str, str], SolutionAnalysis]],
+                        metrics: Optional[Sequence[str]] = None) -> BatchScores:
+        """Score several solutions to one scenario
+
+        Scenario features are derived once for the whole batch. Each metric's
+        components form a (solutions x components) matrix that is multiplied
+        by the metric's weight vector, and the category mix used by the
+        validation framework is a second product over the metric columns.
+        """
+        features = scenario_features(scenario)
+        metrics = list(metrics or AGENT_METRICS)
+        analyses = [analyze_solution(solution) for solution in solutions]
+        
+        scores = np.zeros((len(analyses), len(metrics)))
+        for column, metric in enumerate(metrics):
+            weights = np.array(METRIC_WEIGHTS[metric])
+            components = np.array(
+                [self._metric_components(metric, analysis, features) for analysis in analyses], dtype=float
+            ).reshape(len(analyses), len(weights))
+            # Row sums of the weighted components (the matrix-vector product),
+            # summed in column order so batch and single scores agree exactly
+            scores[:, column] = np.clip((components * weights).sum(axis=1), 0.0, 1.0)
+        
+        category_weights = category_metric_weights(features.task_category)
+        agent_scores = None
+        if all(metric in metrics for metric in category_weights):
+            columns = [metrics.index(metric) for metric in category_weights]
+            agent_scores = (scores[:, columns] * np.array(list(category_weights.values()))).sum(axis=1)
+        
+        return BatchScores(metrics, scores, agent_scores)
+
+    def _metric_components(self, metric: str, analysis: SolutionAnalysis,
+                           features: ScenarioFeatures) -> List[float]:
+        """Component scores of ``metric``, in the order of its ``METRIC_WEIGHTS``"""
+        if metric == 'acs':
+            return [
+                self._analyze_pattern_consistency(analysis, features.context_files),  # 40%
+                self._analyze_file_organization(analysis),  # 30%
+                self._analyze_naming_consistency(analysis),  # 20%
+                self._analyze_dependency_structure(analysis),  # 10%
+            ]
+        if metric == 'dta':
+            return [
+                self._analyze_import_accuracy(analysis),  # 40%
+                self._analyze_cross_file_references(analysis),  # 35%
+                self._analyze_dependency_order(analysis),  # 25%
+            ]
+        if metric == 'mmr':
+            # Only multi-session tasks have sessions to compare; others are
+            # scored on consistency with the scenario context (same weights)
+            if features.task_category != 'multi_session_development':
+                return self._context_consistency_components(analysis, features)
+            return [
+                self._analyze_naming_consistency_across_sessions(analysis),  # 40%
+                self._analyze_approach_consistency(analysis),  # 35%
+                self._analyze_state_management(analysis),  # 25%
+            ]
+        if metric == 'cfrd':
+            return [
+                self._analyze_interface_usage(analysis),  # 35%
+                self._analyze_shared_state_coordination(analysis),  # 30%
+                self._analyze_modification_coordination(analysis, features),  # 25%
+                self._analyze_data_flow_understanding(analysis),  # 10%
+            ]
+        if metric == 'idc':
+            return [
+                self._analyze_backward_compatibility(analysis, features),  # 40%
+                self._analyze_code_reuse(analysis, features),  # 30%
+                self._analyze_extension_patterns(analysis),  # 20%
+                self._analyze_minimal_disruption(analysis, features),  # 10%
+            ]
+        if metric == 'icu':
+            return [
+                self._analyze_context_usage(analysis, features),  # 40%
+                self._analyze_requirement_coverage(analysis, features),  # 35%
+                self._analyze_information_extraction(analysis, features),  # 25%
+            ]
+        raise ValueError(f"Unknown agent metric: {metric}")
 
     # Helper methods for detailed analysis
 
-    def _analyze_pattern_consistency(self, solution_code: Dict[str, str], context_files: List[str]) -> float:
+    def _analyze_pattern_consistency(self, analysis: SolutionAnalysis, context_files: List[str]) -> float:
         """Analyze consistency with architectural patterns"""
         
         pattern_scores = []
         
-        for filename, code in solution_code.items():
-            code_lower = code.lower()
+        for file in analysis.files:
+            # One scan answers every vocabulary keyword; mentions() falls back
+            # to a substring check for keywords added to architectural_patterns
+            file.keyword_counts(_INDICATOR_SCANNER)
             file_score = 0.0
             
             # Check for architectural pattern indicators
             for pattern, keywords in self.architectural_patterns.items():
-                pattern_matches = sum(1 for keyword in keywords if keyword in code_lower)
+                pattern_matches = sum(1 for keyword in keywords if file.mentions(keyword))
                 if pattern_matches > 0:
                     # Bonus for consistent pattern usage
                     file_score += min(pattern_matches / len(keywords), 0.3)
             
             # Check for proper separation of concerns
-            if self._has_clear_separation_of_concerns(code):
+            if self._has_clear_separation_of_concerns(file):
                 file_score += 0.3
                 
             # Check for consistent function/class organization
-            if self._has_consistent_organization(code):
+            if self._has_consistent_organization(file):
                 file_score += 0.2
                 
             pattern_scores.append(min(file_score, 1.0))
         
         return sum(pattern_scores) / len(pattern_scores) if pattern_scores else 0.0
 
-    def _analyze_file_organization(self, solution_code: Dict[str, str]) -> float:
+    def _analyze_file_organization(self, analysis: SolutionAnalysis) -> float:
         """Analyze logical file organization"""
         
         organization_scores = []
         
-        for filename, code in solution_code.items():
+        for file in analysis.files:
             score = 0.0
             
             # Check import organization (imports at top)
-            if self._has_proper_import_organization(code):
+            if self._has_proper_import_organization(file):
                 score += 0.3
                 
             # Check function/class ordering
-            if self._has_logical_ordering(code):
+            if self._has_logical_ordering(file):
                 score += 0.3
                 
             # Check for proper spacing and structure
-            if self._has_consistent_spacing(code):
+            if self._has_consistent_spacing(file):
                 score += 0.2
                 
             # Check for meaningful file structure
-            if self._has_meaningful_structure(code):
+            if self._has_meaningful_structure(file.code):
                 score += 0.2
                 
             organization_scores.append(score)
         
         return sum(organization_scores) / len(organization_scores) if organization_scores else 0.0
 
-    def _analyze_naming_consistency(self, solution_code: Dict[str, str]) -> float:
+    def _analyze_naming_consistency(self, analysis: SolutionAnalysis) -> float:
         """Analyze naming convention consistency"""
         
         naming_patterns = defaultdict(int)
         total_names = 0
         
-        for filename, code in solution_code.items():
-            # Extract function and variable names using regex
-            function_names = re.findall(r'def\s+([a-zA-Z_][a-zA-Z0-9_]*)', code)
-            variable_names = re.findall(r'([a-zA-Z_][a-zA-Z0-9_]*)\s*=', code)
-            
-            all_names = function_names + variable_names
+        for file in analysis.files:
+            all_names = file.functions + file.assigned_names
             total_names += len(all_names)
             
             for name in all_names:
@@ -285,16 +506,14 @@ class AgentMetricsCalculator:
         
         return min(consistency_score * 1.2, 1.0)  # Slight bonus for high consistency
 
-    def _analyze_dependency_structure(self, solution_code: Dict[str, str]) -> float:
+    def _analyze_dependency_structure(self, analysis: SolutionAnalysis) -> float:
         """Analyze import and dependency structure"""
         
         dependency_scores = []
         
-        for filename, code in solution_code.items():
+        for file in analysis.files:
             score = 0.0
-            
-            # Check for proper import statements
-            import_lines = [line.strip() for line in code.split('\n') if line.strip().startswith(('import ', 'from '))]
+            import_lines = file.import_lines
             
             if import_lines:
                 # Check import organization
@@ -302,7 +521,7 @@ class AgentMetricsCalculator:
                     score += 0.4
                     
                 # Check for unused imports (basic check)
-                if not self._has_unused_imports(code, import_lines):
+                if not self._has_unused_imports(file.code, import_lines):
                     score += 0.3
                     
                 # Check for proper relative vs absolute imports
@@ -313,15 +532,14 @@ class AgentMetricsCalculator:
         
         return sum(dependency_scores) / len(dependency_scores) if dependency_scores else 0.0
 
-    def _analyze_import_accuracy(self, solution_code: Dict[str, str]) -> float:
+    def _analyze_import_accuracy(self, analysis: SolutionAnalysis) -> float:
         """Analyze accuracy of import statements"""
         
         import_scores = []
         
-        for filename, code in solution_code.items():
+        for file in analysis.files:
             score = 0.0
-            
-            import_lines = [line.strip() for line in code.split('\n') if line.strip().startswith(('import ', 'from '))]
+            import_lines = file.import_lines
             
             if import_lines:
                 # Check for valid import syntax
@@ -336,30 +554,26 @@ class AgentMetricsCalculator:
         
         return sum(import_scores) / len(import_scores) if import_scores else 0.0
 
-    def _analyze_cross_file_references(self, solution_code: Dict[str, str]) -> float:
+    def _analyze_cross_file_references(self, analysis: SolutionAnalysis) -> float:
         """Analyze validity of cross-file references"""
         
-        # Extract all function/class definitions
-        definitions = {}
-        for filename, code in solution_code.items():
-            functions = re.findall(r'def\s+([a-zA-Z_][a-zA-Z0-9_]*)', code)
-            classes = re.findall(r'class\s+([a-zA-Z_][a-zA-Z0-9_]*)', code)
-            definitions[filename] = functions + classes
+        # Function/class definitions from every file
+        definitions = analysis.defined_names
         
         reference_scores = []
         
-        for filename, code in solution_code.items():
+        for file in analysis.files:
             score = 0.0
             
             # Find function/method calls
-            calls = re.findall(r'([a-zA-Z_][a-zA-Z0-9_]*)\s*\(', code)
+            calls = file.call_names
             
             if calls:
                 # Check how many calls reference defined functions
                 valid_references = 0
                 for call in calls:
                     # Check if it's defined in any file
-                    if any(call in file_definitions for file_definitions in definitions.values()):
+                    if call in definitions:
                         valid_references += 1
                     # Or if it's a built-in/standard library function
                     elif self._is_builtin_function(call):
@@ -371,20 +585,20 @@ class AgentMetricsCalculator:
         
         return sum(reference_scores) / len(reference_scores) if reference_scores else 0.0
 
-    def _analyze_dependency_order(self, solution_code: Dict[str, str]) -> float:
+    def _analyze_dependency_order(self, analysis: SolutionAnalysis) -> float:
         """Analyze logical ordering of dependencies"""
         
         order_scores = []
         
-        for filename, code in solution_code.items():
-            lines = code.split('\n')
+        for file in analysis.files:
+            lines = file.lines
             import_section_end = 0
             
             # Find end of import section
-            for i, line in enumerate(lines):
-                if line.strip().startswith(('import ', 'from ')):
+            for i, line in enumerate(file.stripped):
+                if line.startswith(('import ', 'from ')):
                     import_section_end = i
-                elif line.strip() and not line.strip().startswith('#'):
+                elif line and not line.startswith('#'):
                     break
             
             # Check if imports are at the top
@@ -396,46 +610,45 @@ class AgentMetricsCalculator:
 
     # Additional helper methods (simplified implementations)
     
-    def _has_clear_separation_of_concerns(self, code: str) -> bool:
+    def _has_clear_separation_of_concerns(self, file: FileAnalysis) -> bool:
         """Check if code has clear separation of concerns"""
         # Simple heuristic: check for multiple classes or clear function grouping
-        class_count = len(re.findall(r'class\s+\w+', code))
-        function_count = len(re.findall(r'def\s+\w+', code))
+        class_count = len(_CLASS_DECLARATION_PATTERN.findall(file.code))
+        function_count = len(_DEF_DECLARATION_PATTERN.findall(file.code))
         return class_count > 0 or function_count > 2
 
-    def _has_consistent_organization(self, code: str) -> bool:
+    def _has_consistent_organization(self, file: FileAnalysis) -> bool:
         """Check for consistent code organization"""
-        lines = code.split('\n')
+        lines = file.lines
         # Simple check: consistent indentation
         indented_lines = [line for line in lines if line.startswith('    ') or line.startswith('\t')]
         return len(indented_lines) > len(lines) * 0.3
 
-    def _has_proper_import_organization(self, code: str) -> bool:
+    def _has_proper_import_organization(self, file: FileAnalysis) -> bool:
         """Check if imports are properly organized"""
-        import_lines = [line.strip() for line in code.split('\n') if line.strip().startswith(('import ', 'from '))]
+        import_lines = file.import_lines
         if not import_lines:
             return True
         
         # Check if imports are grouped (stdlib, third-party, local)
         return len(import_lines) <= 10  # Simple heuristic
 
-    def _has_logical_ordering(self, code: str) -> bool:
+    def _has_logical_ordering(self, file: FileAnalysis) -> bool:
         """Check for logical ordering of functions/classes"""
         # Simple heuristic: classes before functions
-        class_positions = [i for i, line in enumerate(code.split('\n')) if line.strip().startswith('class ')]
-        function_positions = [i for i, line in enumerate(code.split('\n')) if line.strip().startswith('def ')]
+        class_positions = [i for i, line in enumerate(file.stripped) if line.startswith('class ')]
+        function_positions = [i for i, line in enumerate(file.stripped) if line.startswith('def ')]
         
         if not class_positions or not function_positions:
             return True
         
         return max(class_positions) < min(function_positions)
 
-    def _has_consistent_spacing(self, code: str) -> bool:
+    def _has_consistent_spacing(self, file: FileAnalysis) -> bool:
         """Check for consistent spacing"""
-        lines = code.split('\n')
         # Simple check: not too many blank lines
-        blank_lines = sum(1 for line in lines if not line.strip())
-        return blank_lines < len(lines) * 0.3
+        blank_lines = sum(1 for line in file.stripped if not line)
+        return blank_lines < len(file.lines) * 0.3
 
     def _has_meaningful_structure(self, code: str) -> bool:
         """Check for meaningful code structure"""
@@ -515,50 +728,29 @@ class AgentMetricsCalculator:
         return func_name in builtins
 
     # Real implementations replacing placeholders
-    def _calculate_context_consistency(self, scenario: Dict[str, Any], solution_code: Dict[str, str]) -> float:
-        """Calculate how well solution maintains context consistency"""
-        
-        task_prompt = scenario.get('task_prompt', '')
-        context_files = scenario.get('context_files', [])
-        
-        # 1. Context file reference consistency (40%)
-        context_ref_score = self._analyze_context_usage(solution_code, context_files)
-        
-        # 2. Task requirement alignment (35%)
-        requirement_score = self._analyze_requirement_coverage(solution_code, task_prompt)
-        
-        # 3. Terminology consistency (25%)
-        terminology_score = self._analyze_terminology_consistency(solution_code, scenario)
-        
-        return (
-            context_ref_score * 0.4 +
-            requirement_score * 0.35 +
-            terminology_score * 0.25
-        )
+    def _context_consistency_components(self, analysis: SolutionAnalysis, features: ScenarioFeatures) -> List[float]:
+        """How well solution maintains context consistency (MMR outside multi-session tasks)"""
+        return [
+            self._analyze_context_usage(analysis, features),  # 40% context file references
+            self._analyze_requirement_coverage(analysis, features),  # 35% task requirement alignment
+            self._analyze_terminology_consistency(analysis, features),  # 25% terminology
+        ]
 
-    def _analyze_naming_consistency_across_sessions(self, solution_code: Dict[str, str]) -> float:
+    def _analyze_naming_consistency_across_sessions(self, analysis: SolutionAnalysis) -> float:
         """Analyze naming consistency across multiple development sessions"""
         
-        all_identifiers = {}
-        total_inconsistencies = 0
-        total_comparisons = 0
-        
-        # Extract all identifiers (functions, variables, types)
-        for filename, code in solution_code.items():
-            identifiers = self._extract_identifiers(code)
-            all_identifiers[filename] = identifiers
-        
-        # Compare naming patterns across files
-        file_names = list(all_identifiers.keys())
-        for i in range(len(file_names)):
-            for j in range(i + 1, len(file_names)):
-                file1_ids = all_identifiers[file_names[i]]
-                file2_ids = all_identifiers[file_names[j]]
-                
-                # Check for similar concepts with different naming
-                inconsistencies = self._find_naming_inconsistencies(file1_ids, file2_ids)
-                total_inconsistencies += inconsistencies
-                total_comparisons += len(file1_ids) + len(file2_ids)
+        # Bucket each file's identifiers by concept roots and naming style
+        histograms = [self._concept_histogram(file.identifiers) for file in analysis.files]
+        identifier_count = sum(len(file.identifiers) for file in analysis.files)
+        
+        # Every file pair is compared; pairs of files combine bilinearly, so
+        # sum(pairs) = (all x all - sum(file x same file)) / 2
+        combined = sum(histograms, Counter())
+        total_inconsistencies = (
+            self._count_concept_conflicts(combined, combined) -
+            sum(self._count_concept_conflicts(histogram, histogram) for histogram in histograms)
+        ) // 2
+        total_comparisons = identifier_count * (len(histograms) - 1)
         
         if total_comparisons == 0:
             return 0.5
@@ -566,35 +758,28 @@ class AgentMetricsCalculator:
         consistency_ratio = 1.0 - (total_inconsistencies / total_comparisons)
         return max(consistency_ratio, 0.0)
 
-    def _analyze_approach_consistency(self, solution_code: Dict[str, str]) -> float:
+    def _analyze_approach_consistency(self, analysis: SolutionAnalysis) -> float:
         """Analyze consistency of programming approach across files"""
         
-        approach_indicators = {
-            'error_handling': ['try', 'catch', 'error', 'exception', 'if err'],
-            'data_structures': ['map', 'slice', 'array', 'list', 'dict'],
-            'patterns': ['interface', 'struct', 'class', 'factory', 'builder'],
-            'style': ['func', 'function', 'method', 'procedure']
-        }
-        
         file_approaches = {}
         
         # Analyze approach in each file
-        for filename, code in solution_code.items():
-            code_lower = code.lower()
+        for file in analysis.files:
+            hits = file.keyword_counts(_INDICATOR_SCANNER)
             file_approach = {}
             
-            for category, indicators in approach_indicators.items():
-                usage_count = sum(1 for indicator in indicators if indicator in code_lower)
+            for category, indicators in _APPROACH_INDICATORS.items():
+                usage_count = sum(1 for indicator in indicators if hits[indicator])
                 file_approach[category] = usage_count
                 
-            file_approaches[filename] = file_approach
+            file_approaches[file.name] = file_approach
         
         # Calculate consistency across files
         if len(file_approaches) < 2:
             return 0.8  # Single file, assume consistent
         
         consistency_scores = []
-        categories = list(approach_indicators.keys())
+        categories = list(_APPROACH_INDICATORS.keys())
         
         for category in categories:
             category_values = [approaches.get(category, 0) for approaches in file_approaches.values()]
@@ -604,25 +789,18 @@ class AgentMetricsCalculator:
         
         return sum(consistency_scores) / len(consistency_scores)
 
-    def _analyze_state_management(self, solution_code: Dict[str, str]) -> float:
+    def _analyze_state_management(self, analysis: SolutionAnalysis) -> float:
         """Analyze quality of state management patterns"""
         
-        state_indicators = {
-            'immutability': ['const', 'readonly', 'immutable', 'copy'],
-            'shared_state': ['global', 'static', 'shared', 'singleton'],
-            'state_isolation': ['private', 'encapsulated', 'local'],
-            'state_validation': ['validate', 'check', 'verify', 'assert']
-        }
-        
         total_score = 0.0
         
-        for filename, code in solution_code.items():
-            code_lower = code.lower()
+        for file in analysis.files:
+            hits = file.keyword_counts(_INDICATOR_SCANNER)
             file_score = 0.0
             
             # Check for good state management patterns
-            for pattern, indicators in state_indicators.items():
-                pattern_usage = sum(1 for indicator in indicators if indicator in code_lower)
+            for pattern, indicators in _STATE_INDICATORS.items():
+                pattern_usage = sum(1 for indicator in indicators if hits[indicator])
                 if pattern_usage > 0:
                     if pattern == 'immutability' or pattern == 'state_isolation':
                         file_score += 0.3  # Bonus for good patterns
@@ -633,7 +811,7 @@ class AgentMetricsCalculator:
             
             # Check for state mutation patterns
             mutation_patterns = ['=', '++', '--', '+=', '-=']
-            mutation_count = sum(code.count(pattern) for pattern in mutation_patterns)
+            mutation_count = sum(file.count(pattern) for pattern in mutation_patterns)
             
             # Penalize excessive mutations
             if mutation_count > 10:
@@ -641,32 +819,25 @@ class AgentMetricsCalculator:
             
             total_score += max(file_score, 0.0)
         
-        return min(total_score / len(solution_code), 1.0)
+        return min(total_score / len(analysis), 1.0)
 
-    def _analyze_interface_usage(self, solution_code: Dict[str, str]) -> float:
+    def _analyze_interface_usage(self, analysis: SolutionAnalysis) -> float:
         """Analyze proper interface design and usage"""
         
-        interface_patterns = {
-            'interface_definition': ['interface', 'protocol', 'abstract'],
-            'dependency_injection': ['inject', 'provide', 'wire', 'bind'],
-            'abstraction': ['implement', 'extend', 'inherit', 'override'],
-            'contracts': ['requires', 'ensures', 'contract', 'guarantee']
-        }
-        
         total_score = 0.0
         
-        for filename, code in solution_code.items():
-            code_lower = code.lower()
+        for file in analysis.files:
+            hits = file.keyword_counts(_INDICATOR_SCANNER)
             file_score = 0.0
             
             # Check for interface patterns
-            for pattern, indicators in interface_patterns.items():
-                pattern_usage = sum(1 for indicator in indicators if indicator in code_lower)
+            for pattern, indicators in _INTERFACE_PATTERNS.items():
+                pattern_usage = sum(1 for indicator in indicators if hits[indicator])
                 if pattern_usage > 0:
                     file_score += 0.25
             
             # Check for proper interface naming (ends with -er, -able, or Interface)
-            interface_names = re.findall(r'interface\s+([A-Za-z]+)', code)
+            interface_names = _INTERFACE_NAME_PATTERN.findall(file.code)
             proper_interface_names = sum(1 for name in interface_names 
                                        if name.endswith(('er', 'able', 'Interface')))
             
@@ -675,25 +846,18 @@ class AgentMetricsCalculator:
             
             total_score += min(file_score, 1.0)
         
-        return total_score / len(solution_code)
+        return total_score / len(analysis)
 
-    def _analyze_shared_state_coordination(self, solution_code: Dict[str, str]) -> float:
+    def _analyze_shared_state_coordination(self, analysis: SolutionAnalysis) -> float:
         """Analyze coordination of shared state across files"""
         
-        coordination_patterns = {
-            'synchronization': ['mutex', 'lock', 'sync', 'atomic', 'synchronized'],
-            'messaging': ['channel', 'queue', 'event', 'message', 'signal'],
-            'coordination': ['wait', 'notify', 'coordinate', 'barrier'],
-            'isolation': ['goroutine', 'thread', 'process', 'worker']
-        }
-        
         total_coordination_score = 0.0
         shared_state_detected = False
         
         # First, detect if shared state exists
-        for filename, code in solution_code.items():
-            code_lower = code.lower()
-            if any(pattern in code_lower for pattern in ['global', 'static', 'shared']):
+        for file in analysis.files:
+            hits = file.keyword_counts(_INDICATOR_SCANNER)
+            if any(hits[marker] for marker in _SHARED_STATE_MARKERS):
                 shared_state_detected = True
                 break
         
@@ -701,117 +865,84 @@ class AgentMetricsCalculator:
             return 0.8  # No shared state, good isolation
         
         # Analyze coordination mechanisms
-        for filename, code in solution_code.items():
-            code_lower = code.lower()
+        for file in analysis.files:
+            hits = file.keyword_counts(_INDICATOR_SCANNER)
             file_score = 0.0
             
-            for pattern, indicators in coordination_patterns.items():
-                pattern_usage = sum(1 for indicator in indicators if indicator in code_lower)
+            for pattern, indicators in _COORDINATION_PATTERNS.items():
+                pattern_usage = sum(1 for indicator in indicators if hits[indicator])
                 if pattern_usage > 0:
                     file_score += 0.25
             
             total_coordination_score += min(file_score, 1.0)
         
-        return total_coordination_score / len(solution_code)
+        return total_coordination_score / len(analysis)
 
-    def _analyze_modification_coordination(self, solution_code: Dict[str, str], scenario: Dict[str, Any]) -> float:
+    def _analyze_modification_coordination(self, analysis: SolutionAnalysis, features: ScenarioFeatures) -> float:
         """Analyze coordination of modifications across multiple files"""
         
-        modification_patterns = {
-            'transaction': ['transaction', 'commit', 'rollback', 'begin'],
-            'validation': ['validate', 'check', 'verify', 'ensure'],
-            'consistency': ['consistent', 'atomic', 'ACID', 'integrity'],
-            'error_recovery': ['recover', 'retry', 'fallback', 'compensate']
-        }
-        
         # Check if this is a modification-heavy task
-        task_category = scenario.get('task_category', '')
-        task_prompt = scenario.get('task_prompt', '').lower()
-        
-        is_modification_task = any(word in task_prompt for word in 
-                                 ['update', 'modify', 'change', 'edit', 'alter', 'refactor'])
-        
-        if not is_modification_task:
+        if not features.prompt_mentions_any(_MODIFICATION_TASK_WORDS):
             return 0.6  # Neutral score for non-modification tasks
         
         total_score = 0.0
         
-        for filename, code in solution_code.items():
-            code_lower = code.lower()
+        for file in analysis.files:
+            hits = file.keyword_counts(_INDICATOR_SCANNER)
             file_score = 0.0
             
-            for pattern, indicators in modification_patterns.items():
-                pattern_usage = sum(1 for indicator in indicators if indicator in code_lower)
+            for pattern, indicators in _MODIFICATION_PATTERNS.items():
+                pattern_usage = sum(1 for indicator in indicators if hits[indicator])
                 if pattern_usage > 0:
                     file_score += 0.25
             
             # Check for proper change tracking
-            if 'version' in code_lower or 'changelog' in code_lower:
+            if any(hits[marker] for marker in _CHANGE_TRACKING_MARKERS):
                 file_score += 0.1
             
             total_score += min(file_score, 1.0)
         
-        return total_score / len(solution_code)
+        return total_score / len(analysis)
 
-    def _analyze_data_flow_understanding(self, solution_code: Dict[str, str]) -> float:
+    def _analyze_data_flow_understanding(self, analysis: SolutionAnalysis) -> float:
         """Analyze understanding of data flow patterns"""
         
-        data_flow_patterns = {
-            'input_validation': ['validate', 'sanitize', 'check', 'verify'],
-            'data_transformation': ['transform', 'convert', 'map', 'filter'],
-            'output_formatting': ['format', 'serialize', 'marshal', 'encode'],
-            'error_propagation': ['error', 'exception', 'fail', 'panic']
-        }
-        
         total_score = 0.0
         
-        for filename, code in solution_code.items():
-            code_lower = code.lower()
+        for file in analysis.files:
+            hits = file.keyword_counts(_INDICATOR_SCANNER)
             file_score = 0.0
             
             # Check for data flow patterns
-            for pattern, indicators in data_flow_patterns.items():
-                pattern_usage = sum(1 for indicator in indicators if indicator in code_lower)
+            for pattern, indicators in _DATA_FLOW_PATTERNS.items():
+                pattern_usage = sum(1 for indicator in indicators if hits[indicator])
                 if pattern_usage > 0:
                     file_score += 0.2
             
             # Check for proper data flow structure (input -> process -> output)
-            has_input = any(word in code_lower for word in ['input', 'request', 'param'])
-            has_process = any(word in code_lower for word in ['process', 'handle', 'execute'])
-            has_output = any(word in code_lower for word in ['output', 'response', 'return'])
-            
-            flow_completeness = sum([has_input, has_process, has_output]) / 3.0
+            flow_completeness = sum(
+                any(hits[word] for word in words) for words in _FLOW_STAGE_MARKERS.values()
+            ) / 3.0
             file_score += flow_completeness * 0.4
             
             total_score += min(file_score, 1.0)
         
-        return total_score / len(solution_code)
+        return total_score / len(analysis)
 
-    def _analyze_backward_compatibility(self, solution_code: Dict[str, str], scenario: Dict[str, Any]) -> float:
+    def _analyze_backward_compatibility(self, analysis: SolutionAnalysis, features: ScenarioFeatures) -> float:
         """Analyze maintenance of backward compatibility"""
         
-        compatibility_indicators = {
-            'versioning': ['version', 'v1', 'v2', 'deprecated', 'legacy'],
-            'adaptation': ['adapter', 'wrapper', 'bridge', 'facade'],
-            'migration': ['migrate', 'upgrade', 'transition', 'convert'],
-            'deprecation': ['deprecated', 'obsolete', 'remove', 'replace']
-        }
-        
-        task_prompt = scenario.get('task_prompt', '').lower()
-        is_compatibility_relevant = any(word in task_prompt for word in 
-                                      ['update', 'upgrade', 'migrate', 'compatibility', 'legacy'])
-        
-        if not is_compatibility_relevant:
+        if not features.prompt_mentions_any(_COMPATIBILITY_TASK_WORDS):
             return 0.7  # Neutral score when compatibility isn't relevant
         
         total_score = 0.0
         
-        for filename, code in solution_code.items():
-            code_lower = code.lower()
+        for file in analysis.files:
+            hits = file.keyword_counts(_INDICATOR_SCANNER)
             file_score = 0.0
             
-            for pattern, indicators in compatibility_indicators.items():
-                pattern_usage = sum(1 for indicator in indicators if indicator in code_lower)
+            for pattern, indicators in _COMPATIBILITY_INDICATORS.items():
+                pattern_usage = sum(1 for indicator in indicators if hits[indicator])
                 if pattern_usage > 0:
                     if pattern == 'deprecation':
                         file_score += 0.1  # Small bonus for handling deprecation
@@ -819,28 +950,20 @@ class AgentMetricsCalculator:
                         file_score += 0.3
             
             # Check for proper API preservation
-            if 'api' in code_lower and 'breaking' not in code_lower:
+            if hits['api'] and not hits['breaking']:
                 file_score += 0.2
             
             total_score += min(file_score, 1.0)
         
-        return total_score / len(solution_code)
+        return total_score / len(analysis)
 
-    def _analyze_code_reuse(self, solution_code: Dict[str, str], scenario: Dict[str, Any]) -> float:
+    def _analyze_code_reuse(self, analysis: SolutionAnalysis, features: ScenarioFeatures) -> float:
         """Analyze effective code reuse patterns"""
         
-        reuse_patterns = {
-            'functions': ['func', 'function', 'def', 'method'],
-            'modules': ['import', 'include', 'require', 'use'],
-            'inheritance': ['extends', 'inherit', 'implement', 'interface'],
-            'composition': ['compose', 'mixin', 'trait', 'delegate']
-        }
-        
         # Detect code duplication
         code_blocks = []
-        for filename, code in solution_code.items():
-            lines = [line.strip() for line in code.split('\n') if line.strip()]
-            code_blocks.extend(lines)
+        for file in analysis.files:
+            code_blocks.extend(line for line in file.stripped if line)
         
         # Simple duplication detection
         unique_lines = set(code_blocks)
@@ -848,133 +971,113 @@ class AgentMetricsCalculator:
         
         reuse_score = 0.0
         
-        for filename, code in solution_code.items():
-            code_lower = code.lower()
+        for file in analysis.files:
+            hits = file.keyword_counts(_INDICATOR_SCANNER)
             file_score = 0.0
             
             # Check for reuse patterns
-            for pattern, indicators in reuse_patterns.items():
-                pattern_usage = sum(1 for indicator in indicators if indicator in code_lower)
+            for pattern, indicators in _REUSE_PATTERNS.items():
+                pattern_usage = sum(1 for indicator in indicators if hits[indicator])
                 if pattern_usage > 0:
                     file_score += 0.25
             
             reuse_score += min(file_score, 1.0)
         
         # Combine reuse patterns with duplication analysis
-        pattern_score = reuse_score / len(solution_code)
+        pattern_score = reuse_score / len(analysis)
         duplication_penalty = duplication_ratio * 0.5  # Penalize duplication
         
         return max(pattern_score - duplication_penalty, 0.0)
 
-    def _analyze_extension_patterns(self, solution_code: Dict[str, str]) -> float:
+    def _analyze_extension_patterns(self, analysis: SolutionAnalysis) -> float:
         """Analyze extensibility and extension patterns"""
         
-        extensibility_patterns = {
-            'interfaces': ['interface', 'protocol', 'contract'],
-            'plugins': ['plugin', 'extension', 'addon', 'module'],
-            'hooks': ['hook', 'callback', 'listener', 'event'],
-            'factories': ['factory', 'builder', 'creator', 'generator']
-        }
-        
         total_score = 0.0
         
-        for filename, code in solution_code.items():
-            code_lower = code.lower()
+        for file in analysis.files:
+            hits = file.keyword_counts(_INDICATOR_SCANNER)
             file_score = 0.0
             
             # Check for extensibility patterns
-            for pattern, indicators in extensibility_patterns.items():
-                pattern_usage = sum(1 for indicator in indicators if indicator in code_lower)
+            for pattern, indicators in _EXTENSIBILITY_PATTERNS.items():
+                pattern_usage = sum(1 for indicator in indicators if hits[indicator])
                 if pattern_usage > 0:
                     file_score += 0.25
             
             # Check for configuration support
-            if any(word in code_lower for word in ['config', 'setting', 'option', 'parameter']):
+            if any(hits[word] for word in _CONFIGURATION_MARKERS):
                 file_score += 0.15
             
             # Check for modular structure
-            if any(word in code_lower for word in ['module', 'component', 'service', 'package']):
+            if any(hits[word] for word in _MODULARITY_MARKERS):
                 file_score += 0.1
             
             total_score += min(file_score, 1.0)
         
-        return total_score / len(solution_code)
+        return total_score / len(analysis)
 
-    def _analyze_minimal_disruption(self, solution_code: Dict[str, str], scenario: Dict[str, Any]) -> float:
+    def _analyze_minimal_disruption(self, analysis: SolutionAnalysis, features: ScenarioFeatures) -> float:
         """Analyze minimal disruption to existing codebase"""
         
-        task_prompt = scenario.get('task_prompt', '').lower()
-        context_files = scenario.get('context_files', [])
-        
         # Check if this is a modification/integration task
-        is_modification_task = any(word in task_prompt for word in 
-                                 ['add', 'integrate', 'extend', 'enhance', 'modify'])
-        
-        if not is_modification_task:
+        if not features.prompt_mentions_any(_INTEGRATION_TASK_WORDS):
             return 0.7  # Neutral score for new implementations
         
-        disruption_indicators = {
-            'breaking_changes': ['breaking', 'remove', 'delete', 'replace'],
-            'non_breaking': ['add', 'extend', 'enhance', 'backward', 'compatible'],
-            'isolation': ['separate', 'isolate', 'encapsulate', 'module'],
-            'integration': ['integrate', 'connect', 'link', 'bridge']
-        }
-        
         total_score = 0.0
         
-        for filename, code in solution_code.items():
-            code_lower = code.lower()
+        for file in analysis.files:
+            hits = file.keyword_counts(_INDICATOR_SCANNER)
             file_score = 0.0
             
             # Penalize breaking changes
-            breaking_count = sum(1 for indicator in disruption_indicators['breaking_changes'] 
-                               if indicator in code_lower)
+            breaking_count = sum(1 for indicator in _DISRUPTION_INDICATORS['breaking_changes'] 
+                               if hits[indicator])
             file_score -= breaking_count * 0.2
             
             # Reward non-breaking approaches
-            non_breaking_count = sum(1 for indicator in disruption_indicators['non_breaking'] 
-                                   if indicator in code_lower)
+            non_breaking_count = sum(1 for indicator in _DISRUPTION_INDICATORS['non_breaking'] 
+                                   if hits[indicator])
             file_score += non_breaking_count * 0.3
             
             # Reward isolation
-            isolation_count = sum(1 for indicator in disruption_indicators['isolation'] 
-                                if indicator in code_lower)
+            isolation_count = sum(1 for indicator in _DISRUPTION_INDICATORS['isolation'] 
+                                if hits[indicator])
             file_score += isolation_count * 0.2
             
             total_score += max(file_score, 0.0)
         
-        return min(total_score / len(solution_code), 1.0)
+        return min(total_score / len(analysis), 1.0)
 
     # Helper methods for the new implementations
-    def _extract_identifiers(self, code: str) -> List[str]:
-        """Extract function and variable identifiers from code"""
-        # Go-specific patterns
-        go_functions = re.findall(r'func\s+([a-zA-Z_][a-zA-Z0-9_]*)', code)
-        go_variables = re.findall(r'var\s+([a-zA-Z_][a-zA-Z0-9_]*)', code)
-        go_types = re.findall(r'type\s+([a-zA-Z_][a-zA-Z0-9_]*)', code)
-        
-        # General patterns
-        general_functions = re.findall(r'def\s+([a-zA-Z_][a-zA-Z0-9_]*)', code)
-        general_variables = re.findall(r'([a-zA-Z_][a-zA-Z0-9_]*)\s*:?=', code)
-        
-        return go_functions + go_variables + go_types + general_functions + general_variables
-
     def _find_naming_inconsistencies(self, identifiers1: List[str], identifiers2: List[str]) -> int:
         """Find naming inconsistencies between two sets of identifiers"""
-        inconsistencies = 0
-        
-        # Simple heuristic: check for similar concepts with different naming styles
-        for id1 in identifiers1:
-            for id2 in identifiers2:
-                # Check if they might represent similar concepts
-                if self._are_similar_concepts(id1, id2):
-                    # Check if naming styles are different
-                    style1 = self._get_naming_style(id1)
-                    style2 = self._get_naming_style(id2)
-                    if style1 != style2:
-                        inconsistencies += 1
-        
-        return inconsistencies
+        return self._count_concept_conflicts(
+            self._concept_histogram(identifiers1), self._concept_histogram(identifiers2)
+        )
+
+    def _concept_histogram(self, identifiers: List[str]) -> Counter:
+        """Count identifiers by (concept roots they contain, naming style)
+
+        Identifiers sharing no root with anything are dropped; two
+        identifiers are similar concepts exactly when their root sets
+        intersect (see ``_are_similar_concepts``).
+        """
+        histogram = Counter()
+        for identifier in identifiers:
+            lowered = identifier.lower()
+            roots = frozenset(root for root in CONCEPT_ROOTS if root in lowered)
+            if roots:
+                histogram[roots, self._get_naming_style(identifier)] += 1
+        return histogram
+
+    def _count_concept_conflicts(self, histogram1: Counter, histogram2: Counter) -> int:
+        """Identifier pairs naming a similar concept in different styles"""
+        conflicts = 0
+        for (roots1, style1), count1 in histogram1.items():
+            for (roots2, style2), count2 in histogram2.items():
+                if style1 != style2 and roots1 & roots2:
+                    conflicts += count1 * count2
+        return conflicts
 
     def _are_similar_concepts(self, name1: str, name2: str) -> bool:
         """Check if two names might represent similar concepts"""
@@ -983,9 +1086,7 @@ class AgentMetricsCalculator:
         name2_lower = name2.lower()
         
         # Check for common prefixes/suffixes
-        common_roots = ['get', 'set', 'create', 'update', 'delete', 'handle', 'process']
-        
-        for root in common_roots:
+        for root in CONCEPT_ROOTS:
             if root in name1_lower and root in name2_lower:
                 return True
         
@@ -1011,75 +1112,62 @@ class AgentMetricsCalculator:
         variance = sum((x - mean) ** 2 for x in values) / len(values)
         return variance
 
-    def _analyze_terminology_consistency(self, solution_code: Dict[str, str], scenario: Dict[str, Any]) -> float:
+    def _analyze_terminology_consistency(self, analysis: SolutionAnalysis, features: ScenarioFeatures) -> float:
         """Analyze consistency of domain terminology usage"""
         
-        # Extract domain terms from task prompt
-        task_prompt = scenario.get('task_prompt', '')
-        domain_terms = re.findall(r'\b[A-Z][a-z]+\b', task_prompt)
+        # Domain terms from the task prompt
+        domain_terms = features.domain_terms
         
         if not domain_terms:
             return 0.6  # Neutral score if no clear domain terms
         
-        total_code = ' '.join(solution_code.values())
+        total_code = analysis.joined
         term_usage_consistency = 0.0
         
-        for term in set(domain_terms):
+        for term in domain_terms:
             # Check if term is used consistently across solution
             term_variants = [term, term.lower(), term.upper()]
             usage_count = sum(total_code.count(variant) for variant in term_variants)
             
             if usage_count > 0:
-                term_usage_consistency += 1.0 / len(set(domain_terms))
+                term_usage_consistency += 1.0 / len(domain_terms)
         
         return min(term_usage_consistency, 1.0)
 
     # Real implementations for remaining methods
-    def _analyze_architectural_extraction(self, solution_code: Dict[str, str], scenario: Dict[str, Any]) -> float:
+    def _analyze_architectural_extraction(self, analysis: SolutionAnalysis, features: ScenarioFeatures) -> float:
         """Analyze information extraction for architectural understanding tasks"""
         
-        description = scenario.get('description', '').lower()
-        task_prompt = scenario.get('task_prompt', '').lower()
-        combined_text = description + ' ' + task_prompt
-        total_code = ' '.join(solution_code.values()).lower()
+        total_code = analysis.joined_lower
         
         # 1. Architecture pattern recognition (40%)
-        architecture_patterns = [
-            'middleware', 'handler', 'controller', 'service', 'repository', 'model',
-            'mvc', 'rest', 'api', 'router', 'endpoint', 'interface', 'struct',
-            'package', 'module', 'component', 'layer', 'tier'
-        ]
-        
         pattern_extraction_score = 0.0
-        patterns_mentioned = [p for p in architecture_patterns if p in combined_text]
+        patterns_mentioned = features.mentioned(_ARCHITECTURE_TERMS)
         patterns_implemented = [p for p in patterns_mentioned if p in total_code]
         
         if patterns_mentioned:
             pattern_extraction_score = len(patterns_implemented) / len(patterns_mentioned)
         
         # 2. Structural element extraction (35%)
-        structural_keywords = ['function', 'method', 'class', 'struct', 'interface', 'package']
         structural_score = 0.0
         
-        for keyword in structural_keywords:
-            if keyword in combined_text:
-                # Check if solution implements this structural element
-                if keyword == 'function' and 'func ' in total_code:
-                    structural_score += 1
-                elif keyword == 'struct' and 'type ' in total_code and 'struct' in total_code:
-                    structural_score += 1
-                elif keyword == 'interface' and 'interface' in total_code:
-                    structural_score += 1
-                elif keyword == 'package' and 'package ' in total_code:
-                    structural_score += 1
+        for keyword in features.mentioned(_STRUCTURAL_TERMS):
+            # Check if solution implements this structural element
+            if keyword == 'function' and 'func ' in total_code:
+                structural_score += 1
+            elif keyword == 'struct' and 'type ' in total_code and 'struct' in total_code:
+                structural_score += 1
+            elif keyword == 'interface' and 'interface' in total_code:
+                structural_score += 1
+            elif keyword == 'package' and 'package ' in total_code:
+                structural_score += 1
         
         structural_score = min(structural_score / 4.0, 1.0)
         
         # 3. Dependency relationship extraction (25%)
-        dependency_keywords = ['import', 'dependency', 'require', 'use', 'call', 'invoke']
         dependency_score = 0.0
         
-        deps_mentioned = [d for d in dependency_keywords if d in combined_text]
+        deps_mentioned = features.mentioned(_DEPENDENCY_TERMS)
         deps_implemented = [d for d in deps_mentioned if d in total_code or 'import' in total_code]
         
         if deps_mentioned:
@@ -1091,47 +1179,31 @@ class AgentMetricsCalculator:
             dependency_score * 0.25
         )
 
-    def _analyze_feature_extraction(self, solution_code: Dict[str, str], scenario: Dict[str, Any]) -> float:
+    def _analyze_feature_extraction(self, analysis: SolutionAnalysis, features: ScenarioFeatures) -> float:
         """Analyze information extraction for feature implementation tasks"""
         
-        description = scenario.get('description', '').lower()
-        task_prompt = scenario.get('task_prompt', '').lower()
-        combined_text = description + ' ' + task_prompt
-        total_code = ' '.join(solution_code.values()).lower()
+        total_code = analysis.joined_lower
         
         # 1. Business logic extraction (45%)
-        business_keywords = [
-            'user', 'customer', 'order', 'product', 'payment', 'account', 'profile',
-            'create', 'update', 'delete', 'get', 'list', 'search', 'filter',
-            'validate', 'process', 'calculate', 'generate', 'send', 'receive'
-        ]
-        
         business_extraction_score = 0.0
-        business_mentioned = [k for k in business_keywords if k in combined_text]
+        business_mentioned = features.mentioned(_BUSINESS_TERMS)
         business_implemented = [k for k in business_mentioned if k in total_code]
         
         if business_mentioned:
             business_extraction_score = len(business_implemented) / len(business_mentioned)
         
         # 2. Data flow extraction (30%)
-        data_flow_keywords = [
-            'input', 'output', 'request', 'response', 'data', 'parameter',
-            'return', 'result', 'json', 'xml', 'struct', 'map', 'array', 'slice'
-        ]
-        
         data_flow_score = 0.0
-        data_mentioned = [k for k in data_flow_keywords if k in combined_text]
+        data_mentioned = features.mentioned(_DATA_TERMS)
         data_implemented = [k for k in data_mentioned if k in total_code]
         
         if data_mentioned:
             data_flow_score = len(data_implemented) / len(data_mentioned)
         
         # 3. Error handling extraction (25%)
-        error_keywords = ['error', 'exception', 'fail', 'invalid', 'check', 'validate']
         error_score = 0.0
         
-        errors_mentioned = [e for e in error_keywords if e in combined_text]
-        if errors_mentioned:
+        if features.mentioned(_ERROR_TERMS):
             # Check for Go error handling patterns
             has_error_handling = (
                 'if err != nil' in total_code or
@@ -1146,35 +1218,23 @@ class AgentMetricsCalculator:
             error_score * 0.25
         )
 
-    def _analyze_general_extraction(self, solution_code: Dict[str, str], scenario: Dict[str, Any]) -> float:
+    def _analyze_general_extraction(self, analysis: SolutionAnalysis, features: ScenarioFeatures) -> float:
         """Analyze information extraction for general tasks"""
         
-        description = scenario.get('description', '').lower()
-        task_prompt = scenario.get('task_prompt', '').lower()
-        combined_text = description + ' ' + task_prompt
-        total_code = ' '.join(solution_code.values()).lower()
+        total_code = analysis.joined_lower
         
         # 1. Key concept extraction (40%)
-        # Extract nouns and important keywords from scenario
-        import re
-        
         # Simple noun extraction (words that are capitalized or technical terms)
-        concept_patterns = re.findall(r'\b[A-Z][a-z]+\b|\b(?:func|struct|interface|package|import)\b', 
-                                    description + ' ' + task_prompt)
+        concepts = features.concepts
         concept_score = 0.0
         
-        if concept_patterns:
-            concepts_in_code = [c for c in concept_patterns if c.lower() in total_code]
-            concept_score = len(concepts_in_code) / len(concept_patterns)
+        if concepts:
+            concepts_in_code = [c for c in concepts if c in total_code]
+            concept_score = len(concepts_in_code) / len(concepts)
         
         # 2. Action extraction (35%)
-        action_keywords = [
-            'implement', 'create', 'build', 'add', 'update', 'modify', 'delete',
-            'handle', 'process', 'manage', 'execute', 'run', 'start', 'stop'
-        ]
-        
         action_score = 0.0
-        actions_mentioned = [a for a in action_keywords if a in combined_text]
+        actions_mentioned = features.mentioned(_ACTION_TERMS)
         
         if actions_mentioned:
             # Check if solution has function definitions (actions implemented)
@@ -1182,13 +1242,8 @@ class AgentMetricsCalculator:
             action_score = min(func_count / len(actions_mentioned), 1.0)
         
         # 3. Technical requirement extraction (25%)
-        tech_keywords = [
-            'http', 'json', 'api', 'rest', 'endpoint', 'server', 'client',
-            'database', 'sql', 'query', 'connection', 'session', 'cookie'
-        ]
-        
         tech_score = 0.0
-        tech_mentioned = [t for t in tech_keywords if t in combined_text]
+        tech_mentioned = features.mentioned(_TECH_TERMS)
         tech_implemented = [t for t in tech_mentioned if t in total_code]
         
         if tech_mentioned:
@@ -1200,48 +1255,47 @@ class AgentMetricsCalculator:
             tech_score * 0.25
         )
 
-    def _analyze_context_usage(self, solution_code: Dict[str, str], context_files: List[str]) -> float:
+    def _analyze_context_usage(self, analysis: SolutionAnalysis, features: ScenarioFeatures) -> float:
         """Analyze how well the solution uses provided context"""
         context_usage_score = 0.0
+        context_names = features.context_names
         
-        if not context_files:
+        if not context_names:
             return 0.5
         
         # Check if solution references context file patterns
-        for filename, code in solution_code.items():
-            for context_file in context_files:
-                context_name = Path(context_file).stem
-                if context_name.lower() in code.lower():
-                    context_usage_score += 1.0 / len(context_files)
+        for file in analysis.files:
+            for context_name in context_names:
+                if file.mentions(context_name):
+                    context_usage_score += 1.0 / len(context_names)
         
         return min(context_usage_score, 1.0)
 
-    def _analyze_requirement_coverage(self, solution_code: Dict[str, str], task_prompt: str) -> float:
+    def _analyze_requirement_coverage(self, analysis: SolutionAnalysis, features: ScenarioFeatures) -> float:
         """Analyze how well solution covers task requirements"""
-        if not task_prompt:
+        if not features.task_prompt:
             return 0.5
         
-        # Extract key requirements from task prompt
-        requirement_keywords = re.findall(r'\b[A-Z][a-z]+(?:[A-Z][a-z]*)*\b', task_prompt)
-        requirement_keywords.extend(['implement', 'create', 'add', 'update', 'fix', 'analyze'])
+        # Key requirements from the task prompt
+        requirement_keywords = features.requirement_keywords
         
         coverage_score = 0.0
-        total_code = ' '.join(solution_code.values()).lower()
+        total_code = analysis.joined_lower
         
-        for keyword in set(requirement_keywords):
-            if keyword.lower() in total_code:
-                coverage_score += 1.0 / len(set(requirement_keywords))
+        for keyword in requirement_keywords:
+            if keyword in total_code:
+                coverage_score += 1.0 / len(requirement_keywords)
         
         return min(coverage_score, 1.0)
 
-    def _analyze_information_extraction(self, solution_code: Dict[str, str], scenario: Dict[str, Any]) -> float:
+    def _analyze_information_extraction(self, analysis: SolutionAnalysis, features: ScenarioFeatures) -> float:
         """Analyze quality of information extraction from scenario"""
-        task_category = scenario.get('task_category', '')
+        task_category = features.task_category
         
         # Different extraction strategies based on task category
         if task_category == 'architectural_understanding':
-            return self._analyze_architectural_extraction(solution_code, scenario)
+            return self._analyze_architectural_extraction(analysis, features)
         elif task_category == 'feature_implementation':
-            return self._analyze_feature_extraction(solution_code, scenario)
+            return self._analyze_feature_extraction(analysis, features)
         else:
-            return self._analyze_general_extraction(solution_code, scenario) 
\ No newline at end of file
+            return self._analyze_general_extraction(analysis, features) 
\ No newline at end of file
@@ -3,19 +3,41 @@ Scenario Generator for AgentCodeEval Phase 3
 Converts completed projects into agent evaluation scenarios
 """
 
+import asyncio
 import json
 import logging
 import random
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Mapping, Optional, Tuple
 from dataclasses import dataclass
 
 from ..core.task import TaskCategory, DifficultyLevel
 from ..core.config import Config
+from ..analysis.dependency_analyzer import DependencyAnalyzer, DependencyGraph
+from ..analysis.lexical_index import LexicalIndex
+from ..utils.tokenizer import get_token_counter
+from .content_store import ProjectContentStore
+from .context_packer import ContextPacker
+from .scenario_planner import ScenarioSlot
 from .synthetic_generator import MultiLLMGenerator
 
 logger = logging.getLogger(__name__)
 
+# Bump when scenario prompts or context selection change, so the build
+# manifest regenerates existing scenario files
+SCENARIO_GENERATOR_VERSION = 3
+
+# Categories whose seed files come from lexical retrieval (when the project has
+# an index), with the terms their queries start from
+CATEGORY_QUERY_TERMS = {
+    TaskCategory.ARCHITECTURAL_UNDERSTANDING: "main app server router handler service config init",
+    TaskCategory.FEATURE_IMPLEMENTATION: "service handler model",
+    TaskCategory.BUG_INVESTIGATION: "error exception fail retry validate",
+    TaskCategory.INTEGRATION_TESTING: "test api client request response integration",
+    TaskCategory.SECURITY_ANALYSIS: "auth token password secret crypto hash session permission sanitize"
+}
+RETRIEVAL_TOP_K = 8
+
 
 @dataclass
 class EvaluationScenario:
@@ -32,6 +54,7 @@ class EvaluationScenario:
     ground_truth: str
     evaluation_criteria: List[str]
     metadata: Dict[str, Any]
+    context_tokens: int = 0
 
 
 class ScenarioGenerator:
@@ -40,6 +63,18 @@ class ScenarioGenerator:
     def __init__(self, config: Config):
         self.config = config
         self.llm_generator = MultiLLMGenerator(config)
+        self.token_counter = get_token_counter()
+        self.context_packer = ContextPacker(self.token_counter)
+        
+        # Dependency graphs are built once per project and shared across categories
+        self.dependency_analyzer = DependencyAnalyzer()
+        self._dependency_graphs: Dict[str, DependencyGraph] = {}
+        
+        # Memory-mapped project contents, opened once per project
+        self._content_stores: Dict[str, ProjectContentStore] = {}
+        
+        # BM25 indexes for grounding context selection in the scenario's topic
+        self._lexical_indexes: Dict[str, LexicalIndex] = {}
         
         # Create output directories
         self.scenarios_dir = Path(config.data.output_dir) / "scenarios"
@@ -50,17 +85,26 @@ class ScenarioGenerator:
         project_dir: Path,
         project_data: Dict[str, Any],
         task_category: TaskCategory,
-        num_instances: int = 1
+        num_instances: int = 1,
+        slots: Optional[List[ScenarioSlot]] = None
     ) -> List[Dict[str, Any]]:
-        """Generate evaluation scenarios for a specific task category"""
+        """Generate evaluation scenarios for a specific task category
+        
+        With ``slots`` from the scenario planner, one scenario is generated per
+        slot at the slot's difficulty and token budget; ``num_instances`` is
+        then ignored.
+        """
+        
+        if slots is not None:
+            num_instances = len(slots)
         
         spec = project_data['specification']
         generated_stats = project_data.get('generated_stats', {})
         
         # Load project files for context
         project_files = self._load_project_files(project_dir, project_data)
-        
-        scenarios = []
+        dependency_graph = self._get_dependency_graph(project_dir.name, project_files)
+        lexical_index = self._get_lexical_index(project_dir, project_files)
         
         # Import Rich console for progress reporting
         from rich.console import Console
@@ -68,71 +112,121 @@ class ScenarioGenerator:
         
         console.print(f"         🔄 Generating {num_instances} {task_category.value} scenarios...")
         
-        for i in range(num_instances):
+        async def _generate_instance(i: int) -> Optional[Dict[str, Any]]:
+            # Ids depend only on the instance index, not on completion order
             scenario_id = f"{project_dir.name}_{task_category.value}_{i+1:02d}"
+            slot = slots[i] if slots is not None else None
             
             try:
-                console.print(f"         📝 Scenario {i+1}/{num_instances}: {scenario_id}", end="")
-                
                 scenario = await self._generate_single_scenario(
                     scenario_id=scenario_id,
                     task_category=task_category,
                     project_spec=spec,
                     project_files=project_files,
-                    project_stats=generated_stats
+                    project_stats=generated_stats,
+                    target_difficulty=slot.difficulty if slot else None,
+                    dependency_graph=dependency_graph,
+                    token_budget=slot.token_budget if slot else None,
+                    lexical_index=lexical_index
                 )
                 
                 # Show context info
-                context_length = scenario.get('context_length', 0)
+                context_tokens = scenario.get('context_tokens', 0)
                 files_count = len(scenario.get('context_files', []))
                 difficulty = scenario.get('difficulty', 'unknown')
                 
-                console.print(f" ✅ ({difficulty}, {files_count} files, {context_length:,} chars)")
-                
-                scenarios.append(scenario)
+                console.print(f"         📝 Scenario {i+1}/{num_instances}: {scenario_id} ✅ ({difficulty}, {files_count} files, {context_tokens:,} tokens)")
                 logger.info(f"Generated scenario {scenario_id}")
+                return scenario
                 
             except Exception as e:
-                console.print(f" ❌ Error: {str(e)}")
+                console.print(f"         📝 Scenario {i+1}/{num_instances}: {scenario_id} ❌ Error: {str(e)}")
                 logger.error(f"Failed to generate scenario {scenario_id}: {e}")
-                continue
+                return None
+        
+        # Instances run concurrently; LLM calls are bounded by the generator's shared rate limiter
+        results = await asyncio.gather(*(_generate_instance(i) for i in range(num_instances)))
+        scenarios = [scenario for scenario in results if scenario is not None]
         
         console.print(f"         🎉 [bold green]Completed {len(scenarios)}/{num_instances} scenarios[/bold green]")
         
         return scenarios
     
-    def _load_project_files(self, project_dir: Path, project_data: Dict[str, Any]) -> Dict[str, str]:
-        """Load all project files into memory"""
-        files = {}
-        
-        # Load files listed in metadata
-        for file_info in project_data.get('files', []):
-            file_path = project_dir / file_info['path']
-            if file_path.exists():
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        files[file_info['path']] = f.read()
-                except Exception as e:
-                    logger.warning(f"Could not read file {file_path}: {e}")
-        
-        return files
+    def _load_project_files(self, project_dir: Path, project_data: Dict[str, Any]) -> ProjectContentStore:
+        """Open the project's packed content store (shared by all category tasks)"""
+        store_key = str(project_dir)
+        store = self._content_stores.get(store_key)
+        if store is None:
+            file_paths = [file_info['path'] for file_info in project_data.get('files', [])]
+            store = ProjectContentStore.open(project_dir, file_paths)
+            self._content_stores[store_key] = store
+        return store
+    
+    def scenario_inputs(self, project_dir: Path, project_data: Dict[str, Any], task_category: TaskCategory,
+                        slots: List[ScenarioSlot]) -> Dict[str, Any]:
+        """Everything a project+category scenario file is derived from (for the build manifest)"""
+        project_files = self._load_project_files(project_dir, project_data)
+        return {
+            'generator_version': SCENARIO_GENERATOR_VERSION,
+            'project_content': project_files.fingerprint(),
+            'specification': project_data.get('specification', {}),
+            'task_category': task_category.value,
+            'slots': [[slot.difficulty.value, list(slot.token_budget)] for slot in slots],
+            'context_ranges': {k: list(v) for k, v in self.config.benchmark.context_ranges.items()}
+        }
+    
+    def project_token_count(self, project_dir: Path, project_data: Dict[str, Any]) -> int:
+        """Total tokens across a project's files (what the largest context could hold)"""
+        project_files = self._load_project_files(project_dir, project_data)
+        return sum(self._file_tokens(project_files, path) for path in project_files)
     
     async def _generate_single_scenario(
         self,
         scenario_id: str,
         task_category: TaskCategory,
         project_spec: Dict[str, Any],
-        project_files: Dict[str, str],
-        project_stats: Dict[str, Any]
+        project_files: Mapping[str, str],
+        project_stats: Dict[str, Any],
+        target_difficulty: Optional[DifficultyLevel] = None,
+        dependency_graph: Optional[DependencyGraph] = None,
+        token_budget: Optional[Tuple[int, int]] = None,
+        lexical_index: Optional[LexicalIndex] = None
     ) -> Dict[str, Any]:
         """Generate a single evaluation scenario"""
         
-        # Select files for context based on task category
-        context_files = self._select_context_files(task_category, project_files)
+        # Aim for the tier matching the project's complexity unless told otherwise
+        if target_difficulty is None:
+            target_difficulty = self._target_difficulty(project_spec.get('complexity', 'medium'))
+        
+        # Select files for context based on task category, packed to the tier's token budget
+        retrieval_query = self._retrieval_query(task_category, project_spec) if lexical_index else None
+        candidate_paths = self._select_context_files(task_category, project_files, dependency_graph,
+                                                     lexical_index, retrieval_query)
+        context_chunks = None
+        if target_difficulty.value in self.config.benchmark.chunked_context_tiers:
+            # Function-level packing: keep every signature, restore the most relevant bodies
+            _, max_tokens = token_budget or self.config.benchmark.context_ranges[target_difficulty.value]
+            candidate_set = set(candidate_paths)
+            ordered_paths = candidate_paths + [path for path in project_files if path not in candidate_set]
+            packed = self.context_packer.pack(
+                {path: project_files[path] for path in ordered_paths},
+                query=retrieval_query or self._get_category_focus(task_category),
+                max_tokens=max_tokens
+            )
+            context_files = packed.files
+            context_tokens = packed.tokens
+            context_chunks = packed.layout
+        else:
+            context_paths = self._pack_context_files(candidate_paths, project_files, target_difficulty, token_budget)
+            context_tokens = sum(self._file_tokens(project_files, path) for path in context_paths)
+            
+            # Materialize file text only for the files that go into the prompt
+            context_files = {path: project_files[path] for path in context_paths}
+        
         context_length = sum(len(content) for content in context_files.values())
         
-        # Determine difficulty based on context length and complexity
-        difficulty = self._determine_difficulty(context_length, project_spec.get('complexity', 'medium'))
+        # Determine difficulty from the actual token count
+        difficulty = self._determine_difficulty(context_tokens)
         
         # Generate scenario using LLM
         scenario_data = await self._generate_scenario_content(
@@ -143,7 +237,7 @@ class ScenarioGenerator:
             scenario_id=scenario_id
         )
         
-        return {
+        scenario = {
             "id": scenario_id,
             "task_category": task_category.value,
             "difficulty": difficulty.value,
@@ -151,6 +245,7 @@ class ScenarioGenerator:
             "description": scenario_data.get('description', ''),
             "context_files": list(context_files.keys()),
             "context_length": context_length,
+            "context_tokens": context_tokens,
             "task_prompt": scenario_data.get('task_prompt', ''),
             "expected_approach": scenario_data.get('expected_approach', ''),
             "ground_truth": scenario_data.get('ground_truth', ''),
@@ -160,15 +255,97 @@ class ScenarioGenerator:
                 "project_domain": project_spec.get('domain'),
                 "project_features": project_spec.get('features', []),
                 "files_count": len(context_files),
+                "retrieval_query": retrieval_query,
                 "generation_timestamp": self._get_timestamp()
             }
         }
+        
+        # Evaluation re-renders the same elided view from the project files
+        if context_chunks is not None:
+            scenario["context_chunks"] = context_chunks
+        
+        return scenario
+    
+    def _get_dependency_graph(self, project_id: str, project_files: Mapping[str, str]) -> DependencyGraph:
+        """Dependency graph for a project, built on first use"""
+        graph = self._dependency_graphs.get(project_id)
+        if graph is None:
+            graph = self.dependency_analyzer.build_content_graph(project_files)
+            self._dependency_graphs[project_id] = graph
+            logger.info(f"Built dependency graph for {project_id}: {len(graph.ranks)} files, {graph.edge_count} edges")
+        return graph
+    
+    def _get_lexical_index(self, project_dir: Path, project_files: Mapping[str, str]) -> LexicalIndex:
+        """Project's BM25 index, refreshed for changed files on first use"""
+        store_key = str(project_dir)
+        index = self._lexical_indexes.get(store_key)
+        if index is None:
+            index = LexicalIndex.open(project_dir)
+            digest_of = project_files.digest if isinstance(project_files, ProjectContentStore) else None
+            if index.update(project_files, digest_of=digest_of):
+                index.save()
+            self._lexical_indexes[store_key] = index
+        return index
+    
+    def _retrieval_query(self, task_category: TaskCategory, project_spec: Dict[str, Any]) -> Optional[str]:
+        """Query for a category's seed files; features vary it between scenarios"""
+        terms = CATEGORY_QUERY_TERMS.get(task_category)
+        if terms is None:
+            return None
+        features = project_spec.get('features', [])
+        if features:
+            terms = f"{random.choice(features)} {terms}"
+        return terms
+    
+    def _select_context_files(self, task_category: TaskCategory, project_files: Mapping[str, str],
+                              dependency_graph: Optional[DependencyGraph] = None,
+                              lexical_index: Optional[LexicalIndex] = None,
+                              retrieval_query: Optional[str] = None) -> List[str]:
+        """Select relevant file paths for the task context, in priority order
+        
+        The category strategy picks seed files; with a dependency graph the
+        context then grows outward from the seeds along import edges, so the
+        files packed into the token budget are connected to each other.
+        """
+        seed_paths = self._select_seed_files(task_category, project_files, lexical_index, retrieval_query)
+        
+        if not seed_paths or dependency_graph is None or not dependency_graph.has_edges:
+            return seed_paths
+        
+        return self._expand_with_dependencies(seed_paths, dependency_graph)
+    
+    def _expand_with_dependencies(self, seed_paths: List[str], dependency_graph: DependencyGraph) -> List[str]:
+        """Order files by BFS over the dependency graph starting from the seeds"""
+        ranked_seeds = dependency_graph.ranked_files(seed_paths)
+        if not ranked_seeds:
+            return seed_paths
+        
+        # Start from a rank-weighted random seed so repeated scenarios differ
+        primary = random.choices(ranked_seeds, weights=[dependency_graph.ranks[f] for f in ranked_seeds])[0]
+        seed_order = [primary] + [f for f in ranked_seeds if f != primary]
+        
+        ordered = dependency_graph.traverse(seed_order, preferred=set(seed_paths))
+        
+        # Seeds outside the graph (e.g. non-source files) keep their place at the end
+        in_order = set(ordered)
+        ordered.extend(path for path in seed_paths if path not in in_order)
+        
+        return ordered
     
-    def _select_context_files(self, task_category: TaskCategory, project_files: Dict[str, str]) -> Dict[str, str]:
-        """Select relevant files for the task context"""
+    def _select_seed_files(self, task_category: TaskCategory, project_files: Mapping[str, str],
+                           lexical_index: Optional[LexicalIndex] = None,
+                           retrieval_query: Optional[str] = None) -> List[str]:
+        """Category-specific starting files for the task context"""
         
         if not project_files:
-            return {}
+            return []
+        
+        # Files that actually mention the scenario's topic beat path patterns
+        if lexical_index is not None and retrieval_query:
+            hits = [path for path, _ in lexical_index.search(retrieval_query, top_k=RETRIEVAL_TOP_K)
+                    if path in project_files]
+            if hits:
+                return hits
         
         # Different strategies based on task category
         if task_category == TaskCategory.ARCHITECTURAL_UNDERSTANDING:
@@ -206,13 +383,12 @@ class ScenarioGenerator:
         # Default: random selection
         return self._select_random_subset(project_files, min_files=2, max_files=6)
     
-    def _select_files_by_pattern(self, project_files: Dict[str, str], patterns: List[str]) -> Dict[str, str]:
+    def _select_files_by_pattern(self, project_files: Mapping[str, str], patterns: List[str]) -> List[str]:
         """Select files matching any of the given patterns"""
-        selected = {}
-        
-        for file_path, content in project_files.items():
-            if any(pattern.lower() in file_path.lower() for pattern in patterns):
-                selected[file_path] = content
+        selected = [
+            file_path for file_path in project_files
+            if any(pattern.lower() in file_path.lower() for pattern in patterns)
+        ]
         
         # If no matches, return a random subset
         if not selected:
@@ -220,51 +396,101 @@ class ScenarioGenerator:
         
         return selected
     
-    def _select_random_subset(self, project_files: Dict[str, str], min_files: int = 2, max_files: int = 6) -> Dict[str, str]:
+    def _select_random_subset(self, project_files: Mapping[str, str], min_files: int = 2, max_files: int = 6) -> List[str]:
         """Select a random subset of files"""
-        file_list = list(project_files.items())
+        file_list = list(project_files)
         count = min(max_files, max(min_files, len(file_list)))
         count = min(count, len(file_list))
         
-        selected_items = random.sample(file_list, count)
-        return dict(selected_items)
+        return random.sample(file_list, count)
     
-    def _select_files_by_complexity(self, project_files: Dict[str, str], target_count: int = 4) -> Dict[str, str]:
+    def _select_files_by_complexity(self, project_files: Mapping[str, str], target_count: int = 4) -> List[str]:
         """Select files based on complexity (length, lines, etc.)"""
         # Sort files by length (simple complexity metric)
-        sorted_files = sorted(project_files.items(), key=lambda x: len(x[1]), reverse=True)
+        sorted_files = sorted(project_files, key=lambda path: self._file_size(project_files, path), reverse=True)
         
         # Take the most complex files up to target count
         selected_count = min(target_count, len(sorted_files))
-        return dict(sorted_files[:selected_count])
+        return sorted_files[:selected_count]
     
-    def _determine_difficulty(self, context_length: int, project_complexity: str) -> DifficultyLevel:
-        """Determine difficulty level based on context and project complexity"""
-        
-        # Base difficulty on context length
-        if context_length < 20000:
-            base_difficulty = DifficultyLevel.EASY
-        elif context_length < 60000:
-            base_difficulty = DifficultyLevel.MEDIUM
-        elif context_length < 150000:
-            base_difficulty = DifficultyLevel.HARD
-        else:
-            base_difficulty = DifficultyLevel.EXPERT
-        
-        # Adjust based on project complexity
-        complexity_adjustment = {
-            'easy': -1,
-            'medium': 0,
-            'hard': 1,
-            'expert': 2
-        }
+    def _file_size(self, project_files: Mapping[str, str], path: str) -> int:
+        """File size without materializing content when backed by a content store"""
+        if isinstance(project_files, ProjectContentStore):
+            return project_files.size(path)
+        return len(project_files[path])
+    
+    def _file_tokens(self, project_files: Mapping[str, str], path: str) -> int:
+        """Token count of a file, decoding its content only on a cache miss"""
+        if isinstance(project_files, ProjectContentStore):
+            digest = project_files.digest(path)
+            tokens = self.token_counter.cached_count(digest)
+            if tokens is None:
+                tokens = self.token_counter.count(project_files[path], digest=digest)
+            return tokens
+        return self.token_counter.count(project_files[path])
+    
+    def _target_difficulty(self, project_complexity: str) -> DifficultyLevel:
+        """Map a project's complexity to the difficulty tier its scenarios aim for"""
+        try:
+            return DifficultyLevel(project_complexity.lower())
+        except ValueError:
+            return DifficultyLevel.MEDIUM
+    
+    def _pack_context_files(self, candidate_paths: List[str], project_files: Mapping[str, str],
+                            target_difficulty: DifficultyLevel,
+                            token_budget: Optional[Tuple[int, int]] = None) -> List[str]:
+        """Pack files into the target tier's token range
+        
+        Category-selected candidates go first, in order; remaining project
+        files are only added when the candidates fall short of the tier's
+        minimum. A file that would overflow the tier's maximum is skipped in
+        favour of smaller ones, so the context never exceeds the budget.
+        ``token_budget`` overrides the tier's (min, max) range.
+        """
+        min_tokens, max_tokens = token_budget or self.config.benchmark.context_ranges[target_difficulty.value]
+        
+        packed = []
+        packed_set = set()
+        used_tokens = 0
+        
+        def _fill(paths: List[str], limit: int):
+            nonlocal used_tokens
+            for file_path in paths:
+                if used_tokens >= limit:
+                    break
+                if file_path in packed_set:
+                    continue
+                tokens = self._file_tokens(project_files, file_path)
+                if used_tokens + tokens <= max_tokens:
+                    packed.append(file_path)
+                    packed_set.add(file_path)
+                    used_tokens += tokens
+        
+        _fill(candidate_paths, max_tokens)
+        
+        if used_tokens < min_tokens:
+            remaining = [path for path in project_files if path not in packed_set]
+            random.shuffle(remaining)
+            _fill(remaining, min_tokens)
+        
+        # Never return an empty context when the project has files
+        if not packed and candidate_paths:
+            packed.append(min(candidate_paths, key=lambda path: self._file_tokens(project_files, path)))
+        
+        return packed
+    
+    def _determine_difficulty(self, context_tokens: int) -> DifficultyLevel:
+        """Determine difficulty level from context size in tokens (``context_ranges``)"""
+        
+        context_ranges = self.config.benchmark.context_ranges
         
-        difficulty_levels = [DifficultyLevel.EASY, DifficultyLevel.MEDIUM, DifficultyLevel.HARD, DifficultyLevel.EXPERT]
-        current_index = difficulty_levels.index(base_difficulty)
-        adjustment = complexity_adjustment.get(project_complexity.lower(), 0)
+        # Tiers are contiguous; pick the highest tier whose minimum is reached
+        difficulty = DifficultyLevel.EASY
+        for level in [DifficultyLevel.EASY, DifficultyLevel.MEDIUM, DifficultyLevel.HARD, DifficultyLevel.EXPERT]:
+            if context_tokens >= context_ranges[level.value][0]:
+                difficulty = level
         
-        new_index = max(0, min(len(difficulty_levels) - 1, current_index + adjustment))
-        return difficulty_levels[new_index]
+        return difficulty
     
     async def _generate_scenario_content(
         self,
@@ -285,7 +511,8 @@ class ScenarioGenerator:
         for file_path, content in context_files.items():
             lines = len(content.splitlines())
             chars = len(content)
-            files_summary.append(f"- {file_path}: {lines} lines, {chars} chars")
+            tokens = self.token_counter.count(content)
+            files_summary.append(f"- {file_path}: {lines} lines, {chars} chars, {tokens} tokens")
         
         context_summary = "\n".join(files_summary)
         
@@ -329,7 +556,8 @@ class ScenarioGenerator:
             response = await self.llm_generator.generate_with_model(
                 self.llm_generator.generators["scenarios"],
                 prompt,
-                system_prompt
+                system_prompt,
+                task="scenarios"
             )
             
             console.print(f"           📝 LLM response length: {len(response)} chars")
@@ -0,0 +1,333 @@
+"""
+Global scenario planning for AgentCodeEval Phase 3
+
+Before any LLM call, the planner assigns every scenario of the benchmark to
+a (project, task category, difficulty) slot so that the generated set meets
+``BenchmarkConfig.task_distribution`` and ``difficulty_distribution``
+exactly:
+
+1. Both distributions are scaled to ``total_instances`` (largest remainder).
+2. A category x difficulty count matrix is built whose row and column sums
+   match the two distributions.
+3. Each cell's slots are placed greedily on projects large enough to fill
+   the tier's token range, most constrained tiers first, spreading each
+   category evenly over projects.
+
+A tier that no project is large enough for is demoted to the largest
+feasible tier, and the shortfall is reported.
+
+Plans are saved next to the build manifest. When re-planning, new and
+resized projects get their share of a fresh plan, the slots of every
+unchanged project are carried over as far as the remaining quotas allow, and
+only what is left is placed greedily, so changing one project does not
+reshuffle the slots, and hence the scenario files, of the others.
+"""
+
+import heapq
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..core.config import Config
+from ..core.task import TaskCategory, DifficultyLevel
+
+logger = logging.getLogger(__name__)
+
+
+PLAN_FILE_NAME = "scenario_plan.json"
+
+DIFFICULTY_ORDER = [DifficultyLevel.EASY, DifficultyLevel.MEDIUM, DifficultyLevel.HARD, DifficultyLevel.EXPERT]
+
+
+@dataclass
+class ScenarioSlot:
+    """One planned scenario"""
+    project_id: str
+    task_category: TaskCategory
+    difficulty: DifficultyLevel
+    token_budget: Tuple[int, int]
+
+
+@dataclass
+class ScenarioPlan:
+    """Planned slots, grouped by (project, category)"""
+    slots: Dict[Tuple[str, TaskCategory], List[ScenarioSlot]] = field(default_factory=dict)
+    demoted: Dict[str, int] = field(default_factory=dict)
+    project_tokens: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def total(self) -> int:
+        return sum(len(slots) for slots in self.slots.values())
+
+    def slots_for(self, project_id: str, task_category: TaskCategory) -> List[ScenarioSlot]:
+        return self.slots.get((project_id, task_category), [])
+
+    def category_counts(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for (_, category), slots in self.slots.items():
+            counts[category.value] = counts.get(category.value, 0) + len(slots)
+        return counts
+
+    def difficulty_counts(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for slots in self.slots.values():
+            for slot in slots:
+                counts[slot.difficulty.value] = counts.get(slot.difficulty.value, 0) + 1
+        return counts
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'project_tokens': self.project_tokens,
+            'demoted': self.demoted,
+            'slots': [
+                [slot.project_id, slot.task_category.value, slot.difficulty.value, list(slot.token_budget)]
+                for _, slots in sorted(self.slots.items(), key=lambda item: (item[0][0], item[0][1].value))
+                for slot in slots
+            ]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ScenarioPlan':
+        plan = cls(demoted=dict(data.get('demoted', {})), project_tokens=dict(data.get('project_tokens', {})))
+        for project_id, category, difficulty, budget in data.get('slots', []):
+            slot = ScenarioSlot(project_id, TaskCategory(category), DifficultyLevel(difficulty), tuple(budget))
+            plan.slots.setdefault((project_id, slot.task_category), []).append(slot)
+        return plan
+
+    def save(self, path: Path):
+        """Write the plan atomically"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional['ScenarioPlan']:
+        """Previously saved plan, or None if there is none (or it is unreadable)"""
+        try:
+            with open(path, 'r') as f:
+                return cls.from_dict(json.load(f))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable scenario plan {path}: {e}")
+            return None
+
+
+def largest_remainder(total: int, weights: Dict[str, float]) -> Dict[str, int]:
+    """Apportion ``total`` integer units proportionally to ``weights``
+
+    Counts sum to exactly ``total``; ties in the remainders go to the
+    earlier key, so the result is deterministic.
+    """
+    weight_sum = sum(weights.values())
+    if total <= 0 or weight_sum <= 0:
+        return {key: 0 for key in weights}
+
+    exact = {key: total * weight / weight_sum for key, weight in weights.items()}
+    counts = {key: int(value) for key, value in exact.items()}
+    leftover = total - sum(counts.values())
+
+    by_remainder = sorted(weights, key=lambda key: exact[key] - counts[key], reverse=True)
+    for key in by_remainder[:leftover]:
+        counts[key] += 1
+    return counts
+
+
+def build_quota_matrix(category_counts: Dict[str, int],
+                       difficulty_counts: Dict[str, int]) -> Dict[str, Dict[str, int]]:
+    """Category x difficulty counts whose row and column sums match the inputs
+
+    Both inputs must have the same total. Each category is split over the
+    difficulties in proportion to the difficulty counts still unassigned, so
+    the last category absorbs the exact remainder of every column.
+    """
+    remaining = dict(difficulty_counts)
+    matrix = {}
+    categories = list(category_counts)
+
+    for index, category in enumerate(categories):
+        if index == len(categories) - 1:
+            row = dict(remaining)
+        else:
+            row = largest_remainder(category_counts[category], remaining)
+        for difficulty, count in row.items():
+            remaining[difficulty] -= count
+        matrix[category] = row
+
+    return matrix
+
+
+class ScenarioPlanner:
+    """Assigns benchmark quotas to (project, category, difficulty) slots"""
+
+    def __init__(self, config: Config):
+        self.config = config
+
+    def target_counts(self) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """Category and difficulty quotas, scaled to ``total_instances``"""
+        benchmark = self.config.benchmark
+        total = benchmark.total_instances
+
+        category_weights = {
+            category.value: benchmark.task_distribution.get(category.value, 0)
+            for category in TaskCategory
+        }
+        if not any(category_weights.values()):
+            category_weights = {key: 1 for key in category_weights}
+
+        difficulty_weights = {
+            level.value: benchmark.difficulty_distribution.get(level.value, 0)
+            for level in DIFFICULTY_ORDER
+        }
+        if not any(difficulty_weights.values()):
+            difficulty_weights = {key: 1 for key in difficulty_weights}
+
+        return largest_remainder(total, category_weights), largest_remainder(total, difficulty_weights)
+
+    def feasible_difficulties(self, project_tokens: int) -> List[DifficultyLevel]:
+        """Tiers whose minimum context a project of this size can reach"""
+        context_ranges = self.config.benchmark.context_ranges
+        return [level for level in DIFFICULTY_ORDER if project_tokens >= context_ranges[level.value][0]]
+
+    def plan(self, project_tokens: Dict[str, int], previous: Optional[ScenarioPlan] = None,
+             pinned: Iterable[str] = ()) -> ScenarioPlan:
+        """Plan all slots for projects with the given total token counts
+
+        With a ``previous`` plan, the slots of ``pinned`` projects are kept
+        as they are (their scenarios may already be generating), new and
+        resized projects get their slots from a fresh plan, and slots of
+        other projects whose token count is unchanged are kept while their
+        (category, difficulty) quota lasts; only the rest is placed anew.
+        """
+        plan = ScenarioPlan(project_tokens=dict(project_tokens))
+        if not project_tokens:
+            return plan
+
+        category_counts, difficulty_counts = self.target_counts()
+        projects = sorted(project_tokens)
+        context_ranges = self.config.benchmark.context_ranges
+
+        # Projects too small for every tier still serve easy scenarios
+        feasible = {
+            level: [p for p in projects if level in self.feasible_difficulties(project_tokens[p])]
+            for level in DIFFICULTY_ORDER
+        }
+        feasible[DifficultyLevel.EASY] = projects
+
+        # Demote tiers no project can fill to the largest tier that some project can
+        for index, level in enumerate(DIFFICULTY_ORDER):
+            count = difficulty_counts.get(level.value, 0)
+            if count and not feasible[level]:
+                fallback = next(l for l in reversed(DIFFICULTY_ORDER[:index]) if feasible[l])
+                difficulty_counts[fallback.value] += count
+                difficulty_counts[level.value] = 0
+                plan.demoted[level.value] = count
+                logger.warning(f"No project is large enough for {level.value} scenarios; "
+                               f"planning {count} as {fallback.value}")
+
+        matrix = build_quota_matrix(category_counts, difficulty_counts)
+
+        load = {project: 0 for project in projects}
+        category_load = {(project, category): 0 for project in projects for category in category_counts}
+
+        def place(project: str, category: TaskCategory, level: DifficultyLevel, budget: Tuple[int, int]):
+            category_load[(project, category.value)] += 1
+            load[project] += 1
+            matrix[category.value][level.value] -= 1
+            plan.slots.setdefault((project, category), []).append(ScenarioSlot(project, category, level, budget))
+
+        def budget_for(project: str, level: DifficultyLevel) -> Tuple[int, int]:
+            min_tokens, max_tokens = context_ranges[level.value]
+            return (min_tokens, min(max_tokens, project_tokens[project]))
+
+        # New or resized projects first get their share of a fresh plan, so they
+        # are not starved by carried-over slots; unchanged projects then keep
+        # their previous slots as far as the remaining quotas allow, and every
+        # other (project, category) file is rebuilt
+        rebuilt = set()
+        pinned = {p for p in pinned if p in project_tokens} if previous is not None else set()
+        if previous is not None:
+            for (project, category), slots in sorted(previous.slots.items(),
+                                                     key=lambda item: (item[0][0], item[0][1].value)):
+                if project not in pinned:
+                    continue
+                for slot in slots:
+                    if matrix[category.value].get(slot.difficulty.value, 0) > 0:
+                        place(project, category, slot.difficulty, tuple(slot.token_budget))
+                    else:
+                        rebuilt.add((project, category))
+                        logger.warning(f"No {category.value}/{slot.difficulty.value} quota left for "
+                                       f"pinned project {project}; dropping one of its slots")
+
+            changed = [p for p in projects
+                       if p not in pinned and previous.project_tokens.get(p) != project_tokens[p]]
+            if changed:
+                fresh = self.plan(project_tokens)
+                for project in changed:
+                    for category in TaskCategory:
+                        for slot in fresh.slots_for(project, category):
+                            if matrix[category.value].get(slot.difficulty.value, 0) > 0:
+                                place(project, category, slot.difficulty, slot.token_budget)
+                            rebuilt.add((project, category))
+
+            carried: Dict[Tuple[str, str], Dict[str, List[ScenarioSlot]]] = {}
+            for (project, category), slots in previous.slots.items():
+                if project not in project_tokens or project in changed or project in pinned:
+                    continue
+                for slot in slots:
+                    if project in feasible[slot.difficulty] and \
+                            tuple(slot.token_budget) == budget_for(project, slot.difficulty):
+                        cell = carried.setdefault((category.value, slot.difficulty.value), {})
+                        cell.setdefault(project, []).append(slot)
+
+            # Where a quota cell is short, the projects holding the most of it give up slots
+            for (category_value, level_value), by_project in sorted(carried.items()):
+                kept = {project: 0 for project in by_project}
+                while matrix.get(category_value, {}).get(level_value, 0) > 0:
+                    available = [p for p in sorted(by_project) if kept[p] < len(by_project[p])]
+                    if not available:
+                        break
+                    project = min(available, key=lambda p: kept[p])
+                    slot = by_project[project][kept[project]]
+                    kept[project] += 1
+                    place(project, slot.task_category, slot.difficulty, budget_for(project, slot.difficulty))
+                for project, slots in by_project.items():
+                    if kept[project] < len(slots):
+                        rebuilt.add((project, slots[0].task_category))
+            for project, category in set(previous.slots) - set(plan.slots):
+                rebuilt.add((project, category))
+
+        # Most constrained tiers first, so large projects are not used up by easy slots
+        for level in sorted(DIFFICULTY_ORDER, key=lambda l: len(feasible[l])):
+            for category_value, row in matrix.items():
+                count = row.get(level.value, 0)
+                if not count:
+                    continue
+                category = TaskCategory(category_value)
+
+                # Among equally loaded projects, prefer (project, category) files that
+                # are regenerated anyway, so refilling does not touch unchanged files
+                def key(p):
+                    return (category_load[(p, category_value)], (p, category) not in rebuilt, load[p], p)
+
+                # Pinned projects only take what no other project can
+                candidates = [p for p in feasible[level] if p not in pinned] or feasible[level]
+                heap = [key(p) for p in candidates]
+                heapq.heapify(heap)
+                for _ in range(count):
+                    project = heapq.heappop(heap)[-1]
+                    place(project, category, level, budget_for(project, level))
+                    rebuilt.add((project, category))
+                    heapq.heappush(heap, key(project))
+
+        # Stable slot order within a (project, category): easiest first
+        for slots in plan.slots.values():
+            slots.sort(key=lambda slot: DIFFICULTY_ORDER.index(slot.difficulty))
+
+        return plan
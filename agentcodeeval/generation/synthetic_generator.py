@@ -11,7 +11,8 @@ import json
 import logging
 import random
 import time
-from typing import Dict, List, Optional, Any, Tuple
+from collections import deque
+from typing import Callable, Dict, List, Optional, Any, Tuple
 from pathlib import Path
 from dataclasses import dataclass, asdict
 from enum import Enum
@@ -22,10 +23,19 @@ import boto3
 import json
 
 from ..core.config import Config
+from ..utils.llm_parsing import splice_continuation
 
 logger = logging.getLogger(__name__)
 
 
+# Follow-up instruction used when a response stopped at its output token budget
+CONTINUATION_PROMPT = (
+    "Your previous response was cut off by the output length limit. Continue it exactly "
+    "from the point where it stopped, starting with the very next character. Do not repeat "
+    "any earlier text, do not restart code blocks or JSON, and do not add any commentary."
+)
+
+
 class APIError(Exception):
     """Custom exception for API errors with specific provider info"""
     def __init__(self, provider: str, error_type: str, message: str, original_error: Exception = None):
@@ -36,7 +46,75 @@ class APIError(Exception):
         super().__init__(f"{provider} {error_type}: {message}")
 
 
-async def retry_with_backoff(func, max_retries: int = 3, base_delay: float = 1.0, max_delay: float = 60.0, provider: str = "Unknown"):
+class RequestRateLimiter:
+    """Limits in-flight requests and requests started per minute
+    
+    Used as ``async with limiter:`` around each API attempt. The asyncio
+    primitives are created for the event loop that actually runs the
+    requests (and again if a later phase runs in a new loop); the request
+    window carries over, so the per-minute limit holds across phases.
+    """
+    
+    def __init__(self, max_concurrent: int, max_per_minute: int):
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_per_minute = max(1, max_per_minute)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._window_lock: Optional[asyncio.Lock] = None
+        self._request_times = deque()
+    
+    async def __aenter__(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+            self._window_lock = asyncio.Lock()
+        
+        await self._semaphore.acquire()
+        try:
+            await self._wait_for_window()
+        except BaseException:
+            self._semaphore.release()
+            raise
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        self._semaphore.release()
+        return False
+    
+    async def _wait_for_window(self):
+        """Sliding one-minute window over request start times"""
+        async with self._window_lock:
+            while True:
+                now = time.monotonic()
+                while self._request_times and now - self._request_times[0] >= 60.0:
+                    self._request_times.popleft()
+                if len(self._request_times) < self.max_per_minute:
+                    self._request_times.append(now)
+                    return
+                await asyncio.sleep(60.0 - (now - self._request_times[0]))
+
+
+_RATE_LIMITERS: Dict[str, RequestRateLimiter] = {}
+
+
+def get_rate_limiter(provider: str, max_concurrent: int, max_per_minute: int) -> RequestRateLimiter:
+    """Process-wide limiter for ``provider``, shared by every generator
+
+    The limits of the first caller apply; the API limits belong to the
+    provider account, not to one generator instance.
+    """
+    limiter = _RATE_LIMITERS.get(provider)
+    if limiter is None:
+        limiter = _RATE_LIMITERS[provider] = RequestRateLimiter(max_concurrent, max_per_minute)
+    elif (limiter.max_concurrent, limiter.max_per_minute) != (max(1, max_concurrent), max(1, max_per_minute)):
+        logger.debug(f"Reusing {provider} rate limiter with its original limits "
+                     f"({limiter.max_concurrent} concurrent, {limiter.max_per_minute}/min)")
+    return limiter
+
+
+async def retry_with_backoff(func, max_retries: int = 3, base_delay: float = 1.0, max_delay: float = 60.0,
+                             provider: str = "Unknown", limiter: Optional[RequestRateLimiter] = None):
     """
     Retry function with exponential backoff for API calls
     
@@ -46,11 +124,15 @@ async def retry_with_backoff(func, max_retries: int = 3, base_delay: float = 1.0
         base_delay: Initial delay in seconds
         max_delay: Maximum delay in seconds
         provider: API provider name for error reporting
+        limiter: Optional rate limiter acquired for each attempt (not during backoff)
     """
     last_exception = None
     
     for attempt in range(max_retries + 1):
         try:
+            if limiter is not None:
+                async with limiter:
+                    return await func()
             return await func()
         except Exception as e:
             last_exception = e
@@ -92,6 +174,13 @@ async def retry_with_backoff(func, max_retries: int = 3, base_delay: float = 1.0
     raise APIError(provider, "RETRY_EXHAUSTED", f"All retries exhausted", last_exception)
 
 
+@dataclass
+class Completion:
+    """Text of one model call and whether it stopped at the output token budget"""
+    text: str
+    truncated: bool = False
+
+
 class ProjectComplexity(Enum):
     """Project complexity levels"""
     EASY = "easy"
@@ -177,6 +266,13 @@ class MultiLLMGenerator:
         self.config = config
         self.setup_llm_clients()
         
+        # One limiter per provider, shared with every other generator in the process
+        self.rate_limiters = {
+            provider: get_rate_limiter(provider, config.api.max_concurrent_requests,
+                                       config.api.max_requests_per_minute)
+            for provider in ("openai", "anthropic", "google")
+        }
+        
         # Generator specialization (using 3 Elite Models)
         # ✅ OpenAI o3: 43.94s, 13,770 chars | ✅ Claude Sonnet 4: 37.82s, 15,923 chars | ✅ Gemini 2.5 Pro: Confirmed
         self.generators = {
@@ -221,8 +317,31 @@ class MultiLLMGenerator:
         
         logger.info("✅ Multi-LLM generator initialized")
     
-    async def generate_with_openai(self, prompt: str, system_prompt: str = None) -> str:
-        """Generate content using OpenAI with retry logic"""
+    def output_token_budget(self, task: Optional[str] = None) -> int:
+        """Output token budget for a task (``api.max_output_tokens``, falling back to 'default')"""
+        budgets = self.config.api.max_output_tokens
+        return budgets.get(task, budgets.get("default", 4000)) if task else budgets.get("default", 4000)
+    
+    async def generate_with_openai(self, prompt: str, system_prompt: str = None,
+                                   cacheable_prefix: str = None,
+                                   on_chunk: Optional[Callable[[Optional[str]], None]] = None,
+                                   max_tokens: int = 4000, partial: str = None) -> str:
+        """Generate content using OpenAI with retry logic (see ``_complete_openai``)"""
+        completion = await self._complete_openai(prompt, system_prompt, cacheable_prefix, on_chunk, max_tokens, partial)
+        return completion.text
+    
+    async def _complete_openai(self, prompt: str, system_prompt: str = None,
+                               cacheable_prefix: str = None,
+                               on_chunk: Optional[Callable[[Optional[str]], None]] = None,
+                               max_tokens: int = 4000, partial: str = None) -> Completion:
+        """Generate content using OpenAI with retry logic
+        
+        OpenAI caches repeated prompt prefixes automatically, so the stable
+        ``cacheable_prefix`` is simply placed ahead of the variable prompt.
+        With ``on_chunk`` the response is streamed and each text delta is passed
+        to it as it arrives; ``None`` is passed when a retry restarts the stream.
+        With ``partial`` the model is asked to continue that cut-off response.
+        """
         
         async def _make_openai_call():
             if not self.config.api.openai_api_key:
@@ -231,49 +350,97 @@ class MultiLLMGenerator:
             messages = []
             if system_prompt:
                 messages.append({"role": "system", "content": system_prompt})
-            messages.append({"role": "user", "content": prompt})
+            user_content = f"{cacheable_prefix}\n\n{prompt}" if cacheable_prefix else prompt
+            messages.append({"role": "user", "content": user_content})
+            if partial is not None:
+                messages.append({"role": "assistant", "content": partial})
+                messages.append({"role": "user", "content": CONTINUATION_PROMPT})
             
             # Handle o3 model special API format
             if self.config.api.default_model_openai.startswith(("o1", "o3")):
-                response = await self.openai_client.chat.completions.create(
-                    model=self.config.api.default_model_openai,
-                    messages=messages,
-                    max_completion_tokens=4000
-                )
+                request = {"max_completion_tokens": max_tokens}
             else:
+                request = {"max_tokens": max_tokens, "temperature": 0.7}
+            
+            # Continuations are not streamed: their text is spliced first
+            if on_chunk is None or partial is not None:
                 response = await self.openai_client.chat.completions.create(
                     model=self.config.api.default_model_openai,
                     messages=messages,
-                    max_tokens=4000,
-                    temperature=0.7
+                    **request
                 )
+                choice = response.choices[0]
+                return Completion(choice.message.content or "", choice.finish_reason == "length")
             
-            return response.choices[0].message.content
-        
-        return await retry_with_backoff(_make_openai_call, provider="OpenAI o3")
+            on_chunk(None)
+            stream = await self.openai_client.chat.completions.create(
+                model=self.config.api.default_model_openai,
+                messages=messages,
+                stream=True,
+                **request
+            )
+            parts = []
+            finish_reason = None
+            async for event in stream:
+                if not event.choices:
+                    continue
+                delta = event.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    on_chunk(delta)
+                finish_reason = event.choices[0].finish_reason or finish_reason
+            return Completion(''.join(parts), finish_reason == "length")
+        
+        return await retry_with_backoff(_make_openai_call, provider="OpenAI o3",
+                                      limiter=self.rate_limiters["openai"])
     
-    async def generate_with_anthropic(self, prompt: str, system_prompt: str = None) -> str:
-        """Generate content using Claude Sonnet 4 via AWS Bedrock with retry logic"""
+    async def generate_with_anthropic(self, prompt: str, system_prompt: str = None,
+                                      cacheable_prefix: str = None,
+                                      max_tokens: int = 4000, partial: str = None) -> str:
+        """Generate content using Claude Sonnet 4 (see ``_complete_anthropic``)"""
+        completion = await self._complete_anthropic(prompt, system_prompt, cacheable_prefix, max_tokens, partial)
+        return completion.text
+    
+    async def _complete_anthropic(self, prompt: str, system_prompt: str = None,
+                                  cacheable_prefix: str = None,
+                                  max_tokens: int = 4000, partial: str = None) -> Completion:
+        """Generate content using Claude Sonnet 4 via AWS Bedrock with retry logic
+        
+        A ``cacheable_prefix`` is sent as its own content block marked with
+        ``cache_control`` so retries and repeat requests reuse the cached prefix.
+        With ``partial`` the model is asked to continue that cut-off response.
+        """
         
         async def _make_anthropic_call():
             if not self.use_bedrock:
                 raise APIError("Claude Sonnet 4", "AUTH_FAILED", "AWS Bedrock credentials not configured properly")
             
             # Build message content in correct format for Claude Sonnet 4
-            user_content = prompt
-            if system_prompt:
-                user_content = f"{system_prompt}\n\n{prompt}"
+            if cacheable_prefix:
+                prefix_text = f"{system_prompt}\n\n{cacheable_prefix}" if system_prompt else cacheable_prefix
+                content = [
+                    {"type": "text", "text": prefix_text, "cache_control": {"type": "ephemeral"}},
+                    {"type": "text", "text": prompt}
+                ]
+            else:
+                user_content = prompt
+                if system_prompt:
+                    user_content = f"{system_prompt}\n\n{prompt}"
+                content = [{"type": "text", "text": user_content}]
             
             messages = [
                 {
                     "role": "user", 
-                    "content": [{"type": "text", "text": user_content}]
+                    "content": content
                 }
             ]
+            if partial is not None:
+                messages.append({"role": "assistant", "content": [{"type": "text", "text": partial}]})
+                messages.append({"role": "user", "content": [{"type": "text", "text": CONTINUATION_PROMPT}]})
             
             body = {
                 "anthropic_version": "bedrock-2023-05-31",
-                "max_tokens": 4000,
+                "max_tokens": max_tokens,
                 "temperature": 0.7,
                 "messages": messages
             }
@@ -296,12 +463,27 @@ class MultiLLMGenerator:
             
             # Parse response according to AWS documentation
             response_body = json.loads(response['body'].read())
-            return response_body['content'][0]['text']
+            return Completion(response_body['content'][0]['text'], response_body.get('stop_reason') == "max_tokens")
         
-        return await retry_with_backoff(_make_anthropic_call, provider="Claude Sonnet 4 (AWS Bedrock)")
+        return await retry_with_backoff(_make_anthropic_call, provider="Claude Sonnet 4 (AWS Bedrock)",
+                                      limiter=self.rate_limiters["anthropic"])
+    
+    async def generate_with_google(self, prompt: str, system_prompt: str = None,
+                                   cacheable_prefix: str = None,
+                                   max_tokens: int = 4000, partial: str = None) -> str:
+        """Generate content using Gemini 2.5 Pro (see ``_complete_google``)"""
+        completion = await self._complete_google(prompt, system_prompt, cacheable_prefix, max_tokens, partial)
+        return completion.text
     
-    async def generate_with_google(self, prompt: str, system_prompt: str = None) -> str:
-        """Generate content using Gemini 2.5 Pro with retry logic"""
+    async def _complete_google(self, prompt: str, system_prompt: str = None,
+                               cacheable_prefix: str = None,
+                               max_tokens: int = 4000, partial: str = None) -> Completion:
+        """Generate content using Gemini 2.5 Pro with retry logic
+        
+        Gemini 2.5 caches shared prompt prefixes implicitly, so the stable
+        ``cacheable_prefix`` goes first. With ``partial`` the model is asked to
+        continue that cut-off response.
+        """
         
         async def _make_google_call():
             if not self.config.api.google_api_key:
@@ -310,7 +492,7 @@ class MultiLLMGenerator:
             # Configure generation parameters for high-quality code generation
             generation_config = genai.types.GenerationConfig(
                 temperature=0.7,
-                max_output_tokens=4000,
+                max_output_tokens=max_tokens,
                 top_p=0.95,
                 top_k=40
             )
@@ -321,26 +503,87 @@ class MultiLLMGenerator:
             )
             
             full_prompt = prompt
+            if cacheable_prefix:
+                full_prompt = f"{cacheable_prefix}\n\n{full_prompt}"
             if system_prompt:
-                full_prompt = f"{system_prompt}\n\n{prompt}"
+                full_prompt = f"{system_prompt}\n\n{full_prompt}"
+            contents = full_prompt
+            if partial is not None:
+                contents = [
+                    {"role": "user", "parts": [full_prompt]},
+                    {"role": "model", "parts": [partial]},
+                    {"role": "user", "parts": [CONTINUATION_PROMPT]}
+                ]
             
-            # Use synchronous call to avoid async issues with Gemini
-            response = model.generate_content(full_prompt)
-            return response.text
+            # Use synchronous call to avoid async issues with Gemini; run it in the
+            # thread pool (like Bedrock) so concurrent requests don't block the loop
+            loop = asyncio.get_event_loop()
+            response = await loop.run_in_executor(None, lambda: model.generate_content(contents))
+            finish_reason = response.candidates[0].finish_reason if response.candidates else None
+            return Completion(response.text, getattr(finish_reason, 'name', str(finish_reason)) == "MAX_TOKENS")
         
-        return await retry_with_backoff(_make_google_call, provider="Gemini 2.5 Pro")
+        return await retry_with_backoff(_make_google_call, provider="Gemini 2.5 Pro",
+                                      limiter=self.rate_limiters["google"])
     
-    async def generate_with_model(self, model_type: str, prompt: str, system_prompt: str = None) -> str:
-        """Generate content with specified model type - NO FALLBACKS"""
+    async def _complete(self, model_type: str, prompt: str, system_prompt: str, cacheable_prefix: str,
+                        on_chunk: Optional[Callable[[Optional[str]], None]], max_tokens: int,
+                        partial: str = None) -> Completion:
+        if model_type == "openai":
+            return await self._complete_openai(prompt, system_prompt, cacheable_prefix, on_chunk, max_tokens, partial)
+        elif model_type == "anthropic":
+            completion = await self._complete_anthropic(prompt, system_prompt, cacheable_prefix, max_tokens, partial)
+        elif model_type == "google":
+            completion = await self._complete_google(prompt, system_prompt, cacheable_prefix, max_tokens, partial)
+        else:
+            raise ValueError(f"Unknown model type: {model_type}")
+        if on_chunk is not None and partial is None:
+            on_chunk(None)
+            on_chunk(completion.text)
+        return completion
+    
+    async def generate_with_model(self, model_type: str, prompt: str, system_prompt: str = None,
+                                  cacheable_prefix: str = None,
+                                  on_chunk: Optional[Callable[[Optional[str]], None]] = None,
+                                  task: Optional[str] = None,
+                                  is_truncated: Optional[Callable[[str], bool]] = None) -> str:
+        """Generate content with specified model type - NO FALLBACKS
+        
+        ``cacheable_prefix`` is a large, stable part of the prompt (e.g. scenario
+        context) that precedes ``prompt`` and is eligible for provider-side
+        prompt caching. ``on_chunk`` receives response text as it streams in
+        (see ``_complete_openai``); providers called without streaming
+        deliver the whole response as a single chunk.
+        
+        The output budget comes from ``api.max_output_tokens[task]``. A response
+        that stops at the budget (or that ``is_truncated`` reports as cut off)
+        is resumed from the cut point up to ``api.max_continuations`` times and
+        the pieces are spliced, instead of regenerating from scratch.
+        """
+        max_tokens = self.output_token_budget(task)
         try:
-            if model_type == "openai":
-                return await self.generate_with_openai(prompt, system_prompt)
-            elif model_type == "anthropic":
-                return await self.generate_with_anthropic(prompt, system_prompt)
-            elif model_type == "google":
-                return await self.generate_with_google(prompt, system_prompt)
-            else:
-                raise ValueError(f"Unknown model type: {model_type}")
+            completion = await self._complete(model_type, prompt, system_prompt, cacheable_prefix,
+                                              on_chunk, max_tokens)
+            text = completion.text
+            truncated = completion.truncated or bool(is_truncated and is_truncated(text))
+            
+            continuations = 0
+            while truncated and text and continuations < self.config.api.max_continuations:
+                continuations += 1
+                logger.info(f"✂️  {model_type} response truncated at {len(text)} chars; "
+                            f"requesting continuation {continuations}/{self.config.api.max_continuations}")
+                completion = await self._complete(model_type, prompt, system_prompt, cacheable_prefix,
+                                                  on_chunk, max_tokens, partial=text)
+                spliced = splice_continuation(text, completion.text)
+                if on_chunk is not None and len(spliced) > len(text):
+                    on_chunk(spliced[len(text):])
+                if len(spliced) == len(text):
+                    break  # Nothing new; stop rather than loop
+                text = spliced
+                truncated = completion.truncated or bool(is_truncated and is_truncated(text))
+            
+            if truncated:
+                logger.warning(f"⚠️  {model_type} response still truncated after {continuations} continuation(s)")
+            return text
         except APIError as e:
             # Re-raise APIError with additional context about model assignment
             raise APIError(
@@ -502,7 +745,8 @@ class SyntheticProjectGenerator:
         response = await self.llm_generator.generate_with_model(
             self.llm_generator.generators["requirements"],
             prompt,
-            system_prompt
+            system_prompt,
+            task="requirements"
         )
         
         try:
@@ -557,7 +801,8 @@ class SyntheticProjectGenerator:
         response = await self.llm_generator.generate_with_model(
             self.llm_generator.generators["architecture"],
             prompt,
-            system_prompt
+            system_prompt,
+            task="architecture"
         )
         
         try:
@@ -611,7 +856,8 @@ class SyntheticProjectGenerator:
         content = await self.llm_generator.generate_with_model(
             self.llm_generator.generators["implementation"],
             prompt,
-            system_prompt
+            system_prompt,
+            task="implementation"
         )
         
         # Calculate complexity score (simple heuristic)
@@ -739,7 +985,8 @@ class SyntheticProjectGenerator:
         return await self.llm_generator.generate_with_model(
             self.llm_generator.generators["scenarios"],
             prompt,
-            "You are a technical writer creating clear, actionable setup instructions."
+            "You are a technical writer creating clear, actionable setup instructions.",
+            task="scenarios"
         )
     
     async def _generate_test_scenarios(self, spec: ProjectSpecification) -> List[str]:
@@ -763,7 +1010,8 @@ class SyntheticProjectGenerator:
         response = await self.llm_generator.generate_with_model(
             self.llm_generator.generators["scenarios"],
             prompt,
-            "You are a QA engineer designing comprehensive test scenarios."
+            "You are a QA engineer designing comprehensive test scenarios.",
+            task="scenarios"
         )
         
         try:
@@ -19,13 +19,30 @@ from rich.progress import Progress, SpinnerColumn, TextColumn
 
 from ..core.config import Config
 from ..core.task import TaskCategory
-from .metric_algorithms import AgentMetricsCalculator
-from ..validation.code_validator import validate_code_compilation, analyze_code_security, analyze_code_quality
+from .metric_algorithms import AgentMetricsCalculator, category_metric_weights, scenario_features
+from ..analysis.solution_analysis import SolutionAnalysis, analyze_solution
+from ..validation.code_validator import (
+    QualityAnalysisResult, get_code_validator, validate_code_compilation, analyze_code_security, analyze_code_quality
+)
 import re
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Bump when test suite generation changes, so the build manifest regenerates
+# existing Phase 4 test suite files
+TEST_SUITE_GENERATOR_VERSION = 1
+
+# Bump when analysis or metric changes alter scores; evaluation results and
+# journals are stamped with it (and with the syntax backend, see
+# analysis.syntax_tree.syntax_backend), so results of different versions are
+# not merged (2: tree-sitter syntax facts)
+SCORING_VERSION = 2
+
+_PASCAL_CASE_PATTERN = re.compile(r'^[A-Z][a-zA-Z0-9]*$')
+_CAMEL_CASE_PATTERN = re.compile(r'^[a-z][a-zA-Z0-9]*$')
+_MIXED_CASE_PATTERN = re.compile(r'^[a-zA-Z][a-zA-Z0-9]*$')
+
 
 @dataclass
 class ValidationResult:
@@ -61,6 +78,18 @@ class TestSuite:
             'performance_tests': self.performance_tests,
             'security_tests': self.security_tests
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'TestSuite':
+        """Rebuild a TestSuite from its ``to_dict`` form"""
+        return cls(
+            scenario_id=data['scenario_id'],
+            compilation_tests=data.get('compilation_tests', []),
+            unit_tests=data.get('unit_tests', []),
+            integration_tests=data.get('integration_tests', []),
+            performance_tests=data.get('performance_tests', []),
+            security_tests=data.get('security_tests', [])
+        )
 
 
 class AutomatedValidator:
@@ -89,6 +118,49 @@ class AutomatedValidator:
         
         # Initialize metrics calculator
         self.metrics_calculator = AgentMetricsCalculator()
+        
+        # Test suites depend only on the scenario, so they are shared across models
+        self._test_suite_cache: Dict[str, TestSuite] = {}
+        self._phase4_suites: Optional[Dict[str, Dict[str, Any]]] = None
+
+    async def get_test_suite(self, scenario: Dict[str, Any]) -> TestSuite:
+        """Return the test suite for a scenario, generating it at most once
+        
+        Lookup order: in-memory cache, Phase 4 ``*_test_suite.json`` output,
+        then ``generate_test_suite``.
+        """
+        scenario_id = scenario['id']
+        
+        test_suite = self._test_suite_cache.get(scenario_id)
+        if test_suite is None:
+            suite_data = self._load_phase4_suites().get(scenario_id)
+            if suite_data is not None:
+                test_suite = TestSuite.from_dict(suite_data)
+            else:
+                test_suite = await self.generate_test_suite(scenario)
+            self._test_suite_cache[scenario_id] = test_suite
+        
+        return test_suite
+
+    def _load_phase4_suites(self) -> Dict[str, Dict[str, Any]]:
+        """Index the test suites written by Phase 4, keyed by scenario id (loaded once)"""
+        if self._phase4_suites is None:
+            self._phase4_suites = {}
+            for suite_file in sorted(self.test_suites_dir.glob("*_test_suite.json")):
+                try:
+                    with open(suite_file, 'r') as f:
+                        data = json.load(f)
+                except (OSError, json.JSONDecodeError) as e:
+                    logger.warning(f"Skipping unreadable test suite file {suite_file}: {e}")
+                    continue
+                for entry in data.get('test_suites', []):
+                    if 'scenario_id' in entry and 'test_suite' in entry:
+                        self._phase4_suites[entry['scenario_id']] = entry['test_suite']
+            
+            if self._phase4_suites:
+                logger.info(f"Loaded {len(self._phase4_suites)} Phase 4 test suites")
+        
+        return self._phase4_suites
 
     async def generate_test_suite(self, scenario: Dict[str, Any]) -> TestSuite:
         """Generate automated test suite for a scenario"""
@@ -307,24 +379,27 @@ class AutomatedValidator:
         
         self.console.print(f"⚡ Validating solution for: {scenario['title'][:50]}...")
         
+        # Lines, identifiers, imports etc. are derived once and shared by every stage
+        analysis = analyze_solution(solution_code)
+        
         # 1. Functional Correctness (40%)
         functional_score = await self._evaluate_functional_correctness(
-            scenario, solution_code, test_suite
+            scenario, analysis, test_suite
         )
         
         # 2. Novel Agent Metrics (30%)  
         agent_metrics_score = await self._evaluate_agent_metrics(
-            scenario, solution_code
+            scenario, analysis
         )
         
         # 3. Code Quality (20%)
         quality_score = await self._evaluate_code_quality(
-            scenario, solution_code
+            scenario, analysis
         )
         
         # 4. Style/Best Practices (10%)
         style_score = await self._evaluate_style_practices(
-            scenario, solution_code
+            scenario, analysis
         )
         
         # Calculate weighted total score
@@ -354,11 +429,12 @@ class AutomatedValidator:
         )
 
     async def _evaluate_functional_correctness(self, scenario: Dict[str, Any], 
-                                             solution_code: Dict[str, str], 
+                                             analysis: SolutionAnalysis, 
                                              test_suite: TestSuite) -> float:
         """Evaluate functional correctness (40% weight)"""
         
         scores = []
+        solution_code = analysis.solution_code
         
         # Test compilation
         compilation_score = await self._test_compilation(solution_code)
@@ -375,73 +451,57 @@ class AutomatedValidator:
         return sum(scores)
 
     async def _evaluate_agent_metrics(self, scenario: Dict[str, Any], 
-                                    solution_code: Dict[str, str]) -> float:
+                                    analysis: SolutionAnalysis) -> float:
         """Evaluate novel agent-specific metrics (30% weight)"""
         
-        task_category = scenario['task_category']
-        
         # Calculate the 6 novel metrics based on task category
-        scores = []
-        
-        if task_category == 'architectural_understanding':
-            acs_score = self._calculate_architectural_coherence_score(scenario, solution_code)
-            dta_score = self._calculate_dependency_traversal_accuracy(scenario, solution_code)
-            scores = [acs_score * 0.6, dta_score * 0.4]
-            
-        elif task_category == 'cross_file_refactoring':
-            cfrd_score = self._calculate_cross_file_reasoning_depth(scenario, solution_code)
-            acs_score = self._calculate_architectural_coherence_score(scenario, solution_code)
-            scores = [cfrd_score * 0.7, acs_score * 0.3]
-            
-        elif task_category == 'multi_session_development':
-            mmr_score = self._calculate_multi_session_memory_retention(scenario, solution_code)
-            idc_score = self._calculate_incremental_development_capability(scenario, solution_code)
-            scores = [mmr_score * 0.6, idc_score * 0.4]
-            
-        else:
-            # Default metrics for other categories
-            icu_score = self._calculate_information_coverage_utilization(scenario, solution_code)
-            cfrd_score = self._calculate_cross_file_reasoning_depth(scenario, solution_code)
-            scores = [icu_score * 0.5, cfrd_score * 0.5]
+        features = scenario_features(scenario)
+        scores = [
+            self.metrics_calculator.calculate_metric(metric, features, analysis) * weight
+            for metric, weight in category_metric_weights(features.task_category).items()
+        ]
         
         return sum(scores)
 
     async def _evaluate_code_quality(self, scenario: Dict[str, Any], 
-                                   solution_code: Dict[str, str]) -> float:
+                                   analysis: SolutionAnalysis) -> float:
         """Evaluate code quality metrics (20% weight)"""
         
         scores = []
         
+        # One quality pass yields both complexity and maintainability
+        quality_result = await self._analyze_quality(analysis)
+        
         # Complexity analysis
-        complexity_score = await self._analyze_code_complexity(solution_code)
+        complexity_score = quality_result.complexity_score if quality_result else 0.5
         scores.append(complexity_score * 0.3)
         
         # Security analysis
-        security_score = await self._analyze_security(solution_code)
+        security_score = await self._analyze_security(analysis)
         scores.append(security_score * 0.3)
         
         # Maintainability
-        maintainability_score = await self._analyze_maintainability(solution_code)
+        maintainability_score = quality_result.maintainability_score if quality_result else 0.5
         scores.append(maintainability_score * 0.4)
         
         return sum(scores)
 
     async def _evaluate_style_practices(self, scenario: Dict[str, Any], 
-                                      solution_code: Dict[str, str]) -> float:
+                                      analysis: SolutionAnalysis) -> float:
         """Evaluate style and best practices (10% weight)"""
         
         scores = []
         
         # Code formatting
-        formatting_score = await self._check_code_formatting(solution_code)
+        formatting_score = await self._check_code_formatting(analysis.solution_code)
         scores.append(formatting_score * 0.4)
         
         # Naming conventions
-        naming_score = self._check_naming_conventions(solution_code)
+        naming_score = self._check_naming_conventions(analysis)
         scores.append(naming_score * 0.3)
         
         # Documentation quality
-        docs_score = self._check_documentation_quality(solution_code)
+        docs_score = self._check_documentation_quality(analysis)
         scores.append(docs_score * 0.3)
         
         return sum(scores)
@@ -490,8 +550,7 @@ class AutomatedValidator:
         """Test unit functionality using real test execution"""
         
         try:
-            from ..validation.code_validator import CodeValidator
-            validator = CodeValidator()
+            validator = get_code_validator()
             
             # Run actual unit tests
             test_pass_rate = await validator.run_unit_tests(solution_code, unit_tests, 'go')
@@ -513,11 +572,11 @@ class AutomatedValidator:
             # Single file solution
             return 0.5
 
-    async def _test_performance(self, solution_code: Dict[str, str], performance_tests: List[Dict]) -> float:
+    async def _test_performance(self, analysis: SolutionAnalysis, performance_tests: List[Dict]) -> float:
         """Test performance characteristics"""
         
         # Simple performance heuristics based on code patterns
-        total_code = ' '.join(solution_code.values())
+        total_code = analysis.joined
         
         performance_score = 0.7  # Base score
         
@@ -528,87 +587,48 @@ class AutomatedValidator:
                 performance_score -= 0.2  # Penalty for many nested loops
         
         # Check for efficient patterns
-        if any(pattern in total_code.lower() for pattern in ['sync.', 'goroutine', 'channel']):
+        if any(pattern in analysis.joined_lower for pattern in ['sync.', 'goroutine', 'channel']):
             performance_score += 0.2  # Bonus for concurrency
             
         return min(max(performance_score, 0.0), 1.0)
 
-    async def _test_security_compliance(self, solution_code: Dict[str, str], security_tests: List[Dict]) -> float:
+    async def _test_security_compliance(self, analysis: SolutionAnalysis, security_tests: List[Dict]) -> float:
         """Test security compliance using real security analysis"""
         
         try:
-            security_result = await analyze_code_security(solution_code, 'go')
+            security_result = await analyze_code_security(analysis, 'go')
             return security_result.security_score
             
         except Exception as e:
             logger.error(f"Security analysis failed: {e}")
             return 0.5
 
-    def _calculate_architectural_coherence_score(self, scenario: Dict, solution_code: Dict[str, str]) -> float:
-        """Calculate ACS - Architectural Coherence Score"""
-        return self.metrics_calculator.calculate_architectural_coherence_score(scenario, solution_code)
-    
-    def _calculate_dependency_traversal_accuracy(self, scenario: Dict, solution_code: Dict[str, str]) -> float:
-        """Calculate DTA - Dependency Traversal Accuracy"""
-        return self.metrics_calculator.calculate_dependency_traversal_accuracy(scenario, solution_code)
-    
-    def _calculate_multi_session_memory_retention(self, scenario: Dict, solution_code: Dict[str, str]) -> float:
-        """Calculate MMR - Multi-Session Memory Retention"""
-        return self.metrics_calculator.calculate_multi_session_memory_retention(scenario, solution_code)
-    
-    def _calculate_cross_file_reasoning_depth(self, scenario: Dict, solution_code: Dict[str, str]) -> float:
-        """Calculate CFRD - Cross-File Reasoning Depth"""
-        return self.metrics_calculator.calculate_cross_file_reasoning_depth(scenario, solution_code)
-    
-    def _calculate_incremental_development_capability(self, scenario: Dict, solution_code: Dict[str, str]) -> float:
-        """Calculate IDC - Incremental Development Capability"""
-        return self.metrics_calculator.calculate_incremental_development_capability(scenario, solution_code)
-    
-    def _calculate_information_coverage_utilization(self, scenario: Dict, solution_code: Dict[str, str]) -> float:
-        """Calculate ICU - Information Coverage Utilization"""
-        return self.metrics_calculator.calculate_information_coverage_utilization(scenario, solution_code)
-        
-    async def _analyze_code_complexity(self, solution_code: Dict[str, str]) -> float:
-        """Analyze code complexity using real complexity metrics"""
+    async def _analyze_quality(self, analysis: SolutionAnalysis) -> Optional[QualityAnalysisResult]:
+        """Analyze complexity and maintainability using real quality metrics"""
         
         try:
-            # Use the real quality analysis directly without asyncio.run
-            quality_result = await analyze_code_quality(solution_code, 'go')
-            return quality_result.complexity_score
+            return await analyze_code_quality(analysis, 'go')
             
         except Exception as e:
-            logger.error(f"Complexity analysis failed: {e}")
-            return 0.5
+            logger.error(f"Quality analysis failed: {e}")
+            return None
         
-    async def _analyze_security(self, solution_code: Dict[str, str]) -> float:
+    async def _analyze_security(self, analysis: SolutionAnalysis) -> float:
         """Analyze security vulnerabilities using real security scanner"""
         
         try:
-            security_result = await analyze_code_security(solution_code, 'go')
+            security_result = await analyze_code_security(analysis, 'go')
             return security_result.security_score
             
         except Exception as e:
             logger.error(f"Security analysis failed: {e}")
             return 0.5
         
-    async def _analyze_maintainability(self, solution_code: Dict[str, str]) -> float:
-        """Analyze maintainability using real maintainability metrics"""
-        
-        try:
-            # Use the real quality analysis directly without asyncio.run
-            quality_result = await analyze_code_quality(solution_code, 'go')
-            return quality_result.maintainability_score
-            
-        except Exception as e:
-            logger.error(f"Maintainability analysis failed: {e}")
-            return 0.5
-        
     async def _check_code_formatting(self, solution_code: Dict[str, str]) -> float:
         """Check code formatting using real formatter"""
         
         try:
-            from ..validation.code_validator import CodeValidator
-            validator = CodeValidator()
+            validator = get_code_validator()
             
             # Use real formatting check directly without asyncio.run
             formatting_result = await validator.check_code_formatting(solution_code, 'go')
@@ -618,43 +638,39 @@ class AutomatedValidator:
             logger.error(f"Formatting check failed: {e}")
             return 0.5
         
-    def _check_naming_conventions(self, solution_code: Dict[str, str]) -> float:
+    def _check_naming_conventions(self, analysis: SolutionAnalysis) -> float:
         """Check naming convention compliance"""
         
         # Go-specific naming convention checks
         total_score = 0.0
         total_checks = 0
         
-        for filename, code in solution_code.items():
+        for file in analysis.files:
             # Check function naming (PascalCase for public, camelCase for private)
-            functions = re.findall(r'func\s+([A-Za-z_][A-Za-z0-9_]*)', code)
-            
-            for func_name in functions:
+            for func_name in file.go_funcs:
                 total_checks += 1
                 if func_name[0].isupper():  # Public function
-                    if re.match(r'^[A-Z][a-zA-Z0-9]*$', func_name):
+                    if _PASCAL_CASE_PATTERN.match(func_name):
                         total_score += 1.0
                     else:
                         total_score += 0.5
                 else:  # Private function
-                    if re.match(r'^[a-z][a-zA-Z0-9]*$', func_name):
+                    if _CAMEL_CASE_PATTERN.match(func_name):
                         total_score += 1.0
                     else:
                         total_score += 0.5
             
             # Check variable naming
-            variables = re.findall(r'var\s+([A-Za-z_][A-Za-z0-9_]*)', code)
-            
-            for var_name in variables:
+            for var_name in file.go_vars:
                 total_checks += 1
-                if re.match(r'^[a-zA-Z][a-zA-Z0-9]*$', var_name):
+                if _MIXED_CASE_PATTERN.match(var_name):
                     total_score += 1.0
                 else:
                     total_score += 0.5
         
         return total_score / total_checks if total_checks > 0 else 0.6
         
-    def _check_documentation_quality(self, solution_code: Dict[str, str]) -> float:
+    def _check_documentation_quality(self, analysis: SolutionAnalysis) -> float:
         """Check documentation quality"""
         
         total_lines = 0
@@ -662,23 +678,20 @@ class AutomatedValidator:
         documented_functions = 0
         total_functions = 0
         
-        for filename, code in solution_code.items():
-            lines = code.split('\n')
-            total_lines += len(lines)
+        for file in analysis.files:
+            code = file.code
+            total_lines += len(file.lines)
             
             # Count comment lines
-            comment_lines += sum(1 for line in lines if line.strip().startswith('//'))
+            comment_lines += sum(1 for line in file.stripped if line.startswith('//'))
             
             # Check function documentation
-            functions = re.finditer(r'func\s+([A-Za-z_][A-Za-z0-9_]*)', code)
-            
-            for match in functions:
+            for func_start, _ in file.go_func_matches:
                 total_functions += 1
-                func_start = match.start()
                 
                 # Look for comment before function
-                lines_before_func = code[:func_start].split('\n')
-                if lines_before_func and lines_before_func[-1].strip().startswith('//'):
+                line_start = file.line_starts[file.line_number(func_start) - 1]
+                if code[line_start:func_start].strip().startswith('//'):
                     documented_functions += 1
         
         # Calculate documentation score
@@ -3,52 +3,362 @@ Advanced LLM Response Parsing for AgentCodeEval
 
 This module provides robust parsing capabilities for LLM responses,
 handling JSON extraction, code block parsing, and intelligent fallbacks.
+All strategies work from one linear ``ResponseScanner`` pass, so parsing
+time stays proportional to response length even for truncated or
+adversarial 100KB responses.
 """
 
 import json
 import re
 import logging
+from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Any, Tuple
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
 
-class LLMResponseParser:
-    """Advanced parser for LLM responses with multiple fallback strategies"""
+CODE_FILE_EXTENSIONS = ('.go', '.py', '.js', '.ts', '.rs', '.java', '.cpp', '.h')
+
+# Only characters that can change scanner state; everything else is skipped in bulk
+_SCAN_TOKEN_PATTERN = re.compile(r'```|[{}"\\`\n]')
+
+# Rest of an opening fence's line, stopping early at a backtick (info strings
+# cannot contain one, so a backtick means code follows on the same line)
+_FENCE_INFO_PATTERN = re.compile(r'[^`\n]*')
+_FENCE_LANGUAGE_PATTERN = re.compile(r'\w*')
+
+# File-header line forms, tried at line starts only (each match is bounded by the line)
+_EXT_ALTERNATION = r'\.(?:go|py|js|ts|rs|java|cpp|h)'
+_HEADER_PATTERNS = [
+    re.compile(r'(?:File|Filename):\s*([^\n]+)', re.IGNORECASE),
+    re.compile(r'#+\s*([^\n]+' + _EXT_ALTERNATION + ')', re.IGNORECASE),
+    re.compile(r'//\s*([^\n]+' + _EXT_ALTERNATION + ')', re.IGNORECASE),
+    re.compile(r'#\s*([^\n]+' + _EXT_ALTERNATION + ')', re.IGNORECASE)
+]
+_BACKTICK_KEY_PATTERN = re.compile(r'(\w+' + _EXT_ALTERNATION + r')\s*[:=]\s*$')
+_TRAILING_COMMA_PATTERN = re.compile(r',(\s*[}\]])')
+_MAX_OBJECT_DEPTH = 3
+_MAX_KEY_LOOKBACK = 256
+
+
+@dataclass
+class FencedBlock:
+    """A markdown code fence; ``closed`` is False when the response was truncated inside it"""
+    language: str
+    content: str
+    closed: bool = True
+
+
+@dataclass
+class ScanResult:
+    """Structures found in a response by a single ``ResponseScanner`` pass"""
+    fences: List[FencedBlock] = field(default_factory=list)
+    objects: List[Tuple[int, int]] = field(default_factory=list)
+    string_pairs: List[Tuple[str, str]] = field(default_factory=list)
+    backtick_pairs: List[Tuple[str, str]] = field(default_factory=list)
+    headers: List[List[Tuple[str, int, int]]] = field(default_factory=list)
+    open_objects: int = 0
+    open_string: bool = False
+    
+    @property
+    def truncated(self) -> bool:
+        """Input ended inside a fence or, for unfenced responses, inside an object or JSON string
+        
+        Prose after a closed fence is not checked, so stray quotes or braces in a
+        closing remark do not count as truncation.
+        """
+        if self.fences:
+            return not self.fences[-1].closed
+        return bool(self.open_objects or self.open_string)
+
+
+class ResponseScanner:
+    """Single-pass O(n) scanner for LLM responses
+    
+    Walks the response once, jumping between state-changing characters, and
+    records markdown fences (also after prose on the same line, as in
+    ``Here it is: ```go``), brace-balanced objects up to
+    three levels deep (ignoring braces inside JSON strings), JSON
+    ``"key": "value"`` string pairs, inline ``name.ext: `code``` pairs and
+    file-header lines. Nothing backtracks, so truncated or adversarial
+    responses cost the same as well-formed ones.
+    """
+    
+    def scan(self, text: str) -> ScanResult:
+        result = ScanResult(headers=[[] for _ in _HEADER_PATTERNS])
+        
+        stack: List[int] = []
+        in_string = False
+        string_start = -1
+        previous_string: Optional[Tuple[int, int]] = None
+        backtick_start = -1
+        fence_start = -1
+        fence_language = ''
+        line_start = 0
+        skip_until = -1
+        
+        self._scan_header(text, 0, result)
+        
+        for match in _SCAN_TOKEN_PATTERN.finditer(text):
+            pos = match.start()
+            if pos < skip_until:
+                continue
+            token = match.group()
+            
+            if token == '\n':
+                line_start = pos + 1
+                self._scan_header(text, line_start, result)
+                continue
+            
+            if token == '```':
+                if in_string and fence_start < 0:
+                    continue
+                if fence_start < 0:
+                    info_end = _FENCE_INFO_PATTERN.match(text, pos + 3).end()
+                    if info_end == len(text) or text[info_end] == '\n':
+                        # Opening fence: the info string runs to the end of the line
+                        fence_language = text[pos + 3:info_end].strip().split(' ')[0].lower()
+                        fence_start = info_end + 1
+                        skip_until = info_end
+                    else:
+                        # Code on the fence's own line (```go x := 1```): only a language word
+                        language_end = _FENCE_LANGUAGE_PATTERN.match(text, pos + 3).end()
+                        fence_language = text[pos + 3:language_end].lower()
+                        fence_start = language_end
+                        skip_until = language_end
+                else:
+                    result.fences.append(FencedBlock(fence_language, text[fence_start:pos].strip()))
+                    fence_start = -1
+                # Fence boundaries reset code-level state, so a stray quote in one
+                # block cannot desynchronize the rest of the response
+                stack.clear()
+                in_string = False
+                backtick_start = -1
+                previous_string = None
+                continue
+            
+            if in_string:
+                if token == '\\' and text[pos + 1:pos + 2] != '\n':
+                    skip_until = pos + 2
+                elif token == '"':
+                    in_string = False
+                    current = (string_start, pos + 1)
+                    if previous_string is not None and text[previous_string[1]:string_start].strip() == ':':
+                        key = text[previous_string[0] + 1:previous_string[1] - 1]
+                        result.string_pairs.append((key, text[string_start + 1:pos]))
+                        previous_string = None
+                    else:
+                        previous_string = current
+                continue
+            
+            if backtick_start >= 0:
+                if token == '`':
+                    lookback = text[max(0, backtick_start - _MAX_KEY_LOOKBACK):backtick_start]
+                    key_match = _BACKTICK_KEY_PATTERN.search(lookback)
+                    if key_match and pos > backtick_start + 1:
+                        result.backtick_pairs.append((key_match.group(1), text[backtick_start + 1:pos]))
+                    backtick_start = -1
+                continue
+            
+            if token == '"':
+                in_string = True
+                string_start = pos
+            elif token == '`':
+                backtick_start = pos
+            elif token == '{':
+                stack.append(pos)
+            elif token == '}' and stack:
+                start = stack.pop()
+                if len(stack) < _MAX_OBJECT_DEPTH:
+                    result.objects.append((start, pos + 1))
+        
+        if fence_start >= 0:
+            result.fences.append(FencedBlock(fence_language, text[fence_start:].strip(), closed=False))
+        result.open_objects = len(stack)
+        result.open_string = in_string
+        
+        # Outer objects first, then by position
+        result.objects.sort(key=lambda span: (span[0], -span[1]))
+        return result
+    
+    @staticmethod
+    def _scan_header(text: str, line_start: int, result: ScanResult):
+        if line_start >= len(text) or text[line_start] not in 'Ff#/':
+            return
+        for kind, pattern in enumerate(_HEADER_PATTERNS):
+            match = pattern.match(text, line_start)
+            if match:
+                result.headers[kind].append((match.group(1).strip(), match.start(), match.end()))
+
+
+# Body of a JSON string up to (not including) its closing quote, as an unrolled
+# loop: the alternatives are disjoint, so matching never backtracks
+_STRING_BODY_PATTERN = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*', re.DOTALL)
+_ESCAPE_PATTERN = re.compile(r'\\(u[0-9a-fA-F]{4}|.)', re.DOTALL)
+_SIMPLE_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f'}
+
+
+def _decode_json_string(raw: str) -> str:
+    """Decode the body of a JSON string literal, tolerating invalid escapes"""
+    try:
+        return json.loads(f'"{raw}"', strict=False)
+    except json.JSONDecodeError:
+        def _replace(match):
+            escape = match.group(1)
+            if escape[0] == 'u' and len(escape) == 5:
+                return chr(int(escape[1:], 16))
+            return _SIMPLE_ESCAPES.get(escape, escape)
+        return _ESCAPE_PATTERN.sub(_replace, raw)
+
+
+class StreamingFileExtractor:
+    """Incremental extractor for the ``"files": {...}`` object of a solution response
+    
+    Feed response text as it streams in; each ``(filename, content)`` pair is
+    returned from ``feed`` as soon as its content string closes, so downstream
+    work can start on the first file while later ones are still being
+    generated. Parsing state survives chunk boundaries (including ones that
+    split an escape sequence); string bodies are matched and decoded as whole
+    slices rather than per character, and consumed input is dropped.
+    """
+    
+    _SEEK_FILES, _SEEK_COLON, _SEEK_OBJECT, _IN_OBJECT, _IN_KEY, _SEEK_VALUE, _IN_VALUE, _SKIP_VALUE, _DONE = range(9)
+    _FILES_KEY = '"files"'
     
     def __init__(self):
-        # Patterns for different response formats
-        self.json_patterns = [
-            # Pattern 1: ```json blocks - enhanced for very long content
-            r'```json\s*(\{.*?\})\s*```',
+        self.reset()
+    
+    def reset(self):
+        """Discard all state (e.g. when a request is retried from scratch)"""
+        self.files: Dict[str, str] = {}
+        self.complete = False
+        self._state = self._SEEK_FILES
+        self._buffer = ''
+        self._raw: List[str] = []
+        self._key = ''
+    
+    def feed(self, chunk: str) -> List[Tuple[str, str]]:
+        """Consume a chunk of response text; returns the files completed by it"""
+        if self._state == self._DONE or not chunk:
+            return []
+        self._buffer += chunk
+        emitted = []
+        buffer = self._buffer
+        pos = 0
+        
+        while pos < len(buffer) and self._state != self._DONE:
+            state = self._state
+            
+            if state == self._SEEK_FILES:
+                found = buffer.find(self._FILES_KEY, pos)
+                if found < 0:
+                    # Keep enough of the tail to match a key split across chunks
+                    pos = max(pos, len(buffer) - len(self._FILES_KEY) + 1)
+                    break
+                pos = found + len(self._FILES_KEY)
+                self._state = self._SEEK_COLON
             
-            # Pattern 2: Generic ``` blocks  
-            r'```\s*(\{.*?\})\s*```',
+            elif state in (self._SEEK_COLON, self._SEEK_OBJECT):
+                # "files" counts only as a key whose value is an object:
+                # nothing but whitespace, ':' and '{' may follow it
+                char = buffer[pos]
+                if char.isspace():
+                    pos += 1
+                elif state == self._SEEK_COLON and char == ':':
+                    pos += 1
+                    self._state = self._SEEK_OBJECT
+                elif state == self._SEEK_OBJECT and char == '{':
+                    pos += 1
+                    self._state = self._IN_OBJECT
+                else:
+                    self._state = self._SEEK_FILES
             
-            # Pattern 3: Specific files pattern - non-greedy
-            r'(\{[^{}]*?"files"[^{}]*?\{.*?\}[^{}]*?\})',
+            elif state == self._IN_OBJECT:
+                char = buffer[pos]
+                pos += 1
+                if char == '"':
+                    self._state = self._IN_KEY
+                    self._raw = []
+                elif char == '}':
+                    self._state = self._DONE
+                    self.complete = True
             
-            # Pattern 4: Any JSON-like structure - more conservative
-            r'(\{(?:[^{}]|\{[^{}]*\})*\})',
+            elif state in (self._IN_KEY, self._IN_VALUE):
+                end = _STRING_BODY_PATTERN.match(buffer, pos).end()
+                self._raw.append(buffer[pos:end])
+                pos = end
+                if end == len(buffer) or buffer[end] == '\\':
+                    # Chunk ended inside the string (possibly right after a backslash)
+                    break
+                pos = end + 1
+                text = _decode_json_string(''.join(self._raw))
+                self._raw = []
+                if state == self._IN_KEY:
+                    self._key = text
+                    self._state = self._SEEK_VALUE
+                else:
+                    self.files[self._key] = text
+                    emitted.append((self._key, text))
+                    self._state = self._SKIP_VALUE
             
-            # Pattern 5: NEW - Handle very long JSON with line breaks (non-greedy)
-            r'```json\s*(\{(?:[^`]|`(?!``))*\})\s*```',
+            elif state == self._SEEK_VALUE:
+                char = buffer[pos]
+                pos += 1
+                if char == '"':
+                    self._state = self._IN_VALUE
+                elif not (char.isspace() or char == ':'):
+                    self._state = self._SKIP_VALUE
             
-            # Pattern 6: NEW - Multiline JSON without markdown
-            r'(\{(?:[^{}]|\{(?:[^{}]|\{[^{}]*\})*\})*\})'
-        ]
-        
-        self.code_block_patterns = {
-            'go': r'```go\s*(.*?)\s*```',
-            'python': r'```python\s*(.*?)\s*```', 
-            'javascript': r'```(?:js|javascript)\s*(.*?)\s*```',
-            'typescript': r'```(?:ts|typescript)\s*(.*?)\s*```',
-            'rust': r'```rust\s*(.*?)\s*```',
-            'java': r'```java\s*(.*?)\s*```',
-            'cpp': r'```(?:cpp|c\+\+)\s*(.*?)\s*```',
-            'generic': r'```\w*\s*(.*?)\s*```'
-        }
+            elif state == self._SKIP_VALUE:
+                # Skip to the next member (non-string values are ignored)
+                comma = buffer.find(',', pos)
+                brace = buffer.find('}', pos)
+                if comma < 0 and brace < 0:
+                    pos = len(buffer)
+                    break
+                if brace < 0 or 0 <= comma < brace:
+                    pos = comma + 1
+                    self._state = self._IN_OBJECT
+                else:
+                    pos = brace + 1
+                    self._state = self._DONE
+                    self.complete = True
+        
+        self._buffer = buffer[pos:]
+        return emitted
+    
+    def close(self) -> List[Tuple[str, str]]:
+        """End of input; a file cut off by truncation is emitted with what arrived"""
+        emitted = []
+        if self._state == self._IN_VALUE:
+            raw = ''.join(self._raw) + self._buffer
+            text = _decode_json_string(raw[:-1] if raw.endswith('\\') else raw)
+            self.files[self._key] = text
+            emitted.append((self._key, text))
+        self._state = self._DONE
+        self._buffer = ''
+        self._raw = []
+        return emitted
+
+
+class LLMResponseParser:
+    """Advanced parser for LLM responses with multiple fallback strategies"""
+    
+    # Fence info strings accepted for each expected language
+    FENCE_LANGUAGES = {
+        'go': ('go', 'golang'),
+        'python': ('python', 'py'),
+        'javascript': ('js', 'javascript'),
+        'typescript': ('ts', 'typescript'),
+        'rust': ('rust', 'rs'),
+        'java': ('java',),
+        'cpp': ('cpp', 'c++')
+    }
+    
+    def __init__(self):
+        # Every strategy below consumes one linear scan of the response
+        self.scanner = ResponseScanner()
         
         # Language-specific indicators
         self.language_indicators = {
@@ -80,32 +390,44 @@ class LLMResponseParser:
     def parse(self, response: str, expected_language: str = 'python') -> Dict[str, str]:
         """Parse LLM response with multiple fallback strategies"""
         
+        scan = self.scanner.scan(response)
+        if scan.truncated:
+            logger.warning(f"⚠️  Response appears truncated ({len(response)} chars); parsing what arrived")
+        
         # Strategy 1: Structured JSON extraction
-        structured_result = self._extract_structured_json(response)
+        structured_result = self._extract_structured_json(response, scan)
         if structured_result and self._is_viable_result(structured_result):
             logger.info(f"✅ Successfully extracted {len(structured_result)} files from structured JSON")
             return structured_result
             
+        # A truncated files object: the streaming extractor keeps the file that
+        # was cut off, which the string-pair strategy below would drop
+        manual_result = self._extract_files_manually(response) if scan.truncated else None
+        if manual_result and self._is_viable_result(manual_result):
+            logger.info(f"✅ Extracted {len(manual_result)} files from truncated response")
+            return manual_result
+        
         # Strategy 2: JSON-like structures with viability check
-        json_like_result = self._extract_code_from_json_like(response)
+        json_like_result = self._extract_code_from_json_like(response, scan)
         if json_like_result and self._is_viable_result(json_like_result):
             logger.info(f"✅ Successfully extracted {len(json_like_result)} files from JSON-like structure")
             return json_like_result
             
         # Strategy 3: Markdown code blocks
-        code_blocks_result = self._extract_code_blocks(response, expected_language)
+        code_blocks_result = self._extract_code_blocks(response, expected_language, scan)
         if code_blocks_result and self._is_viable_result(code_blocks_result):
             logger.info(f"✅ Successfully extracted {len(code_blocks_result)} code blocks")
             return code_blocks_result
             
         # Strategy 4: Intelligent text parsing
-        text_parsing_result = self._intelligent_text_parsing(response, expected_language)
+        text_parsing_result = self._intelligent_text_parsing(response, expected_language, scan)
         if text_parsing_result and self._is_viable_result(text_parsing_result):
             logger.info("✅ Successfully parsed code from text analysis")
             return text_parsing_result
         
         # Strategy 5: Manual extraction for extremely long JSON
-        manual_result = self._extract_files_manually(response)
+        if not scan.truncated:
+            manual_result = self._extract_files_manually(response)
         if manual_result and self._is_viable_result(manual_result):
             logger.info("✅ Successfully extracted files manually")
             return manual_result
@@ -122,115 +444,107 @@ class LLMResponseParser:
         logger.warning("⚠️  Using fallback solution generation")
         return self._create_fallback_solution(response, expected_language)
 
-    def _extract_structured_json(self, response: str) -> Optional[Dict[str, str]]:
+    def _extract_structured_json(self, response: str, scan: Optional[ScanResult] = None) -> Optional[Dict[str, str]]:
         """Extract properly structured JSON responses"""
         
-        for pattern in self.json_patterns:
-            matches = re.findall(pattern, response, re.DOTALL | re.IGNORECASE)
-            
-            for match in matches:
-                try:
-                    # Clean up the JSON string
-                    cleaned_json = self._clean_json_string(match)
-                    data = json.loads(cleaned_json)
+        scan = scan or self.scanner.scan(response)
+        
+        # Candidates in order of confidence: JSON fences, objects mentioning
+        # "files", then any balanced object. Each span is parsed at most once.
+        candidates = [
+            fence.content for fence in scan.fences
+            if fence.language in ('json', '') and fence.content.startswith('{')
+        ]
+        file_objects = [span for span in scan.objects if response.find('"files"', span[0], span[1]) >= 0]
+        seen = set()
+        for span in file_objects + scan.objects:
+            if span not in seen:
+                seen.add(span)
+                candidates.append(response[span[0]:span[1]])
+        
+        for candidate in candidates:
+            try:
+                # Clean up the JSON string
+                cleaned_json = self._clean_json_string(candidate)
+                data = json.loads(cleaned_json)
+                
+                # Look for files in various possible keys
+                files = self._extract_files_from_data(data)
+                if files:
+                    return files
                     
-                    # Look for files in various possible keys
-                    files = self._extract_files_from_data(data)
-                    if files:
-                        return files
-                        
-                except json.JSONDecodeError as e:
-                    logger.debug(f"JSON parsing failed: {e}")
-                    continue
+            except json.JSONDecodeError as e:
+                logger.debug(f"JSON parsing failed: {e}")
+                continue
                     
         return None
 
-    def _extract_code_from_json_like(self, response: str) -> Optional[Dict[str, str]]:
+    def _extract_code_from_json_like(self, response: str, scan: Optional[ScanResult] = None) -> Optional[Dict[str, str]]:
         """Extract code from JSON-like structures that might have parsing issues"""
         
-        # Look for patterns like "filename.go": "code content"
-        file_pattern = r'"([^"]+\.(?:go|py|js|ts|rs|java|cpp|h))"\s*:\s*"([^"]*(?:\\.[^"]*)*)"'
-        matches = re.findall(file_pattern, response, re.DOTALL)
+        scan = scan or self.scanner.scan(response)
         
-        if matches:
-            files = {}
-            for filename, code in matches:
+        # Look for pairs like "filename.go": "code content"
+        files = {}
+        for filename, code in scan.string_pairs:
+            if filename.endswith(CODE_FILE_EXTENSIONS):
                 # Unescape the code content
-                unescaped_code = self._unescape_code(code)
-                files[filename] = unescaped_code
+                files[filename] = self._unescape_code(code)
+        if files:
             return files
             
-        # Look for key-value patterns without quotes
-        kv_pattern = r'(\w+\.(?:go|py|js|ts|rs|java|cpp|h))\s*[:=]\s*`([^`]+)`'
-        kv_matches = re.findall(kv_pattern, response, re.DOTALL)
-        
-        if kv_matches:
-            return {filename: code for filename, code in kv_matches}
+        # Look for key-value pairs without quotes: name.go: `code`
+        if scan.backtick_pairs:
+            return dict(scan.backtick_pairs)
             
         return None
 
-    def _extract_code_blocks(self, response: str, expected_language: str) -> Optional[Dict[str, str]]:
+    def _extract_code_blocks(self, response: str, expected_language: str,
+                             scan: Optional[ScanResult] = None) -> Optional[Dict[str, str]]:
         """Extract code from markdown code blocks"""
         
+        scan = scan or self.scanner.scan(response)
         files = {}
         
-        # Try language-specific pattern first
-        if expected_language in self.code_block_patterns:
-            pattern = self.code_block_patterns[expected_language]
-            matches = re.findall(pattern, response, re.DOTALL | re.IGNORECASE)
-            
-            for i, code in enumerate(matches):
-                filename = f"solution_{i+1}.{self._get_file_extension(expected_language)}"
-                files[filename] = code.strip()
+        # Try language-specific fences first
+        fence_languages = self.FENCE_LANGUAGES.get(expected_language, ())
+        matches = [fence.content for fence in scan.fences if fence.language in fence_languages]
+        for i, code in enumerate(matches):
+            filename = f"solution_{i+1}.{self._get_file_extension(expected_language)}"
+            files[filename] = code
         
         # Try generic code blocks
         if not files:
-            pattern = self.code_block_patterns['generic']
-            matches = re.findall(pattern, response, re.DOTALL | re.IGNORECASE)
-            
-            for i, code in enumerate(matches):
+            for i, fence in enumerate(scan.fences):
                 # Try to detect language from content
-                detected_lang = self._detect_language(code)
+                detected_lang = self._detect_language(fence.content)
                 extension = self._get_file_extension(detected_lang or expected_language)
                 filename = f"solution_{i+1}.{extension}"
-                files[filename] = code.strip()
+                files[filename] = fence.content
         
         return files if files else None
 
-    def _intelligent_text_parsing(self, response: str, expected_language: str) -> Optional[Dict[str, str]]:
+    def _intelligent_text_parsing(self, response: str, expected_language: str,
+                                  scan: Optional[ScanResult] = None) -> Optional[Dict[str, str]]:
         """Parse code using intelligent text analysis"""
         
-        # Look for file headers or separators
-        file_separators = [
-            r'(?:^|\n)(?:File|Filename):\s*([^\n]+)',
-            r'(?:^|\n)#+\s*([^\n]+\.(?:go|py|js|ts|rs|java|cpp|h))',
-            r'(?:^|\n)//\s*([^\n]+\.(?:go|py|js|ts|rs|java|cpp|h))',
-            r'(?:^|\n)#\s*([^\n]+\.(?:go|py|js|ts|rs|java|cpp|h))'
-        ]
-        
+        scan = scan or self.scanner.scan(response)
         files = {}
         
-        for separator_pattern in file_separators:
-            matches = list(re.finditer(separator_pattern, response, re.IGNORECASE | re.MULTILINE))
-            
-            if matches:
-                for i, match in enumerate(matches):
-                    filename = match.group(1).strip()
-                    start = match.end()
-                    
-                    # Find the end of this file's content
-                    if i + 1 < len(matches):
-                        end = matches[i + 1].start()
-                    else:
-                        end = len(response)
-                    
-                    code_content = response[start:end].strip()
-                    
-                    # Clean up the code content
-                    code_content = self._clean_code_content(code_content)
-                    
-                    if code_content and len(code_content) > 10:  # Minimum viable code
-                        files[filename] = code_content
+        # Each header form splits the response independently; later forms win on
+        # filename collisions
+        for headers in scan.headers:
+            for i, (filename, _, start) in enumerate(headers):
+                # Find the end of this file's content
+                end = headers[i + 1][1] if i + 1 < len(headers) else len(response)
+                
+                code_content = response[start:end].strip()
+                
+                # Clean up the code content
+                code_content = self._clean_code_content(code_content)
+                
+                if code_content and len(code_content) > 10:  # Minimum viable code
+                    files[filename] = code_content
         
         return files if files else None
 
@@ -272,7 +586,7 @@ class LLMResponseParser:
         json_str = json_str.strip()
         
         # Fix trailing commas before closing brackets/braces
-        json_str = re.sub(r',(\s*[}\]])', r'\1', json_str)
+        json_str = _TRAILING_COMMA_PATTERN.sub(r'\1', json_str)
         
         # Enhanced cleaning for very long strings
         
@@ -338,7 +652,7 @@ class LLMResponseParser:
             for key, value in data.items():
                 if isinstance(value, dict):
                     # Check if it looks like a filename -> code mapping
-                    if any(k.endswith(('.go', '.py', '.js', '.ts', '.rs', '.java', '.cpp', '.h')) 
+                    if any(k.endswith(CODE_FILE_EXTENSIONS)
                            for k in value.keys()):
                         return value
         
@@ -455,106 +769,72 @@ Original LLM Response:
     def _extract_files_manually(self, response: str) -> Optional[Dict[str, str]]:
         """Manually extract files from JSON-like responses when regex fails
         
-        This handles cases where the JSON contains extremely long strings
-        that break regex patterns.
+        This handles truncated JSON whose files object never closes, so the
+        scanner found no balanced object to parse.
         """
         
-        files = {}
-        
-        # Look for the files section
-        files_start = response.find('"files"')
-        if files_start == -1:
-            return None
-        
-        # Find the opening brace of the files object
-        brace_pos = response.find('{', files_start)
-        if brace_pos == -1:
-            return None
-        
-        # Parse character by character to extract files
-        i = brace_pos + 1
-        while i < len(response):
-            # Skip whitespace
-            while i < len(response) and response[i].isspace():
-                i += 1
-            
-            if i >= len(response):
-                break
-                
-            # Check for end of files object
-            if response[i] == '}':
-                break
-            
-            # Look for filename in quotes
-            if response[i] == '"':
-                # Extract filename
-                i += 1  # Skip opening quote
-                filename_start = i
-                while i < len(response) and response[i] != '"':
-                    if response[i] == '\\':
-                        i += 2  # Skip escaped character
-                    else:
-                        i += 1
-                
-                if i >= len(response):
-                    break
-                    
-                filename = response[filename_start:i]
-                i += 1  # Skip closing quote
-                
-                # Skip whitespace and colon
-                while i < len(response) and (response[i].isspace() or response[i] == ':'):
-                    i += 1
-                
-                # Look for content in quotes
-                if i < len(response) and response[i] == '"':
-                    i += 1  # Skip opening quote
-                    content_start = i
-                    content_chars = []
-                    
-                    # Extract content, handling escape sequences
-                    while i < len(response):
-                        if response[i] == '\\' and i + 1 < len(response):
-                            # Handle escape sequence
-                            next_char = response[i + 1]
-                            if next_char == 'n':
-                                content_chars.append('\n')
-                            elif next_char == 't':
-                                content_chars.append('\t')
-                            elif next_char == 'r':
-                                content_chars.append('\r')
-                            elif next_char == '"':
-                                content_chars.append('"')
-                            elif next_char == '\\':
-                                content_chars.append('\\')
-                            else:
-                                content_chars.append(next_char)
-                            i += 2
-                        elif response[i] == '"':
-                            # End of string
-                            break
-                        else:
-                            content_chars.append(response[i])
-                            i += 1
-                    
-                    if filename.endswith(('.go', '.py', '.js', '.ts', '.rs', '.java', '.cpp', '.h')):
-                        content = ''.join(content_chars)
-                        files[filename] = content
-                    
-                    i += 1  # Skip closing quote
-            
-            # Skip to next comma or end
-            while i < len(response) and response[i] not in ',}':
-                i += 1
-            
-            if i < len(response) and response[i] == ',':
-                i += 1
+        extractor = StreamingFileExtractor()
+        extractor.feed(response)
+        extractor.close()
         
+        files = {
+            filename: content for filename, content in extractor.files.items()
+            if filename.endswith(CODE_FILE_EXTENSIONS)
+        }
         return files if files else None
 
 
+_default_parser: Optional[LLMResponseParser] = None
+
+
+def response_is_truncated(response: str) -> bool:
+    """Whether a response stops inside a code fence, JSON object or string
+    
+    Meant for responses that should be a complete JSON/markdown document
+    (e.g. solutions); free-form prose with stray braces or quotes can look
+    truncated.
+    """
+    return ResponseScanner().scan(response).truncated
+
+
+# Repeated text between a cut-off response and its continuation shorter than
+# the minimum is treated as coincidence; longer repeats are not searched for
+_MIN_SPLICE_OVERLAP = 16
+_MAX_SPLICE_OVERLAP = 400
+
+
+def splice_continuation(partial: str, continuation: str) -> str:
+    """Join a cut-off response with the model's continuation of it
+    
+    Models asked to resume sometimes re-open the code fence they were inside
+    or repeat the last few lines; the re-opened fence line and the repeated
+    overlap (at least ``_MIN_SPLICE_OVERLAP`` characters) are dropped.
+    """
+    if not continuation:
+        return partial
+    
+    if continuation.lstrip().startswith('```'):
+        fences = ResponseScanner().scan(partial).fences
+        if fences and not fences[-1].closed:
+            newline = continuation.find('\n')
+            continuation = continuation[newline + 1:] if newline >= 0 else ''
+    
+    limit = min(len(partial), len(continuation), _MAX_SPLICE_OVERLAP)
+    for size in range(limit, _MIN_SPLICE_OVERLAP - 1, -1):
+        if partial.endswith(continuation[:size]):
+            return partial + continuation[size:]
+    return partial + continuation
+
+
+def get_response_parser() -> LLMResponseParser:
+    """Process-wide shared parser (parsing keeps no per-response state on it)"""
+    global _default_parser
+    if _default_parser is None:
+        _default_parser = LLMResponseParser()
+    return _default_parser
+
+
 # Convenience function for easy import
 def parse_llm_response(response: str, expected_language: str = 'go') -> Dict[str, str]:
     """Parse LLM response using the advanced parser"""
-    parser = LLMResponseParser()
-    return parser.parse(response, expected_language) 
\ No newline at end of file
+    return get_response_parser().parse(response, expected_language)
@@ -0,0 +1,132 @@
+"""
+Microbenchmarks for per-call overhead in parsing and analysis
+
+Each case times the same work two ways: ``baseline`` reproduces the
+per-call setup the code used to pay (pattern strings passed through ``re``'s
+compile cache on every call, one search per keyword) and ``shared`` uses the
+precompiled pattern registry. The difference is the overhead removed from
+every call.
+"""
+
+import re
+import timeit
+from dataclasses import dataclass
+from typing import Callable, List
+
+from .patterns import GO_FUNC_NAME_PATTERN, compiled, keyword_pattern
+
+
+_SAMPLE_GO = '''package main
+
+import "fmt"
+
+type Store struct {
+    items map[string]int
+}
+
+func NewStore() *Store {
+    return &Store{items: make(map[string]int)}
+}
+
+func (s *Store) Add(key string, value int) error {
+    if value < 0 {
+        return fmt.Errorf("negative value for %s", key)
+    }
+    for k := range s.items {
+        if k == key {
+            s.items[k] += value
+            return nil
+        }
+    }
+    s.items[key] = value
+    return nil
+}
+
+func main() {
+    store := NewStore()
+    switch err := store.Add("a", 1); {
+    case err != nil:
+        fmt.Println(err)
+    }
+}
+'''
+
+_GO_LINE_PATTERNS = [
+    r'func\s+(?:\([^)]*\)\s+)?(\w+)\s*\([^)]*\)',
+    r'type\s+(\w+)\s+(?:struct|interface)',
+    r'import\s+(?:"([^"]+)"|`([^`]+)`)',
+    r'(?:var|:=)\s+(\w+)'
+]
+
+_COMPLEXITY_KEYWORDS = ['if', 'for', 'switch', 'case', 'select']
+
+
+@dataclass
+class BenchmarkResult:
+    """Per-call time of one case, before and after sharing"""
+    name: str
+    baseline_us: float
+    shared_us: float
+
+    @property
+    def speedup(self) -> float:
+        return self.baseline_us / self.shared_us if self.shared_us else float('inf')
+
+
+def time_per_call(func: Callable[[], object], iterations: int, repeat: int = 5) -> float:
+    """Best-of-``repeat`` mean time per call, in microseconds"""
+    timer = timeit.Timer(func)
+    return min(timer.repeat(repeat=repeat, number=iterations)) / iterations * 1e6
+
+
+def _line_scan_strings(lines: List[str]) -> int:
+    return sum(1 for line in lines for pattern in _GO_LINE_PATTERNS if re.search(pattern, line))
+
+
+def _line_scan_compiled(lines: List[str]) -> int:
+    regexes = [compiled(pattern) for pattern in _GO_LINE_PATTERNS]
+    return sum(1 for line in lines for regex in regexes if regex.search(line))
+
+
+def _keyword_loop(lines: List[str]) -> int:
+    complexity = 0
+    for line in lines:
+        for keyword in _COMPLEXITY_KEYWORDS:
+            if re.search(rf'\b{keyword}\b', line):
+                complexity += 1
+    return complexity
+
+
+def _keyword_alternation(lines: List[str]) -> int:
+    regex = keyword_pattern(_COMPLEXITY_KEYWORDS)
+    return sum(len(set(regex.findall(line))) for line in lines)
+
+
+def run_overhead_benchmark(iterations: int = 2000) -> List[BenchmarkResult]:
+    """Time every case; ``iterations`` calls per timing run"""
+    if iterations < 1:
+        raise ValueError(f"iterations must be at least 1, got {iterations}")
+    lines = _SAMPLE_GO.split('\n')
+    cases = [
+        ('Go line patterns (per line)',
+         lambda: _line_scan_strings(lines),
+         lambda: _line_scan_compiled(lines)),
+        ('function-name findall',
+         lambda: re.findall(r'func\s+([a-zA-Z_][a-zA-Z0-9_]*)', _SAMPLE_GO),
+         lambda: GO_FUNC_NAME_PATTERN.findall(_SAMPLE_GO)),
+        ('complexity keyword scan',
+         lambda: _keyword_loop(lines),
+         lambda: _keyword_alternation(lines)),
+    ]
+
+    results = []
+    for name, baseline, shared in cases:
+        # Results must agree, or the comparison is meaningless
+        if baseline() != shared():
+            raise RuntimeError(f"Benchmark case {name!r}: baseline and shared variants disagree")
+        results.append(BenchmarkResult(
+            name=name,
+            baseline_us=time_per_call(baseline, iterations),
+            shared_us=time_per_call(shared, iterations)
+        ))
+    return results
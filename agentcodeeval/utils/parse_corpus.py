@@ -0,0 +1,305 @@
+"""
+Response corpus, parser benchmark and linearity fuzzer for ``llm_parsing``
+
+Raw solution responses can be recorded during evaluation (set
+``evaluation.response_corpus``) into a JSONL corpus. Entries are classified
+by shape (JSON, fenced code, truncated, deeply nested, huge, plain text),
+and a built-in synthetic corpus covers every shape, so the benchmark runs
+offline even before anything has been recorded. ``benchmark_parser`` times
+each parsing strategy per shape; ``fuzz_parser`` generates repetitive
+pathological inputs at two sizes and flags any whose parse time grows
+clearly faster than their length.
+"""
+
+import hashlib
+import json
+import logging
+import random
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from .llm_parsing import LLMResponseParser, ResponseScanner
+
+logger = logging.getLogger(__name__)
+
+
+CORPUS_KINDS = ('json', 'fenced', 'truncated', 'nested', 'huge', 'text')
+HUGE_RESPONSE_CHARS = 50_000
+NESTED_OBJECT_DEPTH = 3
+
+# Each strategy receives (parser, response); the 'parse' row is the full cascade
+STRATEGIES: Dict[str, Callable[[LLMResponseParser, str], object]] = {
+    'scan': lambda parser, response: parser.scanner.scan(response),
+    'structured_json': lambda parser, response: parser._extract_structured_json(response),
+    'json_like': lambda parser, response: parser._extract_code_from_json_like(response),
+    'code_blocks': lambda parser, response: parser._extract_code_blocks(response, 'go'),
+    'text_headers': lambda parser, response: parser._intelligent_text_parsing(response, 'go'),
+    'manual': lambda parser, response: parser._extract_files_manually(response),
+    'parse': lambda parser, response: parser.parse(response, 'go'),
+}
+
+# Fragments the fuzzer repeats; each one toggles some scanner or regex state
+FUZZ_FRAGMENTS = [
+    '{', '}', '{{{', '}}}', '"', '\\', '\\"', '\\\\', '`', '```', '```json\n', '```go\n',
+    '\n', ':', ',', ' ', 'abc', '\\u00', '"x.go": "', '"files": {', 'File: a.go\n',
+    '# b.go\n', '// c.go\n', 'func f() {', 'main.go: `', '\t', 'é'
+]
+
+# Motifs that were once super-linear; always fuzzed (verbatim, without random
+# fragments mixed in) before the random trials
+REGRESSION_MOTIFS = [
+    ['a```'],  # many fences on one long line (per-fence look back at the line start)
+]
+
+
+@dataclass
+class CorpusEntry:
+    """One response in the corpus"""
+    id: str
+    kind: str
+    response: str
+    source: str = 'recorded'
+    model: Optional[str] = None
+    scenario_id: Optional[str] = None
+
+
+@dataclass
+class StrategyTiming:
+    """Time for one strategy over all corpus entries of one kind"""
+    kind: str
+    strategy: str
+    responses: int
+    total_chars: int
+    seconds: float
+
+    @property
+    def us_per_response(self) -> float:
+        return self.seconds / self.responses * 1e6 if self.responses else 0.0
+
+    @property
+    def mb_per_second(self) -> float:
+        return self.total_chars / self.seconds / 1e6 if self.seconds else float('inf')
+
+
+@dataclass
+class FuzzFinding:
+    """A generated input whose parse time grew super-linearly with its size"""
+    motif: List[str]
+    small_chars: int
+    large_chars: int
+    small_seconds: float
+    large_seconds: float
+
+    @property
+    def growth(self) -> float:
+        return self.large_seconds / self.small_seconds if self.small_seconds else float('inf')
+
+
+def response_id(response: str) -> str:
+    return hashlib.sha1(response.encode('utf-8', errors='surrogatepass')).hexdigest()
+
+
+def _max_json_depth(text: str, spans: List[List[int]]) -> int:
+    """Deepest chain of JSON-looking objects nested from the top level
+
+    An object looks like JSON when its first member is a quoted key; chains
+    must start at a top-level object, so map literals inside brace-delimited
+    code do not make a plain code response look like JSON.
+    """
+    depth = 0
+    stack: List[tuple] = []
+    for start, end in spans:
+        while stack and stack[-1][0] <= start:
+            stack.pop()
+        parent_depth = stack[-1][1] if stack else 0
+        looks_json = text[start + 1:start + 64].lstrip().startswith('"')
+        chain = parent_depth + 1 if looks_json and parent_depth == len(stack) else 0
+        stack.append((end, chain))
+        depth = max(depth, chain)
+    return depth
+
+
+def classify_response(response: str) -> str:
+    """Shape of a response, one of ``CORPUS_KINDS``"""
+    if len(response) >= HUGE_RESPONSE_CHARS:
+        return 'huge'
+    scan = ResponseScanner().scan(response)
+    if scan.truncated:
+        return 'truncated'
+    json_depth = _max_json_depth(response, scan.objects)
+    if json_depth >= NESTED_OBJECT_DEPTH:
+        return 'nested'
+    if any(fence.language == 'json' or fence.content.startswith('{') for fence in scan.fences):
+        return 'json'
+    if scan.fences:
+        return 'fenced'
+    return 'json' if json_depth else 'text'
+
+
+class ResponseCorpus:
+    """Append-only JSONL corpus of raw model responses, deduplicated by content"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._ids: Optional[set] = None
+
+    def _known_ids(self) -> set:
+        if self._ids is None:
+            self._ids = {entry.id for entry in self.entries()}
+        return self._ids
+
+    def record(self, response: str, model: Optional[str] = None, scenario_id: Optional[str] = None) -> bool:
+        """Add a response; returns False if it is already in the corpus"""
+        entry_id = response_id(response)
+        if entry_id in self._known_ids():
+            return False
+        entry = CorpusEntry(entry_id, classify_response(response), response, 'recorded', model, scenario_id)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(asdict(entry)) + '\n')
+        self._ids.add(entry_id)
+        return True
+
+    def entries(self) -> List[CorpusEntry]:
+        if not self.path.exists():
+            return []
+        entries = []
+        with open(self.path, 'r') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    entries.append(CorpusEntry(**json.loads(line)))
+                except (json.JSONDecodeError, TypeError) as e:
+                    logger.warning(f"Skipping bad corpus line {self.path}:{line_number}: {e}")
+        return entries
+
+
+def _go_file(name: str, functions: int) -> str:
+    body = [f'package main\n\nimport (\n\t"fmt"\n\t"strings"\n)\n\n// {name} helpers\n']
+    for i in range(functions):
+        body.append(
+            f'func handle{i}(input string) (map[string]int, error) {{\n'
+            f'\tif strings.TrimSpace(input) == "" {{\n'
+            f'\t\treturn nil, fmt.Errorf("empty input for %q", "{name}")\n\t}}\n'
+            f'\tcounts := map[string]int{{"calls": {i}}}\n'
+            f'\tfor _, r := range input {{\n\t\tif r == \'\\\\\' || r == \'"\' {{\n\t\t\tcounts["escaped"]++\n\t\t}}\n\t}}\n'
+            f'\treturn counts, nil\n}}\n\n'
+        )
+    return ''.join(body)
+
+
+def _solution_json(files: Dict[str, str], **extra) -> str:
+    return json.dumps({'approach': 'Split handlers by concern', 'files': files,
+                       'explanation': 'Each handler validates its input', **extra}, indent=2)
+
+
+def synthetic_corpus() -> List[CorpusEntry]:
+    """Deterministic responses covering every corpus kind"""
+    files = {f'handler_{i}.go': _go_file(f'handler_{i}', 4) for i in range(3)}
+    json_response = f"Here is the solution:\n```json\n{_solution_json(files)}\n```\n"
+    responses = {
+        'json': json_response,
+        'fenced': ''.join(f"File: {name}\n```go\n{code}```\n\n" for name, code in files.items()),
+        'truncated': json_response[:len(json_response) * 2 // 3],
+        'nested': "```json\n" + _solution_json(
+            files, metadata={'layers': {'api': {'routes': {'v1': {'users': ['get', 'put']}}}}}
+        ) + "\n```",
+        'huge': f"```json\n{_solution_json({f'module_{i}.go': _go_file(f'module_{i}', 30) for i in range(6)})}\n```",
+        'text': ''.join(f"// {name}\n{code}\n" for name, code in files.items()),
+    }
+    samples = list(responses.items()) + [
+        # Fences opened after prose on the same line
+        ('fenced', f"Here it is: ```go\n{files['handler_0.go']}```"),
+        ('fenced', f"Code: ```go\n{files['handler_1.go']}``` and tests: ```go\n{files['handler_2.go']}```"),
+    ]
+    return [CorpusEntry(response_id(response), kind, response, 'synthetic') for kind, response in samples]
+
+
+@contextmanager
+def _quiet_parser():
+    """Silence per-response parser logging while timing"""
+    parser_logger = logging.getLogger(LLMResponseParser.__module__)
+    level = parser_logger.level
+    parser_logger.setLevel(logging.ERROR)
+    try:
+        yield
+    finally:
+        parser_logger.setLevel(level)
+
+
+def benchmark_parser(entries: List[CorpusEntry], repeat: int = 5,
+                     strategies: Optional[List[str]] = None) -> List[StrategyTiming]:
+    """Best-of-``repeat`` time of each strategy over the entries of each kind"""
+    parser = LLMResponseParser()
+    by_kind: Dict[str, List[CorpusEntry]] = {}
+    for entry in entries:
+        by_kind.setdefault(entry.kind, []).append(entry)
+
+    timings = []
+    with _quiet_parser():
+        for kind in CORPUS_KINDS:
+            group = by_kind.get(kind)
+            if not group:
+                continue
+            total_chars = sum(len(entry.response) for entry in group)
+            for name in strategies or STRATEGIES:
+                strategy = STRATEGIES[name]
+                best = float('inf')
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    for entry in group:
+                        strategy(parser, entry.response)
+                    best = min(best, time.perf_counter() - start)
+                timings.append(StrategyTiming(kind, name, len(group), total_chars, best))
+    return timings
+
+
+def _build_input(rng: random.Random, motif: List[str], size: int, noise: float = 0.05) -> str:
+    """Repeat ``motif`` to ``size`` chars with a ``noise`` share of random fragments mixed in"""
+    parts = []
+    length = 0
+    while length < size:
+        fragment = rng.choice(FUZZ_FRAGMENTS) if rng.random() < noise else motif[len(parts) % len(motif)]
+        parts.append(fragment)
+        length += len(fragment)
+    return ''.join(parts)
+
+
+def _time_parse(parser: LLMResponseParser, response: str, repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parser.parse(response, 'go')
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def fuzz_parser(seed: int = 0, trials: int = 50, base_chars: int = 50_000, growth: int = 8,
+                tolerance: float = 2.0, min_seconds: float = 0.005) -> List[FuzzFinding]:
+    """Look for inputs whose parse time grows super-linearly with length
+
+    Each trial repeats a motif of fuzz fragments (``REGRESSION_MOTIFS``, then
+    ``trials`` random ones) to ``base_chars`` and ``growth * base_chars``
+    characters. A trial is reported when the larger input takes more than
+    ``growth * tolerance`` times as long; ``min_seconds`` only filters out
+    timer noise on the smaller input, so the growth ratio decides.
+    """
+    rng = random.Random(seed)
+    parser = LLMResponseParser()
+    findings = []
+    motifs = [(list(motif), 0.0) for motif in REGRESSION_MOTIFS]
+    motifs += [([rng.choice(FUZZ_FRAGMENTS) for _ in range(rng.randint(1, 6))], 0.05) for _ in range(trials)]
+    with _quiet_parser():
+        for motif, noise in motifs:
+            input_seed = rng.random()
+            small = _build_input(random.Random(input_seed), motif, base_chars, noise)
+            large = _build_input(random.Random(input_seed), motif, base_chars * growth, noise)
+            small_seconds = _time_parse(parser, small)
+            large_seconds = _time_parse(parser, large)
+            if large_seconds > max(small_seconds, min_seconds) * growth * tolerance:
+                findings.append(FuzzFinding(motif, len(small), len(large), small_seconds, large_seconds))
+    return findings
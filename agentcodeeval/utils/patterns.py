@@ -0,0 +1,131 @@
+"""
+Process-wide registry of precompiled regular expressions
+
+Analyzers and metric helpers run the same handful of patterns over every
+file of every solution. Calling ``re.findall(pattern, ...)`` with a pattern
+string goes through ``re``'s compile cache (type checks, a bounded LRU and
+flag handling) on every call; patterns compiled once and shared are matched
+directly. Fixed patterns live as module-level constants next to their users;
+table-driven patterns (per-language pattern lists, security rules, keyword
+sets) are compiled on first use through ``compiled`` and then reused.
+"""
+
+import re
+from bisect import bisect_right
+from collections import Counter
+from typing import Dict, Iterable, List, Pattern, Tuple
+
+
+_registry: Dict[Tuple[str, int], Pattern] = {}
+
+
+def compiled(pattern: str, flags: int = 0) -> Pattern:
+    """Shared compiled form of ``pattern`` (compiled once per process)"""
+    key = (pattern, flags)
+    regex = _registry.get(key)
+    if regex is None:
+        regex = _registry[key] = re.compile(pattern, flags)
+    return regex
+
+
+def keyword_pattern(keywords: Iterable[str], flags: int = 0) -> Pattern:
+    """One whole-word alternation matching any of ``keywords``
+
+    Longer keywords are tried first so ``elif`` is not reported as ``if``.
+    """
+    alternatives = sorted(set(keywords), key=lambda keyword: (-len(keyword), keyword))
+    return compiled(r'\b(?:' + '|'.join(re.escape(keyword) for keyword in alternatives) + r')\b', flags)
+
+
+def registry_size() -> int:
+    """Number of distinct patterns compiled through the registry"""
+    return len(_registry)
+
+
+# Identifier-level patterns shared across analyzers and metrics
+IDENTIFIER_PATTERN = re.compile(r'\b[a-zA-Z_][a-zA-Z0-9_]*\b')
+GO_FUNC_NAME_PATTERN = re.compile(r'func\s+([a-zA-Z_][a-zA-Z0-9_]*)')
+GO_VAR_NAME_PATTERN = re.compile(r'var\s+([a-zA-Z_][a-zA-Z0-9_]*)')
+GO_TYPE_NAME_PATTERN = re.compile(r'type\s+([a-zA-Z_][a-zA-Z0-9_]*)')
+PY_DEF_NAME_PATTERN = re.compile(r'def\s+([a-zA-Z_][a-zA-Z0-9_]*)')
+PY_CLASS_NAME_PATTERN = re.compile(r'class\s+([a-zA-Z_][a-zA-Z0-9_]*)')
+CALL_NAME_PATTERN = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)\s*\(')
+CAPITALIZED_WORD_PATTERN = re.compile(r'\b[A-Z][a-z]+\b')
+
+
+def _trie_alternation(keywords: List[str]) -> str:
+    """Regex alternation of ``keywords`` factored into a prefix trie
+
+    Shared prefixes are matched once (``re`` tries each top-level branch in
+    turn, so a flat alternation of hundreds of literals is far slower), and
+    longer continuations are tried before a keyword that ends early.
+    """
+    trie: Dict[str, dict] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if len(branches) == 1 and len(body) > 1 and '' in node:
+            body = '(?:' + body + ')'
+        return body + ('?' if '' in node else '')
+
+    return build(trie)
+
+
+class KeywordScanner:
+    """Occurrence counts of many literal keywords from one pass over a text
+
+    Equivalent to an overlapping substring count of every keyword (matches
+    may sit inside longer words), without scanning the text once per
+    keyword. Characters that appear in no keyword are mapped to spaces in a
+    single ``str.translate`` pass, which leaves every real occurrence intact;
+    the distinct remaining tokens are then matched together by one
+    trie-shaped lookahead regex, and each match is weighted by how often its
+    token occurs. Keywords containing spaces are counted directly.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = sorted(set(keyword for keyword in keywords if keyword))
+        words = [keyword for keyword in self.keywords if ' ' not in keyword]
+        self._phrases = [keyword for keyword in self.keywords if ' ' in keyword]
+
+        alphabet = set(''.join(words))
+        self._separators = {code: ' ' for code in range(128) if chr(code) not in alphabet}
+        vocabulary = set(words)
+        self._prefixes = {
+            word: [word[:end] for end in range(1, len(word) + 1) if word[:end] in vocabulary]
+            for word in words
+        }
+        self._regex = re.compile('(?=(' + _trie_alternation(words) + '))') if words else None
+
+    def counts(self, text: str) -> Counter:
+        """Overlapping occurrence count of every keyword found in ``text``"""
+        counts: Counter = Counter()
+
+        if self._regex is not None:
+            tokens = Counter(text.translate(self._separators).split())
+            token_counts = list(tokens.values())
+            token_starts = []
+            offset = 0
+            for token in tokens:
+                token_starts.append(offset)
+                offset += len(token) + 1
+            for match in self._regex.finditer(' '.join(tokens)):
+                occurrences = token_counts[bisect_right(token_starts, match.start()) - 1]
+                for prefix in self._prefixes[match.group(1)]:
+                    counts[prefix] += occurrences
+
+        for phrase in self._phrases:
+            start = text.find(phrase)
+            while start != -1:
+                counts[phrase] += 1
+                start = text.find(phrase, start + 1)
+
+        return counts
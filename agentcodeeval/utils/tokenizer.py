@@ -0,0 +1,157 @@
+"""
+Token counting for AgentCodeEval context budgets
+
+Difficulty tiers in ``BenchmarkConfig.context_ranges`` are defined in
+tokens, so context selection needs token counts rather than character
+counts. ``TokenCounter`` uses the tiktoken BPE encoder when it is installed
+and its encoding files are already in the local tiktoken cache (it never
+downloads them unless asked to), and otherwise falls back to an offline
+estimate of about four characters per token. Counts are memoized by
+content hash, so each file is tokenized once no matter how many scenarios
+include it.
+"""
+
+import hashlib
+import logging
+import re
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+try:
+    import tiktoken
+    import tiktoken.load
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+# Same shape as the cl100k pre-tokenizer: contractions, letter runs, short
+# digit groups, punctuation runs and whitespace
+_PRETOKEN_PATTERN = re.compile(
+    r"'(?:[sdmt]|ll|ve|re)|[^\r\n\w]?[^\W\d_]+|\d{1,3}| ?[^\s\w]+[\r\n]*|\s*[\r\n]+|\s+(?!\S)|\s+"
+)
+
+# Average characters per BPE token (cl100k on English text and code)
+_CHARS_PER_TOKEN = 4
+
+
+@contextmanager
+def _no_downloads():
+    """Make tiktoken read encoding files from its cache only
+
+    ``tiktoken.load.read_file`` is what fetches a blob on a cache miss;
+    replacing it turns a miss into an error instead of a network request.
+    """
+    loader = tiktoken.load
+    original = getattr(loader, 'read_file', None)
+    if original is None:
+        yield
+        return
+
+    def refuse(blobpath):
+        raise OSError(f"{blobpath} is not in the local tiktoken cache")
+
+    loader.read_file = refuse
+    try:
+        yield
+    finally:
+        loader.read_file = original
+
+
+class TokenCounter:
+    """Cached token counter (tiktoken BPE when available, offline estimate otherwise)"""
+
+    def __init__(self, encoding_name: str = "cl100k_base", allow_download: bool = False):
+        self.encoding_name = encoding_name
+        self.allow_download = allow_download
+        self._encoding = None
+        self._encoding_loaded = False
+        self._cache: Dict[str, int] = {}
+
+    @property
+    def encoding(self):
+        """tiktoken encoding, loaded on first use (None when unavailable offline)"""
+        if not self._encoding_loaded:
+            self._encoding_loaded = True
+            if TIKTOKEN_AVAILABLE:
+                try:
+                    if self.allow_download:
+                        self._encoding = tiktoken.get_encoding(self.encoding_name)
+                    else:
+                        with _no_downloads():
+                            self._encoding = tiktoken.get_encoding(self.encoding_name)
+                except Exception as e:
+                    logger.warning(f"tiktoken encoding '{self.encoding_name}' unavailable ({e}); "
+                                   f"using approximate token counts")
+        return self._encoding
+
+    @property
+    def exact(self) -> bool:
+        """Whether counts come from a real BPE encoder"""
+        return self.encoding is not None
+
+    def count(self, text: str, digest: Optional[str] = None) -> int:
+        """Number of tokens in ``text`` (memoized by content hash)
+
+        ``digest`` is the SHA-1 hex digest of the UTF-8 text, when the caller
+        already has it, to skip re-hashing.
+        """
+        if not text:
+            return 0
+
+        key = digest or hashlib.sha1(text.encode('utf-8', errors='surrogatepass')).hexdigest()
+        tokens = self._cache.get(key)
+        if tokens is None:
+            tokens = self._count_uncached(text)
+            self._cache[key] = tokens
+        return tokens
+
+    def cached_count(self, digest: str) -> Optional[int]:
+        """Previously computed count for content with this SHA-1 digest, if any"""
+        return self._cache.get(digest)
+
+    def count_files(self, files: Dict[str, str]) -> Dict[str, int]:
+        """Token count for each file in a ``{path: content}`` mapping"""
+        return {path: self.count(content) for path, content in files.items()}
+
+    def _count_uncached(self, text: str) -> int:
+        encoding = self.encoding
+        if encoding is not None:
+            return len(encoding.encode_ordinary(text))
+
+        # Estimate from the length of the whole text: pieces are weighted in
+        # characters and the total is divided once, so short words are not
+        # each rounded up to a full token
+        weighted_chars = 0
+        for piece in _PRETOKEN_PATTERN.findall(text):
+            stripped = piece.strip()
+            if not stripped:
+                # A whitespace run is at most one token
+                weighted_chars += min(len(piece), _CHARS_PER_TOKEN)
+            elif stripped.isalpha():
+                weighted_chars += len(piece)
+            elif stripped.isdigit():
+                # Digit groups (up to 3) are one token each
+                weighted_chars += _CHARS_PER_TOKEN
+            else:
+                # Punctuation merges less readily than letters
+                weighted_chars += 2 * len(piece)
+        return max(1, -(-weighted_chars // _CHARS_PER_TOKEN))
+
+
+_default_counter: Optional[TokenCounter] = None
+
+
+def get_token_counter() -> TokenCounter:
+    """Process-wide shared TokenCounter, so the memo is reused across generators"""
+    global _default_counter
+    if _default_counter is None:
+        _default_counter = TokenCounter()
+    return _default_counter
+
+
+def count_tokens(text: str) -> int:
+    """Convenience wrapper around the shared TokenCounter"""
+    return get_token_counter().count(text)
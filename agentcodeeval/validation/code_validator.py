@@ -14,10 +14,13 @@ import re
 import os
 import time
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, List, Optional, Tuple, Any, Union
 from dataclasses import dataclass
 import logging
 
+from ..analysis.solution_analysis import FileAnalysis, SolutionAnalysis, analyze_solution
+from ..utils.patterns import compiled
+
 logger = logging.getLogger(__name__)
 
 
@@ -128,18 +131,19 @@ class CodeValidator:
                     execution_time=0.0
                 )
 
-    async def analyze_security(self, solution_code: Dict[str, str], 
+    async def analyze_security(self, solution_code: Union[Dict[str, str], SolutionAnalysis], 
                              language: str = 'go') -> SecurityAnalysisResult:
         """Analyze code for security vulnerabilities"""
         
+        analysis = analyze_solution(solution_code)
         vulnerabilities = []
         total_score = 1.0
         
         # Security pattern analysis
         security_patterns = self._get_security_patterns(language)
         
-        for filename, code in solution_code.items():
-            file_vulns = self._scan_security_patterns(code, security_patterns, filename)
+        for file in analysis.files:
+            file_vulns = self._scan_security_patterns(file, security_patterns)
             vulnerabilities.extend(file_vulns)
         
         # Calculate security score based on vulnerabilities
@@ -159,25 +163,26 @@ class CodeValidator:
             risk_level=risk_level
         )
 
-    async def analyze_code_quality(self, solution_code: Dict[str, str], 
+    async def analyze_code_quality(self, solution_code: Union[Dict[str, str], SolutionAnalysis], 
                                  language: str = 'go') -> QualityAnalysisResult:
         """Analyze code quality metrics"""
         
+        analysis = analyze_solution(solution_code)
         complexity_scores = []
         maintainability_scores = []
         code_smells = []
         
-        for filename, code in solution_code.items():
+        for file in analysis.files:
             # Complexity analysis
-            complexity = self._calculate_complexity(code, language)
+            complexity = self._calculate_complexity(file, language)
             complexity_scores.append(complexity)
             
             # Maintainability analysis
-            maintainability = self._calculate_maintainability(code, language)
+            maintainability = self._calculate_maintainability(file, language)
             maintainability_scores.append(maintainability)
             
             # Code smell detection
-            smells = self._detect_code_smells(code, language, filename)
+            smells = self._detect_code_smells(file, language)
             code_smells.extend(smells)
         
         # Calculate averages
@@ -185,7 +190,7 @@ class CodeValidator:
         avg_maintainability = sum(maintainability_scores) / len(maintainability_scores) if maintainability_scores else 0.0
         
         # Mock test coverage for now (would integrate with actual coverage tools)
-        test_coverage = self._estimate_test_coverage(solution_code, language)
+        test_coverage = self._estimate_test_coverage(analysis, language)
         
         return QualityAnalysisResult(
             complexity_score=avg_complexity,
@@ -374,25 +379,24 @@ class CodeValidator:
         
         return patterns.get(language, [])
 
-    def _scan_security_patterns(self, code: str, patterns: List[Dict], 
-                              filename: str) -> List[Dict]:
+    def _scan_security_patterns(self, file: FileAnalysis, patterns: List[Dict]) -> List[Dict]:
         """Scan code for security vulnerability patterns"""
         
         vulnerabilities = []
         
         for pattern_info in patterns:
-            matches = re.finditer(pattern_info['pattern'], code, re.MULTILINE)
+            matches = compiled(pattern_info['pattern'], re.MULTILINE).finditer(file.code)
             
             for match in matches:
-                line_num = code[:match.start()].count('\n') + 1
+                line_num = file.line_number(match.start())
                 
                 vulnerabilities.append({
                     'type': 'security_pattern',
                     'severity': pattern_info['severity'],
                     'description': pattern_info['description'],
-                    'file': filename,
+                    'file': file.name,
                     'line': line_num,
-                    'code_snippet': self._get_code_snippet(code, match.start())
+                    'code_snippet': self._get_code_snippet(file, line_num - 1)
                 })
         
         return vulnerabilities
@@ -407,7 +411,7 @@ class CodeValidator:
         else:
             return 'high'
 
-    def _calculate_complexity(self, code: str, language: str) -> float:
+    def _calculate_complexity(self, file: FileAnalysis, language: str) -> float:
         """Calculate cyclomatic complexity"""
         
         # Simplified complexity calculation
@@ -418,7 +422,7 @@ class CodeValidator:
         }
         
         indicators = complexity_indicators.get(language, [])
-        complexity_count = sum(code.count(indicator) for indicator in indicators)
+        complexity_count = sum(file.count(indicator) for indicator in indicators)
         
         # Normalize to 0-1 scale (assuming 20+ indicators = complex)
         normalized_complexity = min(complexity_count / 20.0, 1.0)
@@ -426,17 +430,17 @@ class CodeValidator:
         # Return inverse (lower complexity = higher score)
         return 1.0 - normalized_complexity
 
-    def _calculate_maintainability(self, code: str, language: str) -> float:
+    def _calculate_maintainability(self, file: FileAnalysis, language: str) -> float:
         """Calculate maintainability index"""
         
-        lines = code.split('\n')
-        non_empty_lines = [line for line in lines if line.strip()]
+        lines = file.lines
+        non_empty_lines = [line for line, stripped in zip(lines, file.stripped) if stripped]
         
         # Simple maintainability factors
         factors = {
             'line_count': len(non_empty_lines),
             'avg_line_length': sum(len(line) for line in non_empty_lines) / len(non_empty_lines) if non_empty_lines else 0,
-            'comment_ratio': sum(1 for line in lines if line.strip().startswith(('//','#'))) / len(lines) if lines else 0
+            'comment_ratio': sum(1 for line in file.stripped if line.startswith(('//','#'))) / len(lines) if lines else 0
         }
         
         # Simple scoring (could be much more sophisticated)
@@ -455,21 +459,21 @@ class CodeValidator:
         
         return min(score, 1.0)
 
-    def _detect_code_smells(self, code: str, language: str, filename: str) -> List[Dict]:
+    def _detect_code_smells(self, file: FileAnalysis, language: str) -> List[Dict]:
         """Detect code smells and anti-patterns"""
         
         smells = []
-        lines = code.split('\n')
+        filename = file.name
         
         # Long method detection
         current_function_length = 0
-        for i, line in enumerate(lines):
+        for i, (line, stripped) in enumerate(zip(file.lines, file.stripped)):
             if any(keyword in line for keyword in ['func ', 'def ', 'function ']):
                 current_function_length = 1
             elif current_function_length > 0:
-                if line.strip():
+                if stripped:
                     current_function_length += 1
-                if line.strip() == '}' or (language == 'python' and not line.startswith(' ')):
+                if stripped == '}' or (language == 'python' and not line.startswith(' ')):
                     if current_function_length > 20:
                         smells.append({
                             'type': 'long_method',
@@ -482,8 +486,7 @@ class CodeValidator:
         
         # Duplicate code detection (simplified)
         line_counts = {}
-        for i, line in enumerate(lines):
-            stripped = line.strip()
+        for i, stripped in enumerate(file.stripped):
             if len(stripped) > 10:  # Only check meaningful lines
                 if stripped in line_counts:
                     line_counts[stripped].append(i + 1)
@@ -502,18 +505,18 @@ class CodeValidator:
         
         return smells
 
-    def _estimate_test_coverage(self, solution_code: Dict[str, str], language: str) -> float:
+    def _estimate_test_coverage(self, analysis: SolutionAnalysis, language: str) -> float:
         """Estimate test coverage (simplified)"""
         
         # Look for test files
-        test_files = [f for f in solution_code.keys() if 'test' in f.lower()]
+        test_files = [file for file in analysis.files if 'test' in file.name.lower()]
         
         if not test_files:
             return 0.0
         
         # Simple heuristic: ratio of test lines to code lines
-        test_lines = sum(len(solution_code[f].split('\n')) for f in test_files)
-        code_lines = sum(len(code.split('\n')) for f, code in solution_code.items() if f not in test_files)
+        test_lines = sum(len(file.lines) for file in test_files)
+        code_lines = sum(len(file.lines) for file in analysis.files if 'test' not in file.name.lower())
         
         if code_lines == 0:
             return 0.0
@@ -623,11 +626,10 @@ func TestBasicFunctionality(t *testing.T) {
         
         return warnings
 
-    def _get_code_snippet(self, code: str, position: int, context_lines: int = 2) -> str:
-        """Get code snippet around a specific position"""
+    def _get_code_snippet(self, file: FileAnalysis, line_num: int, context_lines: int = 2) -> str:
+        """Get code snippet around a (0-based) line"""
         
-        lines = code.split('\n')
-        line_num = code[:position].count('\n')
+        lines = file.lines
         
         start = max(0, line_num - context_lines)
         end = min(len(lines), line_num + context_lines + 1)
@@ -636,18 +638,26 @@ func TestBasicFunctionality(t *testing.T) {
         return '\n'.join(snippet_lines)
 
 
+_default_validator: Optional[CodeValidator] = None
+
+
+def get_code_validator() -> CodeValidator:
+    """Process-wide shared CodeValidator (it keeps no per-call state)"""
+    global _default_validator
+    if _default_validator is None:
+        _default_validator = CodeValidator()
+    return _default_validator
+
+
 # Convenience functions
 async def validate_code_compilation(solution_code: Dict[str, str], language: str = 'go') -> CompilationResult:
     """Validate code compilation"""
-    validator = CodeValidator()
-    return await validator.validate_compilation(solution_code, language)
+    return await get_code_validator().validate_compilation(solution_code, language)
 
-async def analyze_code_security(solution_code: Dict[str, str], language: str = 'go') -> SecurityAnalysisResult:
+async def analyze_code_security(solution_code: Union[Dict[str, str], SolutionAnalysis], language: str = 'go') -> SecurityAnalysisResult:
     """Analyze code security"""
-    validator = CodeValidator()
-    return await validator.analyze_security(solution_code, language)
+    return await get_code_validator().analyze_security(solution_code, language)
 
-async def analyze_code_quality(solution_code: Dict[str, str], language: str = 'go') -> QualityAnalysisResult:
+async def analyze_code_quality(solution_code: Union[Dict[str, str], SolutionAnalysis], language: str = 'go') -> QualityAnalysisResult:
     """Analyze code quality"""
-    validator = CodeValidator()
-    return await validator.analyze_code_quality(solution_code, language) 
\ No newline at end of file
+    return await get_code_validator().analyze_code_quality(solution_code, language) 
\ No newline at end of file
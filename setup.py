@@ -18,17 +18,18 @@ setup(
         "numpy>=1.24.0",
         
         # Code analysis tools
-        "tree-sitter>=0.20.0",
-        "tree-sitter-python>=0.20.0",
-        "tree-sitter-javascript>=0.20.0",
+        "tree-sitter>=0.23.0",
+        "tree-sitter-python>=0.23.0",
+        "tree-sitter-javascript>=0.23.0",
         "tree-sitter-java>=0.20.0",
         "tree-sitter-cpp>=0.20.0",
-        "tree-sitter-go>=0.20.0",
-        "tree-sitter-typescript>=0.20.0",
+        "tree-sitter-go>=0.23.0",
+        "tree-sitter-typescript>=0.23.0",
         
         # Static analysis and metrics
         "radon>=6.0.0",  # Complexity analysis
         "lizard>=1.17.0",  # Code complexity metrics
+        "tiktoken>=0.5.0",  # Token counting for context budgets
         "gitpython>=3.1.0",  # Git repository analysis
         
         # LLM APIs and evaluation